@@ -0,0 +1,318 @@
+"""
+Sparse fieldsets and relation expansion for API responses.
+
+``?fields=id,status,customer.full_name`` limits the serialized fields and
+``?expand=customer,customer_measurement.template`` nests related objects;
+dotted paths reach into nested serializers. Relations that are not expanded
+are rendered as primary keys and are neither joined nor prefetched. Without
+either parameter every expandable relation is nested, as before.
+
+``?sideload=true`` renders shared relations such as users as IDs and adds
+an ``included`` map to the response in which every related entity is
+serialized once, however many rows reference it.
+
+Relations listed in ``cached_fields`` are rendered from an in-process cache
+keyed by primary key and are never joined.
+"""
+from collections import defaultdict
+
+from django.db.models import Prefetch
+from django.utils.module_loading import import_string
+from rest_framework import serializers
+
+FIELDS_PARAM = 'fields'
+EXPAND_PARAM = 'expand'
+SIDELOAD_PARAM = 'sideload'
+
+_UNSET = object()
+
+
+def parse_paths(value):
+    """Turn ``'a,b.c,b.d'`` into the tree ``{'a': {}, 'b': {'c': {}, 'd': {}}}``."""
+    tree = {}
+    for path in value.split(','):
+        node = tree
+        for name in filter(None, (part.strip() for part in path.split('.'))):
+            node = node.setdefault(name, {})
+    return tree
+
+
+def request_options(request):
+    """
+    Return ``(fields, expand)`` trees from the query string.
+
+    ``fields`` is None when every field is wanted. ``expand`` is None in the
+    default mode where every expandable relation is nested.
+    """
+    params = getattr(request, 'query_params', {})
+    if FIELDS_PARAM not in params and EXPAND_PARAM not in params:
+        return None, None
+    fields = parse_paths(params[FIELDS_PARAM]) if params.get(FIELDS_PARAM) else None
+    return fields, parse_paths(params.get(EXPAND_PARAM, ''))
+
+
+def sideload_requested(request):
+    """Whether the request asked for the side-loaded response format."""
+    params = getattr(request, 'query_params', {})
+    return params.get(SIDELOAD_PARAM, '').lower() in ('1', 'true', 'yes')
+
+
+class ExpandableFieldsMixin:
+    """
+    ModelSerializer mixin implementing ``?fields=`` and ``?expand=``.
+
+    ``expandable_fields`` maps a field name to ``(serializer, kwargs)``; the
+    serializer may be a dotted path to avoid circular imports.
+    ``field_relations`` lists the relations plain fields read through their
+    ``source`` so querysets can join them when those fields are requested.
+    ``sideload_fields`` maps expandable fields to the ``included`` collection
+    their objects are side-loaded into. ``cached_fields`` maps expandable
+    fields to a function (or its dotted path) returning the serialized
+    related object for a primary key, used instead of the serializer.
+    """
+    expandable_fields = {}
+    field_relations = {}
+    sideload_fields = {}
+    cached_fields = {}
+
+    def __init__(self, *args, fields=_UNSET, expand=_UNSET, **kwargs):
+        self._explicit_options = fields is not _UNSET or expand is not _UNSET
+        self._fields_option = None if fields is _UNSET else fields
+        self._expand_option = None if expand is _UNSET else expand
+        super().__init__(*args, **kwargs)
+
+    def get_field_options(self):
+        """Options passed by a parent serializer, else those of the request."""
+        if self._explicit_options:
+            return self._fields_option, self._expand_option
+        parent = self.parent
+        if isinstance(parent, serializers.ListSerializer):
+            parent = parent.parent
+        if parent is not None:
+            return None, None
+        return request_options(self.context.get('request'))
+
+    def get_fields(self):
+        fields = super().get_fields()
+        sparse, expand = self.get_field_options()
+        sideload = sideload_requested(self.context.get('request'))
+        for name, (serializer, kwargs) in self.expandable_fields.items():
+            if name not in fields:
+                continue
+            subfields = (sparse or {}).get(name) or None
+            if sideload and name in self.sideload_fields:
+                fields[name] = serializers.PrimaryKeyRelatedField(
+                    read_only=True, source=kwargs.get('source')
+                )
+            elif name in self.cached_fields and (expand is None or name in expand or subfields):
+                fields[name] = CachedRelatedField(
+                    _resolve(self.cached_fields[name]),
+                    subfields=subfields,
+                    source=self.Meta.model._meta.get_field(kwargs.get('source', name)).attname,
+                )
+            elif expand is None:
+                fields[name] = _resolve(serializer)(**kwargs)
+            elif name in expand or subfields:
+                fields[name] = _resolve(serializer)(
+                    fields=subfields, expand=expand.get(name, {}), **kwargs
+                )
+            else:
+                fields[name] = serializers.PrimaryKeyRelatedField(
+                    read_only=True,
+                    many=kwargs.get('many', False),
+                    source=kwargs.get('source'),
+                )
+        if sparse is not None:
+            fields = {name: field for name, field in fields.items() if name in sparse}
+        return fields
+
+    @classmethod
+    def expand_queryset(cls, queryset, request, options=None):
+        """
+        Join and prefetch exactly the relations ``request`` will serialize.
+
+        ``options`` is a ``(fields, expand)`` pair for serializers given
+        explicit options instead of reading them from the request.
+        """
+        select, prefetch = _related_paths(
+            cls, queryset.model, *(options or request_options(request)),
+            sideload=sideload_requested(request),
+        )
+        if select:
+            queryset = queryset.select_related(*select)
+        if prefetch:
+            queryset = queryset.prefetch_related(*prefetch)
+        return queryset
+
+
+class CachedRelatedField(serializers.Field):
+    """Read-only related object rendered by ``loader(pk)`` from a cache."""
+
+    def __init__(self, loader, subfields=None, **kwargs):
+        self.loader = loader
+        self.subfields = subfields
+        kwargs['read_only'] = True
+        super().__init__(**kwargs)
+
+    def to_representation(self, value):
+        data = self.loader(value)
+        if data is None:
+            return None
+        if self.subfields:
+            return {name: data[name] for name in data if name in self.subfields}
+        return dict(data)
+
+
+class ExpandableQuerysetMixin:
+    """
+    View mixin applying the serializer's relation loading to a queryset.
+
+    Also adds the ``included`` map to list and detail responses when
+    ``?sideload=true`` is given.
+    """
+
+    def expand_queryset(self, queryset):
+        serializer_class = self.get_serializer_class()
+        if issubclass(serializer_class, ExpandableFieldsMixin):
+            queryset = serializer_class.expand_queryset(queryset, self.request)
+        return queryset
+
+    def get_serializer(self, *args, **kwargs):
+        serializer = super().get_serializer(*args, **kwargs)
+        self.response_serializer = serializer
+        return serializer
+
+    def list(self, request, *args, **kwargs):
+        return self.add_included(super().list(request, *args, **kwargs))
+
+    def retrieve(self, request, *args, **kwargs):
+        return self.add_included(super().retrieve(request, *args, **kwargs))
+
+    def add_included(self, response):
+        """Attach side-loaded entities for the serializer used by ``response``."""
+        serializer = getattr(self, 'response_serializer', None)
+        if (
+            not sideload_requested(self.request)
+            or serializer is None
+            or serializer.instance is None
+            or not isinstance(response.data, dict)
+        ):
+            return response
+        if isinstance(serializer, serializers.ListSerializer):
+            root, instances = serializer.child, list(serializer.instance)
+        else:
+            root, instances = serializer, [serializer.instance]
+        if isinstance(root, ExpandableFieldsMixin):
+            response.data['included'] = included_entities(
+                type(root), instances, serializer.context, names=set(root.fields)
+            )
+        return response
+
+
+def included_entities(serializer_class, instances, context, names=None):
+    """
+    Serialize the side-loaded relations of ``instances`` once per entity.
+
+    Related objects are loaded by primary key with one query per collection
+    and level, and their own side-loaded relations are followed in turn.
+    ``names`` limits the top-level fields considered, for ``?fields=``.
+    """
+    included = defaultdict(dict)
+    pending = [(serializer_class, instances)]
+    while pending:
+        wanted = defaultdict(set)
+        loaders = {}
+        for owner_class, objects in pending:
+            model = owner_class.Meta.model
+            for name, collection in owner_class.sideload_fields.items():
+                if names is not None and name not in names:
+                    continue
+                serializer, kwargs = owner_class.expandable_fields[name]
+                field = model._meta.get_field(kwargs.get('source', name))
+                if name in owner_class.cached_fields:
+                    loader = _resolve(owner_class.cached_fields[name])
+                    for obj in objects:
+                        pk = getattr(obj, field.attname)
+                        if pk is not None and pk not in included[collection]:
+                            entity = loader(pk)
+                            if entity is not None:
+                                included[collection][pk] = entity
+                    continue
+                loaders[collection] = (_resolve(serializer), field.related_model)
+                for obj in objects:
+                    pk = getattr(obj, field.attname)
+                    if pk is not None and pk not in included[collection]:
+                        wanted[collection].add(pk)
+
+        pending = []
+        names = None
+        for collection, ids in wanted.items():
+            serializer, model = loaders[collection]
+            select, prefetch = _related_paths(serializer, model, None, None, sideload=True)
+            objects = list(
+                model._default_manager.select_related(*select)
+                .prefetch_related(*prefetch).filter(pk__in=ids)
+            )
+            data = serializer(objects, many=True, context=context, fields=None, expand=None).data
+            for obj, entity in zip(objects, data):
+                included[collection][obj.pk] = entity
+            if issubclass(serializer, ExpandableFieldsMixin) and serializer.sideload_fields:
+                pending.append((serializer, objects))
+
+    return {
+        collection: list(entities.values())
+        for collection, entities in included.items() if entities
+    }
+
+
+def _resolve(serializer):
+    return import_string(serializer) if isinstance(serializer, str) else serializer
+
+
+def _related_paths(serializer_class, model, sparse, expand, prefix='', many=False, sideload=False):
+    """Return ``(select_related, prefetch_related)`` lookups for the options."""
+    select, prefetch = [], []
+
+    def add(path, is_many):
+        (prefetch if is_many else select).append(path)
+
+    for name, relations in serializer_class.field_relations.items():
+        if sparse is None or name in sparse:
+            for relation in relations:
+                add(prefix + relation, many)
+
+    for name, (serializer, kwargs) in serializer_class.expandable_fields.items():
+        if sparse is not None and name not in sparse:
+            continue
+        if sideload and name in serializer_class.sideload_fields:
+            # Only the foreign key is rendered; the object is side-loaded.
+            continue
+        if name in serializer_class.cached_fields:
+            continue
+        source = kwargs.get('source', name)
+        field = model._meta.get_field(source)
+        is_many = many or field.one_to_many or field.many_to_many
+        path = prefix + source
+        subfields = (sparse or {}).get(name) or None
+        if expand is not None and name not in expand and not subfields:
+            if field.one_to_many or field.many_to_many:
+                # Only the primary keys are rendered.
+                prefetch.append(Prefetch(path, queryset=field.related_model.objects.only(
+                    'pk', *([field.field.name] if field.one_to_many else [])
+                )))
+            continue
+        add(path, is_many)
+        nested = _resolve(serializer)
+        if issubclass(nested, ExpandableFieldsMixin):
+            nested_select, nested_prefetch = _related_paths(
+                nested,
+                field.related_model,
+                subfields,
+                None if expand is None else expand.get(name, {}),
+                prefix=path + '__',
+                many=is_many,
+                sideload=sideload,
+            )
+            select += nested_select
+            prefetch += nested_prefetch
+    return select, prefetch
@@ -0,0 +1,149 @@
+"""
+Constant-memory CSV and NDJSON exports.
+
+Exports are generators of text lines fed from ``QuerySet.iterator()``, so
+rows are fetched through a server-side cursor in chunks and written out as
+they arrive; neither the queryset nor the output is ever held in memory.
+The same generators back the export API views and management commands.
+"""
+import csv
+import json
+from datetime import date, datetime
+
+from django.core.management.base import BaseCommand, CommandError
+from django.core.serializers.json import DjangoJSONEncoder
+from django.http import StreamingHttpResponse
+from rest_framework.exceptions import PermissionDenied, ValidationError
+from rest_framework.permissions import IsAuthenticated
+from rest_framework.views import APIView
+
+EXPORT_FORMATS = {
+    'csv': 'text/csv',
+    'ndjson': 'application/x-ndjson',
+}
+EXPORT_FORMAT_PARAM = 'export_format'
+CHUNK_SIZE = 2000
+
+
+class _Echo:
+    """File-like object whose ``write`` returns the line instead of storing it."""
+
+    def write(self, value):
+        return value
+
+
+def _cell(value):
+    if isinstance(value, (dict, list)):
+        return json.dumps(value, cls=DjangoJSONEncoder)
+    if isinstance(value, (date, datetime)):
+        return value.isoformat()
+    return '' if value is None else value
+
+
+def csv_lines(columns, rows):
+    """Yield a header line and one CSV line per row dict."""
+    writer = csv.writer(_Echo())
+    yield writer.writerow(columns)
+    for row in rows:
+        yield writer.writerow([_cell(row.get(column)) for column in columns])
+
+
+def ndjson_lines(records):
+    """Yield one JSON document per line."""
+    for record in records:
+        yield json.dumps(record, cls=DjangoJSONEncoder) + '\n'
+
+
+def export_lines(export_format, columns, records, flatten=None):
+    """
+    Render ``records`` in ``export_format``.
+
+    NDJSON keeps records nested; CSV writes ``flatten(records)`` (or the
+    records themselves) with ``columns`` as the header.
+    """
+    if export_format == 'ndjson':
+        return ndjson_lines(records)
+    return csv_lines(columns, flatten(records) if flatten else records)
+
+
+def export_response(lines, export_format, filename):
+    """Stream ``lines`` as a downloadable attachment."""
+    response = StreamingHttpResponse(lines, content_type=EXPORT_FORMATS[export_format])
+    response['Content-Disposition'] = f'attachment; filename="{filename}.{export_format}"'
+    response['Cache-Control'] = 'no-store'
+    return response
+
+
+class ExportView(APIView):
+    """
+    Admin-only streaming export.
+
+    ``?export_format=csv|ndjson`` picks the format (CSV by default); query
+    parameters named in ``filters`` are passed to ``get_records``.
+
+    Subclasses set ``filename``, ``columns`` and ``filters`` and implement
+    ``get_records(filters)``, returning an iterator of records and raising
+    ValueError for bad filter values. They may override ``flatten`` to turn
+    nested records into CSV row dicts.
+    """
+    permission_classes = (IsAuthenticated,)
+    filename = 'export'
+    columns = ()
+    filters = ()
+
+    def flatten(self, records):
+        """Turn records into CSV row dicts."""
+        return records
+
+    def get(self, request, *args, **kwargs):
+        if request.user.user_type != 'ADMIN':
+            raise PermissionDenied("Only admins can export data.")
+        export_format = request.query_params.get(EXPORT_FORMAT_PARAM, 'csv')
+        if export_format not in EXPORT_FORMATS:
+            raise ValidationError({EXPORT_FORMAT_PARAM: f"Choose one of: {', '.join(EXPORT_FORMATS)}."})
+        filters = {
+            name: request.query_params[name]
+            for name in self.filters if request.query_params.get(name)
+        }
+        try:
+            records = self.get_records(filters)
+        except ValueError as exc:
+            raise ValidationError(str(exc))
+        lines = export_lines(export_format, self.columns, records, self.flatten)
+        return export_response(lines, export_format, self.filename)
+
+
+class ExportCommand(BaseCommand):
+    """
+    Management command counterpart of :class:`ExportView`.
+
+    Subclasses set ``columns`` and ``filters`` and implement
+    ``get_records(filters, chunk_size)`` like the view's, fetching rows
+    ``chunk_size`` at a time.
+    """
+    columns = ()
+    filters = ()
+
+    def flatten(self, records):
+        return records
+
+    def add_arguments(self, parser):
+        parser.add_argument('--format', choices=list(EXPORT_FORMATS), default='csv')
+        parser.add_argument('--output', help="File to write; defaults to standard output.")
+        parser.add_argument('--chunk-size', type=int, default=CHUNK_SIZE)
+        for name in self.filters:
+            parser.add_argument(f"--{name.replace('_', '-')}", dest=name)
+
+    def handle(self, *args, format, output, chunk_size, **options):
+        filters = {name: options[name] for name in self.filters if options.get(name)}
+        try:
+            records = self.get_records(filters, chunk_size)
+        except ValueError as exc:
+            raise CommandError(str(exc))
+        lines = export_lines(format, self.columns, records, self.flatten)
+        if not output:
+            for line in lines:
+                self.stdout.write(line, ending='')
+            return
+        with open(output, 'w', newline='', encoding='utf-8') as handle:
+            handle.writelines(lines)
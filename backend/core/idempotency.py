@@ -0,0 +1,148 @@
+"""
+``Idempotency-Key`` support for mutating API requests.
+
+The first response to an unsafe request carrying an ``Idempotency-Key``
+header is stored per user and key for ``IDEMPOTENCY_TTL`` seconds; retries
+with the same key get that response replayed without running the view
+again. A retry that arrives while the first request is still running waits
+for it to finish (up to ``IDEMPOTENCY_WAIT_SECONDS``). Reusing a key for a
+different request is rejected.
+
+Entries live in the ``IDEMPOTENCY_CACHE`` cache, which must be shared by
+every process serving the API for retries to be caught across processes.
+"""
+import hashlib
+import json
+import time
+
+from django.conf import settings
+from django.core.cache import caches
+from rest_framework import status
+from rest_framework.response import Response
+from rest_framework.utils.encoders import JSONEncoder
+
+HEADER = 'Idempotency-Key'
+MAX_KEY_LENGTH = 255
+PENDING = 'pending'
+DONE = 'done'
+
+
+class _Replay(Exception):
+    """Short-circuits the view with an already determined response."""
+
+    def __init__(self, response):
+        self.response = response
+
+
+def _cache():
+    return caches[settings.IDEMPOTENCY_CACHE]
+
+
+def _error(message, status_code):
+    return Response({'error': message}, status=status_code)
+
+
+class IdempotencyMixin:
+    """
+    View mixin storing and replaying responses to requests with an
+    ``Idempotency-Key`` header.
+
+    Only authenticated unsafe requests are affected, after authentication
+    and permission checks. Responses with a 5xx status are not stored, so
+    the request can be retried.
+    """
+
+    def initial(self, request, *args, **kwargs):
+        super().initial(request, *args, **kwargs)
+        self._idempotency_key = None
+        key = request.headers.get(HEADER)
+        if key is None or request.method in ('GET', 'HEAD', 'OPTIONS'):
+            return
+        if not request.user.is_authenticated:
+            return
+        if not key or len(key) > MAX_KEY_LENGTH:
+            raise _Replay(_error(
+                f"{HEADER} must be 1 to {MAX_KEY_LENGTH} characters.", status.HTTP_400_BAD_REQUEST
+            ))
+
+        cache_key = 'idempotency:{}:{}'.format(
+            request.user.pk, hashlib.sha256(key.encode('utf-8')).hexdigest()
+        )
+        fingerprint = self.request_fingerprint(request)
+        if _cache().add(cache_key, {'state': PENDING, 'fingerprint': fingerprint},
+                        timeout=settings.IDEMPOTENCY_LOCK_TIMEOUT):
+            self._idempotency_key = cache_key
+            self._idempotency_fingerprint = fingerprint
+            return
+        raise _Replay(self.stored_response(cache_key, fingerprint))
+
+    def request_fingerprint(self, request):
+        """Hash of what makes a request the same request."""
+        body = json.dumps(request.data, cls=JSONEncoder, sort_keys=True, default=str)
+        payload = '\n'.join((request.method, request.path, body))
+        return hashlib.sha256(payload.encode('utf-8')).hexdigest()
+
+    def stored_response(self, cache_key, fingerprint):
+        """Response for a repeated key, waiting for an in-flight original."""
+        deadline = time.monotonic() + settings.IDEMPOTENCY_WAIT_SECONDS
+        delay = 0.05
+        while True:
+            entry = _cache().get(cache_key)
+            if entry is None:
+                # The original failed or its lock expired; let the client retry.
+                return _error(
+                    "The original request did not complete; retry it.", status.HTTP_409_CONFLICT
+                )
+            if entry['fingerprint'] != fingerprint:
+                return _error(
+                    f"{HEADER} was already used for a different request.",
+                    status.HTTP_422_UNPROCESSABLE_ENTITY,
+                )
+            if entry['state'] == DONE:
+                response = Response(json.loads(entry['body']), status=entry['status'])
+                for name, value in entry['headers'].items():
+                    response[name] = value
+                response['Idempotent-Replayed'] = 'true'
+                return response
+            if time.monotonic() >= deadline:
+                response = _error(
+                    "A request with this Idempotency-Key is still in progress.",
+                    status.HTTP_409_CONFLICT,
+                )
+                response['Retry-After'] = '1'
+                return response
+            time.sleep(delay)
+            delay = min(delay * 2, 0.5)
+
+    def handle_exception(self, exc):
+        if isinstance(exc, _Replay):
+            return exc.response
+        try:
+            return super().handle_exception(exc)
+        except Exception:
+            self._release_idempotency_key()
+            raise
+
+    def finalize_response(self, request, response, *args, **kwargs):
+        response = super().finalize_response(request, response, *args, **kwargs)
+        cache_key = getattr(self, '_idempotency_key', None)
+        if cache_key is None:
+            return response
+        if response.status_code >= 500 or not isinstance(response, Response):
+            self._release_idempotency_key()
+            return response
+        _cache().set(cache_key, {
+            'state': DONE,
+            'fingerprint': self._idempotency_fingerprint,
+            'status': response.status_code,
+            'body': json.dumps(response.data, cls=JSONEncoder),
+            'headers': {name: response[name] for name in ('Location',) if response.has_header(name)},
+        }, timeout=settings.IDEMPOTENCY_TTL)
+        self._idempotency_key = None
+        return response
+
+    def _release_idempotency_key(self):
+        cache_key = getattr(self, '_idempotency_key', None)
+        if cache_key is not None:
+            _cache().delete(cache_key)
+            self._idempotency_key = None
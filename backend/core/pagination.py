@@ -0,0 +1,204 @@
+"""Shared pagination classes for the API."""
+import datetime
+import decimal
+import json
+import uuid
+from collections import OrderedDict
+
+from django.core import signing
+from django.db.models import F, OrderBy, Q
+from rest_framework.exceptions import NotFound
+from rest_framework.pagination import PageNumberPagination
+from rest_framework.response import Response
+from rest_framework.utils.urls import remove_query_param, replace_query_param
+
+
+class CursorEncoder(json.JSONEncoder):
+    """JSON encoder that keeps full precision for ordering values."""
+
+    def default(self, o):
+        if isinstance(o, (datetime.datetime, datetime.date, datetime.time)):
+            return o.isoformat()
+        if isinstance(o, (decimal.Decimal, uuid.UUID)):
+            return str(o)
+        return super().default(o)
+
+
+class CursorSerializer:
+    """Serializer for ``django.core.signing`` using :class:`CursorEncoder`."""
+
+    def dumps(self, obj):
+        return json.dumps(obj, separators=(',', ':'), cls=CursorEncoder).encode('latin-1')
+
+    def loads(self, data):
+        return json.loads(data.decode('latin-1'))
+
+
+class KeysetPagination(PageNumberPagination):
+    """
+    Page-number pagination with an opt-in keyset (cursor) mode.
+
+    Requests without a ``cursor`` query parameter behave exactly like
+    ``PageNumberPagination``. Passing ``?cursor=`` (empty for the first page)
+    switches to keyset mode: pages are selected with a ``WHERE`` clause on the
+    queryset's ordering columns instead of ``OFFSET``, no ``COUNT(*)`` is run,
+    and the response carries opaque ``next``/``previous`` cursors.
+
+    The ordering is taken from the queryset (or the model's default ordering)
+    and always ends with the primary key, so ties are broken stably. Ordering
+    columns may be model fields, related fields or annotations.
+    """
+
+    cursor_query_param = 'cursor'
+    cursor_salt = 'core.pagination.keyset'
+    invalid_cursor_message = 'Invalid cursor.'
+
+    keyset = False
+
+    def paginate_queryset(self, queryset, request, view=None):
+        if self.cursor_query_param not in request.query_params:
+            self.keyset = False
+            return super().paginate_queryset(queryset, request, view)
+
+        ordering = self.get_ordering(queryset)
+        if ordering is None:
+            # Random or expression orderings cannot be keyset paginated.
+            self.keyset = False
+            return super().paginate_queryset(queryset, request, view)
+
+        self.keyset = True
+        self.request = request
+        self.ordering = ordering
+        self.page_size = self.get_page_size(request)
+
+        position, reverse = self.decode_cursor(request)
+        queryset = queryset.order_by(*self._order_by(ordering, reverse))
+        if position is not None:
+            queryset = queryset.filter(self._after(ordering, position, reverse))
+
+        results = list(queryset[:self.page_size + 1])
+        has_more = len(results) > self.page_size
+        results = results[:self.page_size]
+        if reverse:
+            results.reverse()
+            self.has_next = position is not None
+            self.has_previous = has_more
+        else:
+            self.has_next = has_more
+            self.has_previous = position is not None
+
+        self.page_results = results
+        return results
+
+    def get_ordering(self, queryset):
+        """
+        Return the ordering as ``[(field_name, descending), ...]``.
+
+        The primary key is appended as a tie-breaker. Returns ``None`` when
+        the ordering cannot be expressed as a keyset.
+        """
+        query = queryset.query
+        raw = list(query.order_by) if query.order_by else list(queryset.model._meta.ordering)
+        ordering = []
+        for item in raw:
+            if isinstance(item, str):
+                if item == '?' or '.' in item:
+                    return None
+                ordering.append((item.lstrip('-'), item.startswith('-')))
+            elif isinstance(item, OrderBy) and isinstance(item.expression, F):
+                ordering.append((item.expression.name, item.descending))
+            else:
+                return None
+
+        pk_names = {'pk', queryset.model._meta.pk.name}
+        if not any(name in pk_names for name, _ in ordering):
+            descending = ordering[-1][1] if ordering else False
+            ordering.append(('pk', descending))
+        return ordering
+
+    def _order_by(self, ordering, reverse):
+        return [
+            '-' + name if descending != reverse else name
+            for name, descending in ordering
+        ]
+
+    def _after(self, ordering, position, reverse):
+        """Build the keyset predicate selecting rows after ``position``."""
+        condition = Q(pk__in=[])
+        equal = Q()
+        for (name, descending), value in zip(ordering, position):
+            condition |= equal & self._beyond(name, value, descending != reverse)
+            if value is None:
+                equal &= Q(**{f'{name}__isnull': True})
+            else:
+                equal &= Q(**{name: value})
+        return condition
+
+    def _beyond(self, name, value, descending):
+        """Predicate for rows strictly past ``value`` (PostgreSQL null order)."""
+        if value is None:
+            # NULLs sort last ascending and first descending.
+            return Q(**{f'{name}__isnull': False}) if descending else Q(pk__in=[])
+        lookup = 'lt' if descending else 'gt'
+        beyond = Q(**{f'{name}__{lookup}': value})
+        if not descending:
+            beyond |= Q(**{f'{name}__isnull': True})
+        return beyond
+
+    def _position(self, obj):
+        position = []
+        for name, _ in self.ordering:
+            value = obj
+            for attr in name.split('__'):
+                value = getattr(value, attr, None)
+                if value is None:
+                    break
+            position.append(value)
+        return position
+
+    def encode_cursor(self, obj, reverse):
+        payload = {'p': self._position(obj), 'r': reverse}
+        return signing.dumps(
+            payload, salt=self.cursor_salt, serializer=CursorSerializer, compress=True
+        )
+
+    def decode_cursor(self, request):
+        """Return ``(position, reverse)``; an empty cursor is the first page."""
+        encoded = request.query_params.get(self.cursor_query_param)
+        if not encoded:
+            return None, False
+        try:
+            payload = signing.loads(encoded, salt=self.cursor_salt, serializer=CursorSerializer)
+            position, reverse = payload['p'], bool(payload['r'])
+        except (signing.BadSignature, KeyError, TypeError):
+            raise NotFound(self.invalid_cursor_message)
+        if not isinstance(position, list) or len(position) != len(self.ordering):
+            raise NotFound(self.invalid_cursor_message)
+        return position, reverse
+
+    def _link(self, obj, reverse):
+        url = remove_query_param(self.request.build_absolute_uri(), self.page_query_param)
+        return replace_query_param(url, self.cursor_query_param, self.encode_cursor(obj, reverse))
+
+    def get_next_link(self):
+        if not self.keyset:
+            return super().get_next_link()
+        if not self.has_next or not self.page_results:
+            return None
+        return self._link(self.page_results[-1], reverse=False)
+
+    def get_previous_link(self):
+        if not self.keyset:
+            return super().get_previous_link()
+        if not self.has_previous or not self.page_results:
+            return None
+        return self._link(self.page_results[0], reverse=True)
+
+    def get_paginated_response(self, data):
+        if not self.keyset:
+            return super().get_paginated_response(data)
+        return Response(OrderedDict([
+            ('next', self.get_next_link()),
+            ('previous', self.get_previous_link()),
+            ('results', data),
+        ]))
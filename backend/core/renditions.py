@@ -0,0 +1,162 @@
+"""
+Background image rendition pipeline.
+
+Uploaded profile pictures and portfolio images are resized into a fixed set
+of WebP and JPEG renditions by a local process pool, after the request that
+stored them has committed. Workers only touch the filesystem; the parent
+process records the resulting paths on the owning row so serializers can
+expose rendition URLs without any extra queries.
+"""
+import logging
+import multiprocessing
+import os
+import threading
+from concurrent.futures import ProcessPoolExecutor
+
+from django.conf import settings
+from django.core.files.storage import default_storage
+from django.db import connections, transaction
+
+logger = logging.getLogger(__name__)
+
+RENDITION_DIR = 'renditions'
+RENDITION_FORMATS = {
+    'webp': ('WEBP', 'webp'),
+    'jpeg': ('JPEG', 'jpg'),
+}
+
+_executor = None
+_executor_lock = threading.Lock()
+
+
+def rendition_name(source_name, size):
+    """Return the storage name (without extension) for a rendition."""
+    stem = os.path.splitext(source_name.lstrip('/'))[0]
+    return f'{RENDITION_DIR}/{stem}_{size}'
+
+
+def render_image(source_path, media_root, source_name, sizes, quality):
+    """
+    Write every rendition of one image and return ``{size: {format: name}}``.
+
+    Runs inside a worker process, so it must not use Django settings, storage
+    or the database.
+    """
+    from PIL import Image, ImageOps
+
+    renditions = {}
+    with Image.open(source_path) as image:
+        image = ImageOps.exif_transpose(image)
+        if image.mode not in ('RGB', 'RGBA'):
+            image = image.convert('RGBA' if 'A' in image.getbands() else 'RGB')
+
+        for size, max_edge in sizes.items():
+            resized = image.copy()
+            resized.thumbnail((max_edge, max_edge), Image.Resampling.LANCZOS)
+            base_name = rendition_name(source_name, size)
+            os.makedirs(os.path.dirname(os.path.join(media_root, base_name)), exist_ok=True)
+
+            renditions[size] = {}
+            for key, (pil_format, extension) in RENDITION_FORMATS.items():
+                name = f'{base_name}.{extension}'
+                output = resized
+                if pil_format == 'JPEG' and output.mode != 'RGB':
+                    output = output.convert('RGB')
+                output.save(
+                    os.path.join(media_root, name),
+                    pil_format,
+                    quality=quality,
+                    optimize=True,
+                )
+                renditions[size][key] = name
+    return renditions
+
+
+def render_images(jobs, media_root, sizes, quality):
+    """Render several ``(source_name, source_path)`` jobs; skip broken or oversized files."""
+    from PIL import Image
+
+    results = {}
+    for source_name, source_path in jobs:
+        try:
+            results[source_name] = render_image(source_path, media_root, source_name, sizes, quality)
+        except (OSError, ValueError, Image.DecompressionBombError) as exc:
+            logger.warning("Skipping renditions of %s: %s", source_name, exc)
+            results[source_name] = {'error': str(exc)}
+    return results
+
+
+def get_executor():
+    """Return the shared rendition process pool, creating it on first use."""
+    global _executor
+    with _executor_lock:
+        if _executor is None:
+            _executor = ProcessPoolExecutor(
+                max_workers=settings.IMAGE_RENDITION_WORKERS,
+                mp_context=multiprocessing.get_context('spawn'),
+            )
+        return _executor
+
+
+def local_path(source_name):
+    """Filesystem path of a stored image, or ``None`` if it is not local."""
+    if not source_name or '://' in source_name:
+        return None
+    try:
+        path = default_storage.path(source_name.lstrip('/'))
+    except NotImplementedError:
+        return None
+    return path if os.path.isfile(path) else None
+
+
+def submit(source_names, on_done=None):
+    """
+    Render ``source_names`` in the process pool.
+
+    ``on_done(results)`` is called from a pool thread when rendering
+    finishes. Sources that are not local files are ignored. Returns the
+    future, or ``None`` when there was nothing to render.
+    """
+    jobs = [(name, local_path(name)) for name in source_names]
+    jobs = [(name, path) for name, path in jobs if path]
+    if not jobs:
+        return None
+
+    future = get_executor().submit(
+        render_images,
+        jobs,
+        str(settings.MEDIA_ROOT),
+        dict(settings.IMAGE_RENDITION_SIZES),
+        settings.IMAGE_RENDITION_QUALITY,
+    )
+    if on_done is None:
+        return future
+
+    def callback(done):
+        try:
+            on_done(done.result())
+        except Exception:
+            logger.exception("Failed to store image renditions for %s", source_names)
+        finally:
+            connections.close_all()
+
+    future.add_done_callback(callback)
+    return future
+
+
+def schedule(source_names, on_done):
+    """Submit a rendition job once the current transaction commits."""
+    transaction.on_commit(lambda: submit(source_names, on_done))
+
+
+def rendition_urls(renditions, request=None):
+    """Map stored rendition names to (absolute, when possible) URLs."""
+    urls = {}
+    for size, formats in (renditions or {}).items():
+        if not isinstance(formats, dict) or size == 'error':
+            continue
+        urls[size] = {}
+        for key, name in formats.items():
+            url = default_storage.url(name)
+            urls[size][key] = request.build_absolute_uri(url) if request else url
+    return urls
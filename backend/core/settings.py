@@ -12,6 +12,7 @@ https://docs.djangoproject.com/en/6.0/ref/settings/
 
 from pathlib import Path
 from datetime import timedelta
+from corsheaders.defaults import default_headers
 import environ
 
 # Build paths inside the project like this: BASE_DIR / 'subdir'.
@@ -48,6 +49,7 @@ INSTALLED_APPS = [
     'django.contrib.sessions',
     'django.contrib.messages',
     'django.contrib.staticfiles',
+    'django.contrib.postgres',
     'rest_framework',
     'rest_framework_simplejwt',
     'rest_framework_simplejwt.token_blacklist',
@@ -57,6 +59,8 @@ INSTALLED_APPS = [
     'tailors',
     'orders',
     'measurements',
+    'reviews',
+    'sync',
 ]
 
 # Custom User Model
@@ -185,10 +189,96 @@ CORS_ALLOWED_ORIGINS = [
 
 CORS_ALLOW_CREDENTIALS = True
 
-# Cache Configuration (for password reset tokens)
+CORS_ALLOW_HEADERS = (*default_headers, 'idempotency-key', 'last-event-id')
+
+# Cache Configuration (for password reset tokens and API response caches).
+# Use a shared backend (e.g. Redis or Memcached) in production so cache
+# invalidation reaches every worker process.
 CACHES = {
     'default': {
         'BACKEND': 'django.core.cache.backends.locmem.LocMemCache',
         'LOCATION': 'unique-snowflake',
     }
 }
+
+# Tailor directory "near me" search
+TAILOR_NEARBY_DEFAULT_RADIUS_KM = env.float('TAILOR_NEARBY_DEFAULT_RADIUS_KM', default=10.0)
+TAILOR_NEARBY_MAX_RADIUS_KM = env.float('TAILOR_NEARBY_MAX_RADIUS_KM', default=100.0)
+
+# Tailor directory full-text search
+TAILOR_SEARCH_CONFIG = env('TAILOR_SEARCH_CONFIG', default='english')
+
+# Tailor directory response cache
+TAILOR_DIRECTORY_CACHE_TIMEOUT = env.int('TAILOR_DIRECTORY_CACHE_TIMEOUT', default=300)
+
+# Image renditions generated in a background process pool
+IMAGE_RENDITION_SIZES = {
+    'thumb': 160,
+    'small': 480,
+    'medium': 1080,
+}
+IMAGE_RENDITION_QUALITY = env.int('IMAGE_RENDITION_QUALITY', default=80)
+IMAGE_RENDITION_WORKERS = env.int('IMAGE_RENDITION_WORKERS', default=2)
+
+# Tailor recommendation ranking (?sort=recommended)
+TAILOR_RECOMMENDATION_WEIGHTS = {
+    'distance': 3.0,
+    'rating': 2.0,
+    'reviews': 1.0,
+    'specialization': 1.5,
+    'workload': 1.0,
+}
+TAILOR_RECOMMENDATION_DISTANCE_SCALE_KM = env.float('TAILOR_RECOMMENDATION_DISTANCE_SCALE_KM', default=5.0)
+TAILOR_RECOMMENDATION_REVIEW_PRIOR = 5
+TAILOR_RECOMMENDATION_REFRESH_SECONDS = env.int('TAILOR_RECOMMENDATION_REFRESH_SECONDS', default=5)
+TAILOR_RECOMMENDATION_REBUILD_SECONDS = env.int('TAILOR_RECOMMENDATION_REBUILD_SECONDS', default=600)
+# Seconds of changes re-read on each refresh, for transactions that commit late.
+TAILOR_RECOMMENDATION_OVERLAP_SECONDS = env.int('TAILOR_RECOMMENDATION_OVERLAP_SECONDS', default=60)
+
+# Orders
+ORDER_BATCH_MAX_SIZE = env.int('ORDER_BATCH_MAX_SIZE', default=100)
+# Closed orders untouched for this long are moved to the archive tables by
+# the archive_orders command.
+ORDER_ARCHIVE_AFTER_DAYS = env.int('ORDER_ARCHIVE_AFTER_DAYS', default=180)
+
+# Real-time order events (orders.realtime). Use the database broker when the
+# API runs in more than one process.
+ORDER_EVENT_BROKER = env('ORDER_EVENT_BROKER', default='orders.realtime.InProcessBroker')
+ORDER_EVENT_POLL_INTERVAL = env.float('ORDER_EVENT_POLL_INTERVAL', default=1.0)
+ORDER_EVENT_STREAM_KEEPALIVE = env.int('ORDER_EVENT_STREAM_KEEPALIVE', default=15)
+ORDER_EVENT_STREAM_RETRY_MS = env.int('ORDER_EVENT_STREAM_RETRY_MS', default=3000)
+ORDER_EVENT_STREAM_QUEUE_SIZE = env.int('ORDER_EVENT_STREAM_QUEUE_SIZE', default=256)
+# Seconds after creation in which an event may still commit behind later ones.
+ORDER_EVENT_COMMIT_GRACE = env.int('ORDER_EVENT_COMMIT_GRACE', default=10)
+
+# Delta sync (sync app)
+SYNC_OVERLAP_SECONDS = env.int('SYNC_OVERLAP_SECONDS', default=60)
+SYNC_TOMBSTONE_RETENTION_DAYS = env.int('SYNC_TOMBSTONE_RETENTION_DAYS', default=30)
+
+# Idempotency-Key replay (core.idempotency). Point at a cache shared by all
+# API processes in production.
+IDEMPOTENCY_CACHE = env('IDEMPOTENCY_CACHE', default='default')
+IDEMPOTENCY_TTL = env.int('IDEMPOTENCY_TTL', default=24 * 60 * 60)
+IDEMPOTENCY_LOCK_TIMEOUT = env.int('IDEMPOTENCY_LOCK_TIMEOUT', default=60)
+IDEMPOTENCY_WAIT_SECONDS = env.float('IDEMPOTENCY_WAIT_SECONDS', default=5.0)
+
+# Measurement template registry (measurements.registry)
+MEASUREMENT_TEMPLATE_REGISTRY_CHECK_SECONDS = env.int('MEASUREMENT_TEMPLATE_REGISTRY_CHECK_SECONDS', default=5)
+MEASUREMENT_TEMPLATE_MAX_AGE = env.int('MEASUREMENT_TEMPLATE_MAX_AGE', default=3 * 24 * 60 * 60)
+
+# Measurement payload validation (measurements.schema)
+MEASUREMENT_MAX_FIELDS = env.int('MEASUREMENT_MAX_FIELDS', default=100)
+
+# Measurement history (measurements.history): every Nth revision stores the
+# full state, bounding how many deltas are replayed to rebuild a revision.
+MEASUREMENT_SNAPSHOT_INTERVAL = env.int('MEASUREMENT_SNAPSHOT_INTERVAL', default=10)
+
+# Size recommendations and similar-customer search (measurements.recommendation)
+MEASUREMENT_RECOMMENDATION_REFRESH_SECONDS = env.int('MEASUREMENT_RECOMMENDATION_REFRESH_SECONDS', default=5)
+MEASUREMENT_RECOMMENDATION_REBUILD_SECONDS = env.int('MEASUREMENT_RECOMMENDATION_REBUILD_SECONDS', default=600)
+# Seconds of changes re-read on each refresh, for transactions that commit late.
+MEASUREMENT_RECOMMENDATION_OVERLAP_SECONDS = env.int('MEASUREMENT_RECOMMENDATION_OVERLAP_SECONDS', default=60)
+# Share of the query's fields a candidate must also have to be compared.
+MEASUREMENT_RECOMMENDATION_MIN_SHARED = env.float('MEASUREMENT_RECOMMENDATION_MIN_SHARED', default=0.5)
+# Clusters scanned per query in large tables; more is slower but more exact.
+MEASUREMENT_RECOMMENDATION_PROBES = env.int('MEASUREMENT_RECOMMENDATION_PROBES', default=16)
@@ -0,0 +1,8 @@
+"""Helpers shared by the apps' test suites."""
+from unittest import skipUnless
+
+from django.db import connection
+
+# Saving a tailor profile refreshes its full-text search columns, and some
+# features run PostgreSQL-only statements, so tests touching them need it.
+requires_postgresql = skipUnless(connection.vendor == 'postgresql', "Requires PostgreSQL.")
@@ -23,4 +23,6 @@ urlpatterns = [
     path('api/tailors/', include('tailors.urls')),
     path('api/measurements/', include('measurements.urls')),
     path('api/orders/', include('orders.urls')),
+    path('api/reviews/', include('reviews.urls')),
+    path('api/sync/', include('sync.urls')),
 ]
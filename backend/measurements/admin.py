@@ -1,11 +1,20 @@
 from django.contrib import admin
-from .models import MeasurementTemplate, CustomerMeasurement
+from .models import MeasurementTemplate, CustomerMeasurement, StandardSize
+
+
+class StandardSizeInline(admin.TabularInline):
+    """Standard sizes edited on their template."""
+    
+    model = StandardSize
+    extra = 0
+    fields = ('name', 'measurements')
 
 
 @admin.register(MeasurementTemplate)
 class MeasurementTemplateAdmin(admin.ModelAdmin):
     """Admin configuration for MeasurementTemplate model."""
     
+    inlines = (StandardSizeInline,)
     list_display = ('name', 'measurement_type', 'created_at')
     list_filter = ('measurement_type', 'created_at')
     search_fields = ('name', 'description')
@@ -3,3 +3,6 @@ from django.apps import AppConfig
 
 class MeasurementsConfig(AppConfig):
     name = 'measurements'
+
+    def ready(self):
+        from . import signals  # noqa: F401
@@ -0,0 +1,41 @@
+"""Customer measurement exports; see ``core.exports``."""
+from datetime import date
+
+from core.exports import CHUNK_SIZE
+from .models import CustomerMeasurement
+
+COLUMNS = [
+    'id', 'customer_id', 'customer_email', 'template_id', 'template_name',
+    'measurement_type', 'measurements', 'notes', 'created_at', 'updated_at',
+]
+
+FILTERS = ('created_after', 'created_before', 'customer', 'measurement_type')
+
+
+def filter_measurements(queryset, filters):
+    """
+    Apply ``created_after``/``created_before`` (YYYY-MM-DD, inclusive),
+    ``customer`` (user id) and ``measurement_type`` filters. Raises ValueError.
+    """
+    if filters.get('created_after'):
+        queryset = queryset.filter(created_at__date__gte=date.fromisoformat(filters['created_after']))
+    if filters.get('created_before'):
+        queryset = queryset.filter(created_at__date__lte=date.fromisoformat(filters['created_before']))
+    if filters.get('customer'):
+        queryset = queryset.filter(customer_id=int(filters['customer']))
+    if filters.get('measurement_type'):
+        queryset = queryset.filter(template__measurement_type=filters['measurement_type'])
+    return queryset
+
+
+def measurement_records(filters=None, chunk_size=CHUNK_SIZE):
+    """
+    Return an iterator of one dict per customer measurement, oldest first.
+    Filters are validated immediately, before anything is streamed.
+    """
+    queryset = filter_measurements(CustomerMeasurement.objects.all(), filters or {})
+    rows = queryset.order_by('id').values_list(
+        'id', 'customer_id', 'customer__email', 'template_id', 'template__name',
+        'template__measurement_type', 'measurements', 'notes', 'created_at', 'updated_at',
+    )
+    return (dict(zip(COLUMNS, row)) for row in rows.iterator(chunk_size=chunk_size))
@@ -0,0 +1,63 @@
+from rest_framework import filters
+from rest_framework.exceptions import ValidationError
+from .models import MeasurementTemplate
+from .projection import value_filter
+from .registry import get_registry
+from .schema import CM_PER_UNIT, UNITS
+
+MEASUREMENT_TYPES = [code for code, _ in MeasurementTemplate.MEASUREMENT_TYPE_CHOICES]
+
+
+class MeasurementRangeFilter(filters.BaseFilterBackend):
+    """
+    Filter measurements on their values through ``measurements.projection``.
+
+    ``?range=chest:110:`` keeps measurements with a chest of at least 110,
+    ``?range=waist::90`` of at most 90 and ``?range=chest:100:110`` in
+    between, bounds inclusive; repeated ``range`` parameters must all
+    match. Bounds are in cm, or in another unit given with ``?unit=in``.
+    ``?measurement_type=`` and ``?template=`` restrict the templates.
+    """
+
+    range_param = 'range'
+    unit_param = 'unit'
+
+    def get_scale(self, request):
+        unit = request.query_params.get(self.unit_param) or 'cm'
+        if unit not in CM_PER_UNIT:
+            raise ValidationError({self.unit_param: f"Must be one of {', '.join(UNITS)}."})
+        return CM_PER_UNIT[unit]
+
+    def parse_range(self, value, scale):
+        try:
+            key, low, high = value.rsplit(':', 2)
+            bounds = [float(bound) * scale if bound else None for bound in (low, high)]
+        except ValueError:
+            raise ValidationError({self.range_param: "Expected 'field:min:max' with numeric bounds."})
+        if not key or bounds == [None, None]:
+            raise ValidationError({self.range_param: "Expected a field and at least one bound."})
+        return key, *bounds
+
+    def filter_queryset(self, request, queryset, view):
+        params = request.query_params
+        measurement_type = params.get('measurement_type')
+        if measurement_type:
+            if measurement_type not in MEASUREMENT_TYPES:
+                raise ValidationError({'measurement_type': "Unknown measurement type."})
+            # Resolve the type from the template registry instead of joining.
+            queryset = queryset.filter(template_id__in=[
+                template.pk for template in get_registry().templates.values()
+                if template.measurement_type == measurement_type
+            ])
+        if params.get('template'):
+            try:
+                queryset = queryset.filter(template_id=int(params['template']))
+            except ValueError:
+                raise ValidationError({'template': "Must be a template id."})
+
+        ranges = params.getlist(self.range_param)
+        if ranges:
+            scale = self.get_scale(request)
+            for value in ranges:
+                queryset = queryset.filter(value_filter(*self.parse_range(value, scale)))
+        return queryset
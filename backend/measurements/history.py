@@ -0,0 +1,129 @@
+"""
+Measurement history.
+
+Every saved change to a customer measurement's template, values or notes
+is recorded as a numbered ``MeasurementRevision``. The first revision and
+then every ``MEASUREMENT_SNAPSHOT_INTERVAL``-th one store the full state;
+the revisions in between only store the changes since the previous one::
+
+    {"set": {"chest": 102}, "unset": ["hip"], "notes": "Looser fit"}
+
+A revision is rebuilt by replaying the deltas after the nearest snapshot,
+which reads at most ``MEASUREMENT_SNAPSHOT_INTERVAL`` rows in one query.
+"""
+from django.conf import settings
+from django.db import transaction
+from django.db.models import Subquery
+from .models import CustomerMeasurement, MeasurementRevision
+
+
+def diff_states(old, new):
+    """Return the delta turning state ``old`` into ``new``."""
+    delta = {key: new[key] for key in ('template', 'notes') if old[key] != new[key]}
+    before, after = old['measurements'], new['measurements']
+    if not isinstance(before, dict) or not isinstance(after, dict):
+        if before != after:
+            delta['measurements'] = after
+        return delta
+    changed = {name: value for name, value in after.items() if name not in before or before[name] != value}
+    removed = [name for name in before if name not in after]
+    if changed:
+        delta['set'] = changed
+    if removed:
+        delta['unset'] = removed
+    return delta
+
+
+def apply_delta(state, delta):
+    """Return ``state`` with ``delta`` applied."""
+    state = {**state, **{key: delta[key] for key in ('template', 'notes', 'measurements') if key in delta}}
+    if 'set' in delta or 'unset' in delta:
+        values = dict(state['measurements'])
+        values.update(delta.get('set', {}))
+        for name in delta.get('unset', ()):
+            values.pop(name, None)
+        state['measurements'] = values
+    return state
+
+
+def revision_chain(measurement_id, number=None):
+    """
+    Revisions from the last snapshot up to revision ``number`` (the latest
+    when None), oldest first.
+    """
+    revisions = MeasurementRevision.objects.filter(measurement_id=measurement_id)
+    if number is not None:
+        revisions = revisions.filter(number__lte=number)
+    snapshot = revisions.filter(is_snapshot=True).order_by('-number').values('number')[:1]
+    return list(revisions.filter(number__gte=Subquery(snapshot)).order_by('number'))
+
+
+def rebuild(chain):
+    """Return the state after the last revision of ``chain``."""
+    state = chain[0].data
+    for revision in chain[1:]:
+        state = apply_delta(state, revision.data)
+    return state
+
+
+def get_revision(measurement_id, number):
+    """Return ``(revision, state)`` for revision ``number``, or None."""
+    chain = revision_chain(measurement_id, number)
+    if not chain or chain[-1].number != number:
+        return None
+    return chain[-1], rebuild(chain)
+
+
+def record_revision(measurement_id):
+    """
+    Record the current state of a measurement as a new revision unless it
+    is unchanged. Returns the revision, or None.
+    """
+    with transaction.atomic():
+        # Lock the row so concurrent saves are numbered one after another.
+        row = CustomerMeasurement.objects.select_for_update().filter(pk=measurement_id).values(
+            'template_id', 'measurements', 'notes'
+        ).first()
+        if row is None:
+            return None
+        state = {'template': row['template_id'], 'measurements': row['measurements'], 'notes': row['notes']}
+        chain = revision_chain(measurement_id)
+        if chain:
+            previous = rebuild(chain)
+            if previous == state:
+                return None
+            number = chain[-1].number + 1
+            is_snapshot = number - chain[0].number >= settings.MEASUREMENT_SNAPSHOT_INTERVAL
+        else:
+            number, is_snapshot = 1, True
+        return MeasurementRevision.objects.create(
+            measurement_id=measurement_id,
+            number=number,
+            is_snapshot=is_snapshot,
+            data=state if is_snapshot else diff_states(previous, state),
+        )
+
+
+def compare_states(old, new):
+    """
+    Changes between two states as ``{'from', 'to'}`` pairs, per measurement
+    under ``measurements``.
+    """
+    changes = {
+        key: {'from': old[key], 'to': new[key]}
+        for key in ('template', 'notes') if old[key] != new[key]
+    }
+    before, after = old['measurements'], new['measurements']
+    if not isinstance(before, dict) or not isinstance(after, dict):
+        # Values stored before payload validation may not be a mapping.
+        if before != after:
+            changes['measurements'] = {'from': before, 'to': after}
+        return changes
+    measurements = {
+        name: {'from': before.get(name), 'to': after.get(name)}
+        for name in {**before, **after}
+        if name not in before or name not in after or before[name] != after[name]
+    }
+    if measurements:
+        changes['measurements'] = measurements
+    return changes
@@ -0,0 +1,11 @@
+from core.exports import ExportCommand
+from measurements.exports import COLUMNS, FILTERS, measurement_records
+
+
+class Command(ExportCommand):
+    help = "Stream customer measurements as CSV or NDJSON."
+    columns = COLUMNS
+    filters = FILTERS
+
+    def get_records(self, filters, chunk_size):
+        return measurement_records(filters, chunk_size)
@@ -0,0 +1,19 @@
+# Generated by Django 6.0 on 2026-10-18 04:31
+
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('measurements', '0001_initial'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='customermeasurement',
+            index=models.Index(fields=['customer', '-created_at', '-id'], name='measurement_customer_idx'),
+        ),
+    ]
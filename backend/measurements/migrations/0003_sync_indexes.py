@@ -0,0 +1,19 @@
+# Generated by Django 6.0 on 2026-10-18 05:00
+
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('measurements', '0002_keyset_indexes'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='customermeasurement',
+            index=models.Index(fields=['customer', 'updated_at'], name='measurement_customer_upd_idx'),
+        ),
+    ]
@@ -0,0 +1,18 @@
+# Generated by Django 6.0 on 2026-10-18 05:08
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('measurements', '0003_sync_indexes'),
+    ]
+
+    operations = [
+        migrations.AlterField(
+            model_name='measurementtemplate',
+            name='standard_measurements',
+            field=models.JSONField(default=dict, help_text='Measurement fields of this template mapped to their unit, min, max and required flag; see measurements.schema'),
+        ),
+    ]
@@ -0,0 +1,54 @@
+# Generated by Django 6.0 on 2026-10-18 05:10
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+def snapshot_existing(apps, schema_editor):
+    """Start the history of every existing measurement with a snapshot."""
+    CustomerMeasurement = apps.get_model('measurements', 'CustomerMeasurement')
+    MeasurementRevision = apps.get_model('measurements', 'MeasurementRevision')
+    rows = CustomerMeasurement.objects.order_by('id').values_list(
+        'id', 'template_id', 'measurements', 'notes'
+    )
+    batch = []
+    for pk, template_id, measurements, notes in rows.iterator(chunk_size=1000):
+        batch.append(MeasurementRevision(
+            measurement_id=pk,
+            number=1,
+            is_snapshot=True,
+            data={'template': template_id, 'measurements': measurements, 'notes': notes},
+        ))
+        if len(batch) == 1000:
+            MeasurementRevision.objects.bulk_create(batch)
+            batch = []
+    MeasurementRevision.objects.bulk_create(batch)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('measurements', '0004_template_schema'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='MeasurementRevision',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('number', models.PositiveIntegerField()),
+                ('is_snapshot', models.BooleanField(default=False)),
+                ('data', models.JSONField()),
+                ('created_at', models.DateTimeField(auto_now_add=True)),
+                ('measurement', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='revisions', to='measurements.customermeasurement')),
+            ],
+            options={
+                'verbose_name': 'Measurement Revision',
+                'verbose_name_plural': 'Measurement Revisions',
+                'ordering': ['measurement', 'number'],
+                'indexes': [models.Index(condition=models.Q(('is_snapshot', True)), fields=['measurement', 'number'], name='measurement_snapshot_idx')],
+                'constraints': [models.UniqueConstraint(fields=('measurement', 'number'), name='measurement_revision_unique')],
+            },
+        ),
+        migrations.RunPython(snapshot_existing, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,31 @@
+# Generated by Django 6.0 on 2026-10-18 05:14
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('measurements', '0005_revisions'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='StandardSize',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('name', models.CharField(max_length=50)),
+                ('measurements', models.JSONField(default=dict, help_text="Values of the template's measurement fields for this size")),
+                ('created_at', models.DateTimeField(auto_now_add=True)),
+                ('updated_at', models.DateTimeField(auto_now=True)),
+                ('template', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='standard_sizes', to='measurements.measurementtemplate')),
+            ],
+            options={
+                'verbose_name': 'Standard Size',
+                'verbose_name_plural': 'Standard Sizes',
+                'ordering': ['template', 'id'],
+                'constraints': [models.UniqueConstraint(fields=('template', 'name'), name='standard_size_unique')],
+            },
+        ),
+    ]
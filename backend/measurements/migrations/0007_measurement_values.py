@@ -0,0 +1,90 @@
+# Generated by Django 6.0 on 2026-10-18 05:17
+
+import django.contrib.postgres.indexes
+import django.db.models.deletion
+from django.conf import settings
+from django.db import migrations, models
+
+
+def project_existing(apps, schema_editor):
+    """Project the values of every existing measurement."""
+    from measurements.schema import field_scales
+
+    MeasurementTemplate = apps.get_model('measurements', 'MeasurementTemplate')
+    CustomerMeasurement = apps.get_model('measurements', 'CustomerMeasurement')
+    MeasurementValue = apps.get_model('measurements', 'MeasurementValue')
+    scales = {
+        pk: field_scales(schema)
+        for pk, schema in MeasurementTemplate.objects.values_list('id', 'standard_measurements')
+    }
+    rows = CustomerMeasurement.objects.order_by('id').values_list('id', 'template_id', 'measurements')
+    batch = []
+    for pk, template_id, values in rows.iterator(chunk_size=1000):
+        if not isinstance(values, dict):
+            continue
+        batch.extend(
+            MeasurementValue(
+                measurement_id=pk,
+                template_id=template_id,
+                key=key,
+                raw_value=value,
+                value=value * scales[template_id].get(key, 1.0),
+            )
+            for key, value in values.items()
+            if type(value) in (int, float) and len(key) <= 64
+        )
+        if len(batch) >= 5000:
+            MeasurementValue.objects.bulk_create(batch)
+            batch = []
+    MeasurementValue.objects.bulk_create(batch)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('measurements', '0006_standard_sizes'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='MeasurementValue',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('key', models.CharField(max_length=64)),
+                ('raw_value', models.FloatField(help_text='Value in the unit of the template field')),
+                ('value', models.FloatField(help_text='Value in cm')),
+            ],
+            options={
+                'verbose_name': 'Measurement Value',
+                'verbose_name_plural': 'Measurement Values',
+            },
+        ),
+        migrations.AddIndex(
+            model_name='customermeasurement',
+            index=django.contrib.postgres.indexes.GinIndex(fields=['measurements'], name='measurement_values_gin'),
+        ),
+        migrations.AddField(
+            model_name='measurementvalue',
+            name='measurement',
+            field=models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='values', to='measurements.customermeasurement'),
+        ),
+        migrations.AddField(
+            model_name='measurementvalue',
+            name='template',
+            field=models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='+', to='measurements.measurementtemplate'),
+        ),
+        migrations.AddIndex(
+            model_name='measurementvalue',
+            index=models.Index(fields=['key', 'value'], name='measurement_value_range_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='measurementvalue',
+            index=models.Index(fields=['template', 'key', 'value'], name='measurement_value_tpl_idx'),
+        ),
+        migrations.AddConstraint(
+            model_name='measurementvalue',
+            constraint=models.UniqueConstraint(fields=('measurement', 'key'), name='measurement_value_unique'),
+        ),
+        migrations.RunPython(project_existing, migrations.RunPython.noop),
+    ]
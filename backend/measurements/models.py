@@ -1,3 +1,5 @@
+from django.contrib.postgres.indexes import GinIndex
+from django.core.exceptions import ValidationError
 from django.db import models
 from users.models import User
 
@@ -22,7 +24,8 @@ class MeasurementTemplate(models.Model):
     )
     standard_measurements = models.JSONField(
         default=dict,
-        help_text="Standard measurement fields for this template"
+        help_text="Measurement fields of this template mapped to their unit, "
+                  "min, max and required flag; see measurements.schema"
     )
     created_at = models.DateTimeField(auto_now_add=True)
     updated_at = models.DateTimeField(auto_now=True)
@@ -31,10 +34,52 @@ class MeasurementTemplate(models.Model):
         verbose_name = 'Measurement Template'
         verbose_name_plural = 'Measurement Templates'
     
+    def clean(self):
+        from .schema import schema_errors
+        errors = schema_errors(self.standard_measurements)
+        if errors:
+            raise ValidationError({'standard_measurements': errors})
+
     def __str__(self):
         return self.name
 
 
+class StandardSize(models.Model):
+    """A named standard size of a template, such as M or 40R."""
+
+    template = models.ForeignKey(
+        MeasurementTemplate,
+        on_delete=models.CASCADE,
+        related_name='standard_sizes'
+    )
+    name = models.CharField(max_length=50)
+    measurements = models.JSONField(
+        default=dict,
+        help_text="Values of the template's measurement fields for this size"
+    )
+    created_at = models.DateTimeField(auto_now_add=True)
+    updated_at = models.DateTimeField(auto_now=True)
+
+    class Meta:
+        verbose_name = 'Standard Size'
+        verbose_name_plural = 'Standard Sizes'
+        ordering = ['template', 'id']
+        constraints = [
+            models.UniqueConstraint(fields=['template', 'name'], name='standard_size_unique'),
+        ]
+
+    def clean(self):
+        from .schema import compile_schema
+        errors = compile_schema(self.template.standard_measurements)(self.measurements, partial=True)
+        if errors:
+            raise ValidationError({'measurements': [
+                f"{name}: {' '.join(messages)}" for name, messages in errors.items()
+            ]})
+
+    def __str__(self):
+        return f"{self.template.name} {self.name}"
+
+
 class CustomerMeasurement(models.Model):
     """Customer Measurement model for storing customer-specific measurements."""
     
@@ -60,6 +105,11 @@ class CustomerMeasurement(models.Model):
         verbose_name = 'Customer Measurement'
         verbose_name_plural = 'Customer Measurements'
         ordering = ['-created_at']
+        indexes = [
+            models.Index(fields=['customer', '-created_at', '-id'], name='measurement_customer_idx'),
+            models.Index(fields=['customer', 'updated_at'], name='measurement_customer_upd_idx'),
+            GinIndex(fields=['measurements'], name='measurement_values_gin'),
+        ]
     
     def save(self, *args, **kwargs):
         """Validate that customer has user_type='CUSTOMER' before saving."""
@@ -69,3 +119,75 @@ class CustomerMeasurement(models.Model):
     
     def __str__(self):
         return f"{self.customer.full_name} - {self.template.name}"
+
+
+class MeasurementValue(models.Model):
+    """
+    One numeric value of a customer measurement, projected from its JSON on
+    write; see ``measurements.projection``.
+    """
+
+    measurement = models.ForeignKey(
+        CustomerMeasurement,
+        on_delete=models.CASCADE,
+        related_name='values'
+    )
+    template = models.ForeignKey(
+        MeasurementTemplate,
+        on_delete=models.CASCADE,
+        related_name='+'
+    )
+    key = models.CharField(max_length=64)
+    raw_value = models.FloatField(help_text="Value in the unit of the template field")
+    value = models.FloatField(help_text="Value in cm")
+
+    class Meta:
+        verbose_name = 'Measurement Value'
+        verbose_name_plural = 'Measurement Values'
+        constraints = [
+            models.UniqueConstraint(fields=['measurement', 'key'], name='measurement_value_unique'),
+        ]
+        indexes = [
+            models.Index(fields=['key', 'value'], name='measurement_value_range_idx'),
+            models.Index(fields=['template', 'key', 'value'], name='measurement_value_tpl_idx'),
+        ]
+
+    def __str__(self):
+        return f"{self.measurement_id} {self.key}={self.value}"
+
+
+class MeasurementRevision(models.Model):
+    """
+    One recorded state of a customer measurement; see ``measurements.history``.
+
+    Snapshots hold the full state, other revisions only what changed since
+    the previous revision.
+    """
+
+    measurement = models.ForeignKey(
+        CustomerMeasurement,
+        on_delete=models.CASCADE,
+        related_name='revisions'
+    )
+    number = models.PositiveIntegerField()
+    is_snapshot = models.BooleanField(default=False)
+    data = models.JSONField()
+    created_at = models.DateTimeField(auto_now_add=True)
+
+    class Meta:
+        verbose_name = 'Measurement Revision'
+        verbose_name_plural = 'Measurement Revisions'
+        ordering = ['measurement', 'number']
+        constraints = [
+            models.UniqueConstraint(fields=['measurement', 'number'], name='measurement_revision_unique'),
+        ]
+        indexes = [
+            models.Index(
+                fields=['measurement', 'number'],
+                name='measurement_snapshot_idx',
+                condition=models.Q(is_snapshot=True),
+            ),
+        ]
+
+    def __str__(self):
+        return f"{self.measurement_id} r{self.number}"
@@ -0,0 +1,76 @@
+"""
+Typed projection of measurement values.
+
+``CustomerMeasurement.measurements`` is JSON, so a range query on it would
+scan and parse every row. Each numeric value is therefore also stored as a
+``MeasurementValue`` row, converted to cm once, at write time, using the
+unit its template declares for the field (see ``measurements.schema``).
+The ``(key, value)`` indexes of that table serve filters such as "chest
+over 110cm"; the GIN index on the JSON itself serves key lookups.
+
+Units are read from the template row itself, not the template registry,
+and under a row lock: a concurrent unit change then either commits first
+and is seen here, or waits for the projection to commit and rescales it.
+"""
+from django.db import transaction
+from django.db.models import F, Q
+from .models import MeasurementTemplate, MeasurementValue
+from .schema import field_scales
+
+
+def project(measurement, schema):
+    """
+    Return the unsaved ``MeasurementValue`` rows of a measurement whose
+    template has the fields ``schema``.
+    """
+    values = measurement.measurements
+    if not isinstance(values, dict):
+        return []
+    scales = field_scales(schema)
+    return [
+        MeasurementValue(
+            measurement_id=measurement.pk,
+            template_id=measurement.template_id,
+            key=key,
+            raw_value=value,
+            value=value * scales.get(key, 1.0),
+        )
+        for key, value in values.items()
+        if type(value) in (int, float) and len(key) <= 64
+    ]
+
+
+def sync_values(measurement):
+    """Replace the projected values of a saved measurement."""
+    with transaction.atomic():
+        schema = MeasurementTemplate.objects.select_for_update(no_key=True).filter(
+            pk=measurement.template_id
+        ).values_list('standard_measurements', flat=True).first()
+        MeasurementValue.objects.filter(measurement_id=measurement.pk).delete()
+        MeasurementValue.objects.bulk_create(project(measurement, schema))
+
+
+def rescale_template(template):
+    """
+    Recompute the cm values of a template's measurements after its units
+    change. Fields no longer in the schema go back to being taken as cm.
+    """
+    scales = field_scales(template.standard_measurements)
+    values = MeasurementValue.objects.filter(template_id=template.pk)
+    for key, scale in scales.items():
+        values.filter(key=key).exclude(value=F('raw_value') * scale).update(value=F('raw_value') * scale)
+    values.exclude(key__in=list(scales)).exclude(value=F('raw_value')).update(value=F('raw_value'))
+
+
+def value_filter(key, low=None, high=None):
+    """
+    Condition matching measurements whose ``key`` lies between ``low`` and
+    ``high`` cm, bounds inclusive and optional. Matching ids come from one
+    ``(key, value)`` index range scan rather than a probe per measurement.
+    """
+    values = MeasurementValue.objects.filter(key=key)
+    if low is not None:
+        values = values.filter(value__gte=low)
+    if high is not None:
+        values = values.filter(value__lte=high)
+    return Q(id__in=values.values('measurement_id'))
@@ -0,0 +1,518 @@
+"""
+Size recommendations and similar-customer search over measurement vectors.
+
+Measurements of one measurement type are turned into fixed-width float32
+vectors in centimetres, one axis per field declared by that type's
+templates (see ``measurements.schema``); fields a measurement lacks are
+masked out. Types whose templates declare no fields are not indexed.
+
+Each worker keeps a NumPy table of customer measurements and one of
+standard sizes per type. Like the tailor recommendation snapshot, the
+measurement tables are refreshed incrementally from rows whose
+``updated_at`` moved past the last seen watermark (less
+``MEASUREMENT_RECOMMENDATION_OVERLAP_SECONDS``), with a periodic full
+rebuild in the background, and are rebuilt when the template registry
+changes. Deletions leave no row to pick up, so they are appended to a
+numbered log in the shared cache that every worker replays.
+
+The distance between two measurements is the root mean square difference,
+in cm, over the fields both have. Rows are stored packed as
+``[x², x, present]``, so the distances from the scanned rows to a batch of
+queries come out of a single matrix product. Large tables are clustered so
+that a query only scans the rows near it; see ``VectorTable``.
+"""
+import math
+import threading
+import time
+from collections import defaultdict
+from datetime import timedelta
+
+import numpy as np
+from django.conf import settings
+from django.core.cache import cache
+from django.db import connection, transaction
+from .models import CustomerMeasurement
+from .registry import get_registry
+from .schema import field_scales
+
+FIELDS = ('id', 'customer_id', 'template_id', 'measurements', 'updated_at')
+CLUSTER_MIN_ROWS = 20000
+DELETED_KEY = 'measurements:recommendation:deleted'
+# Workers further behind than this on the deletion log rebuild instead.
+DELETED_LOG_SIZE = 1000
+
+
+class VectorSpace:
+    """The axes of one measurement type and the unit scales of its templates."""
+
+    def __init__(self, templates):
+        names = set()
+        for template in templates:
+            if isinstance(template.standard_measurements, dict):
+                names.update(template.standard_measurements)
+        self.names = sorted(names)
+        self.axes = {name: axis for axis, name in enumerate(self.names)}
+        self.scales = {template.pk: field_scales(template.standard_measurements) for template in templates}
+
+    def vectorize(self, entries):
+        """
+        Return packed rows for ``(template_id, measurements)`` entries, with
+        values converted to cm.
+        """
+        entries = list(entries)
+        values = np.zeros((len(entries), len(self.names)), dtype=np.float32)
+        present = np.zeros_like(values)
+        axes = self.axes
+        for row, (template_id, measurements) in enumerate(entries):
+            if not isinstance(measurements, dict):
+                continue
+            scales = self.scales.get(template_id, {})
+            for name, value in measurements.items():
+                axis = axes.get(name)
+                if axis is not None and type(value) in (int, float) and math.isfinite(value):
+                    values[row, axis] = value * scales.get(name, 1.0)
+                    present[row, axis] = 1
+        return np.hstack([values * values, values, present])
+
+
+class VectorTable:
+    """
+    Packed vectors of one measurement type. Updates return a new table.
+
+    Tables of at least ``CLUSTER_MIN_ROWS`` rows are split into about
+    sqrt(rows) cells with k-means and stored cell by cell; a query then
+    only scans the ``MEASUREMENT_RECOMMENDATION_PROBES`` cells whose
+    centroids are closest to it, which makes large searches approximate.
+    Rows changed after the table was built are appended to an unclustered
+    tail that every query scans, until the next rebuild.
+    """
+
+    def __init__(self, ids, owners, packed, active=None, positions=None, centroids=None, offsets=None):
+        self.ids = ids
+        self.owners = owners
+        self.packed = packed
+        self.active = np.ones(len(ids), dtype=bool) if active is None else active
+        self.positions = (
+            {int(pk): index for index, pk in enumerate(ids)} if positions is None else positions
+        )
+        self.centroids = centroids
+        self.offsets = offsets
+
+    def __len__(self):
+        return len(self.ids)
+
+    @classmethod
+    def build(cls, ids, owners, packed):
+        """Return a table of these rows, clustered if there are enough."""
+        if len(ids) < CLUSTER_MIN_ROWS:
+            return cls(ids, owners, packed)
+        width = packed.shape[1] // 3
+        values, present = packed[:, width:2 * width], packed[:, 2 * width:]
+        # Cluster on vectors with missing fields filled by the field mean.
+        means = values.sum(axis=0) / np.maximum(present.sum(axis=0), 1)
+        filled = np.where(present > 0, values, means)
+        centroids = _kmeans(filled, int(math.sqrt(len(ids))))
+        labels = _assign(filled, centroids)
+        order = np.argsort(labels, kind='stable')
+        offsets = np.searchsorted(labels[order], np.arange(len(centroids) + 1))
+        return cls(ids[order], owners[order], packed[order], centroids=centroids, offsets=offsets)
+
+    def upsert(self, ids, owners, packed):
+        """Return a table with these rows replaced or added; unchanged rows are skipped."""
+        positions = np.fromiter(
+            (self.positions.get(int(pk), -1) for pk in ids), dtype=np.int64, count=len(ids)
+        )
+        existing = positions >= 0
+        rows = positions[existing]
+        unchanged = np.zeros(len(ids), dtype=bool)
+        unchanged[existing] = self.active[rows] & (self.owners[rows] == owners[existing]) \
+            & (self.packed[rows] == packed[existing]).all(axis=1)
+        if unchanged.all():
+            return self
+        changed = ~unchanged
+        ids, owners, packed = ids[changed], owners[changed], packed[changed]
+        positions, existing = positions[changed], existing[changed]
+        active = self.active.copy()
+        active[positions[existing]] = False
+        # Older tables are still read by other threads; never share a dict
+        # that gains rows past their arrays.
+        positions = dict(self.positions)
+        start = len(self.ids)
+        for offset, pk in enumerate(ids):
+            positions[int(pk)] = start + offset
+        return VectorTable(
+            np.concatenate([self.ids, ids]),
+            np.concatenate([self.owners, owners]),
+            np.concatenate([self.packed, packed]),
+            np.concatenate([active, np.ones(len(ids), dtype=bool)]),
+            positions,
+            self.centroids,
+            self.offsets,
+        )
+
+    def without(self, ids):
+        """Return a table in which these rows never match."""
+        active = self.active.copy()
+        for pk in ids:
+            index = self.positions.get(pk)
+            if index is not None:
+                active[index] = False
+        return VectorTable(
+            self.ids, self.owners, self.packed, active, self.positions, self.centroids, self.offsets
+        )
+
+    def rows_for(self, ids):
+        """Row numbers of the given ids present in the table."""
+        rows = [self.positions[pk] for pk in ids if pk in self.positions]
+        return np.array(rows, dtype=np.int64)
+
+    def candidate_rows(self, queries):
+        """Rows to scan for these packed queries, or None for all rows."""
+        if self.centroids is None:
+            return None
+        width = queries.shape[1] // 3
+        values, present = queries[:, width:2 * width], queries[:, 2 * width:]
+        probes = min(settings.MEASUREMENT_RECOMMENDATION_PROBES, len(self.centroids))
+        cells = set()
+        for value, mask in zip(values, present):
+            gaps = ((self.centroids - value) ** 2 * mask).sum(axis=1)
+            cells.update(np.argpartition(gaps, probes - 1)[:probes].tolist())
+        ranges = [(self.offsets[cell], self.offsets[cell + 1]) for cell in sorted(cells)]
+        ranges.append((self.offsets[-1], len(self.ids)))
+        return np.concatenate([np.arange(start, stop) for start, stop in ranges])
+
+    def distances(self, queries, rows=None):
+        """
+        Distances in cm from the given rows (all when None) to each packed
+        query, as a ``(rows, queries)`` array. Inactive rows, and rows
+        sharing fewer than ``MEASUREMENT_RECOMMENDATION_MIN_SHARED`` of a
+        query's fields, are infinitely far.
+        """
+        packed = self.packed if rows is None else self.packed[rows]
+        active = self.active if rows is None else self.active[rows]
+        width = queries.shape[1] // 3
+        values, present = queries[:, width:2 * width], queries[:, 2 * width:]
+        count = len(queries)
+        weights = np.zeros((3 * width, 2 * count), dtype=np.float32)
+        weights[:width, :count] = present.T
+        weights[width:2 * width, :count] = (-2 * values * present).T
+        weights[2 * width:, :count] = (values * values * present).T
+        weights[2 * width:, count:] = present.T
+        product = packed @ weights
+        squares, shared = product[:, :count], product[:, count:]
+        needed = np.maximum(np.ceil(present.sum(axis=1) * settings.MEASUREMENT_RECOMMENDATION_MIN_SHARED), 1)
+        with np.errstate(divide='ignore', invalid='ignore'):
+            distances = np.sqrt(np.maximum(squares, 0) / shared)
+        distances[(shared < needed) | ~active[:, None]] = np.inf
+        return distances
+
+
+def _assign(rows, centroids, chunk_size=8192):
+    """Index of the nearest centroid for every row."""
+    norms = (centroids * centroids).sum(axis=1)
+    labels = np.empty(len(rows), dtype=np.int64)
+    for start in range(0, len(rows), chunk_size):
+        block = rows[start:start + chunk_size]
+        labels[start:start + chunk_size] = np.argmin(norms - 2 * block @ centroids.T, axis=1)
+    return labels
+
+
+def _kmeans(rows, cells, iterations=10):
+    """Centroids of ``cells`` clusters, fitted on a sample of ``rows``."""
+    rng = np.random.default_rng(0)
+    sample = rows[rng.choice(len(rows), min(len(rows), cells * 40), replace=False)]
+    centroids = sample[rng.choice(len(sample), cells, replace=False)].copy()
+    for _ in range(iterations):
+        labels = _assign(sample, centroids)
+        counts = np.bincount(labels, minlength=cells)
+        sums = np.stack([
+            np.bincount(labels, weights=sample[:, axis], minlength=cells)
+            for axis in range(sample.shape[1])
+        ], axis=1)
+        filled = counts > 0
+        centroids[filled] = sums[filled] / counts[filled, None]
+    return centroids
+
+
+def nearest(distances, limit):
+    """Positions of the ``limit`` smallest finite ``distances``, closest first."""
+    if limit < len(distances):
+        candidates = np.argpartition(distances, limit - 1)[:limit]
+    else:
+        candidates = np.arange(len(distances))
+    candidates = candidates[np.argsort(distances[candidates], kind='stable')]
+    return candidates[np.isfinite(distances[candidates])]
+
+
+def _pack(rows, spaces, types):
+    """
+    Group ``FIELDS`` rows by measurement type into ``(ids, owners,
+    packed)``. Returns them with the latest ``updated_at`` seen.
+    """
+    grouped = defaultdict(list)
+    watermark = None
+    for row in rows:
+        if row[4] is not None and (watermark is None or row[4] > watermark):
+            watermark = row[4]
+        kind = types.get(row[2])
+        if kind is not None:
+            grouped[kind].append(row)
+    packs = {}
+    for kind, members in grouped.items():
+        packs[kind] = (
+            np.fromiter((row[0] for row in members), dtype=np.int64, count=len(members)),
+            np.fromiter((row[1] for row in members), dtype=np.int64, count=len(members)),
+            spaces[kind].vectorize((row[2], row[3]) for row in members),
+        )
+    return packs, watermark
+
+
+def get_deleted_count():
+    """Number of measurement deletions logged in the shared cache."""
+    return cache.get(DELETED_KEY, 0)
+
+
+def log_deletion(measurement_id):
+    """Append a deleted measurement to the shared deletion log."""
+    try:
+        number = cache.incr(DELETED_KEY)
+    except ValueError:
+        # A lost counter restarts below every worker's count, which makes
+        # them rebuild rather than miss deletions.
+        cache.add(DELETED_KEY, 0, timeout=None)
+        number = cache.incr(DELETED_KEY)
+    cache.set(
+        f'{DELETED_KEY}:{number}', measurement_id,
+        timeout=settings.MEASUREMENT_RECOMMENDATION_REBUILD_SECONDS * 2,
+    )
+    _index.discard(measurement_id)
+
+
+class MeasurementIndex:
+    """
+    Per-type vector tables of customer measurements and standard sizes.
+
+    Only the first build runs on the calling thread. Later full rebuilds
+    run on a background thread while requests keep using, and
+    incrementally updating, the current tables; the new tables are swapped
+    in when ready and then catch up from their own watermark.
+    """
+
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.version = None
+        self.spaces = {}
+        self.types = {}
+        self.tables = {}
+        self.sizes = {}
+        self.size_tables = {}
+        self.located = {}
+        self.watermark = None
+        self.deleted = 0
+        self.stale = False
+        self.builder = None
+        self.checked_at = 0.0
+        self.rebuilt_at = 0.0
+
+    def refresh(self, force=False):
+        """
+        Pull changed and deleted rows if the refresh interval has elapsed,
+        and start a background rebuild if one is due. ``force`` rebuilds
+        on the calling thread.
+        """
+        now = time.monotonic()
+        if not force and now - self.checked_at < settings.MEASUREMENT_RECOMMENDATION_REFRESH_SECONDS:
+            return
+        registry = get_registry()
+        if force or self.version is None:
+            self._swap(self._build(registry), now)
+            return
+        with self.lock:
+            self.checked_at = now
+            self._apply_changes()
+            due = self.stale or registry.version != self.version \
+                or now - self.rebuilt_at >= settings.MEASUREMENT_RECOMMENDATION_REBUILD_SECONDS
+            if due and self.builder is None:
+                self.builder = threading.Thread(
+                    target=self._build_in_background, args=(registry, now), daemon=True
+                )
+                self.builder.start()
+
+    def _build_in_background(self, registry, started_at):
+        try:
+            self._swap(self._build(registry), started_at)
+        finally:
+            self.builder = None
+            connection.close()
+
+    def _swap(self, state, built_at):
+        with self.lock:
+            vars(self).update(state)
+            self.stale = False
+            self.rebuilt_at = self.checked_at = built_at
+            # Catch up on whatever changed while the tables were built.
+            self._apply_changes()
+
+    def _build(self, registry):
+        """Return freshly built index state, without touching the current one."""
+        # Read first, so deletions logged during the build are replayed.
+        deleted = get_deleted_count()
+        templates = defaultdict(list)
+        for template in registry.templates.values():
+            templates[template.measurement_type].append(template)
+        spaces = {kind: VectorSpace(members) for kind, members in templates.items()}
+        spaces = {kind: space for kind, space in spaces.items() if space.names}
+        types = {
+            template.pk: template.measurement_type
+            for template in registry.templates.values() if template.measurement_type in spaces
+        }
+
+        packs, _ = _pack(
+            ((size.pk, size.template_id, size.template_id, size.measurements, None) for size in registry.sizes),
+            spaces, types,
+        )
+        size_tables = {kind: VectorTable.build(*pack) for kind, pack in packs.items()}
+
+        rows = CustomerMeasurement.objects.filter(template_id__in=list(types)).values_list(*FIELDS)
+        packs, watermark = _pack(rows.iterator(chunk_size=5000), spaces, types)
+        tables = {kind: VectorTable.build(*pack) for kind, pack in packs.items()}
+        return {
+            'version': registry.version,
+            'spaces': spaces,
+            'types': types,
+            'sizes': {size.pk: size for size in registry.sizes},
+            'size_tables': size_tables,
+            'tables': tables,
+            'located': {int(pk): kind for kind, table in tables.items() for pk in table.ids},
+            'watermark': watermark,
+            'deleted': deleted,
+        }
+
+    def _apply_changes(self):
+        self._apply_deletions()
+        rows = CustomerMeasurement.objects.values_list(*FIELDS)
+        if self.watermark is not None:
+            # updated_at is stamped when a transaction starts, so re-read
+            # recent rows in case they committed after the last refresh.
+            overlap = timedelta(seconds=settings.MEASUREMENT_RECOMMENDATION_OVERLAP_SECONDS)
+            rows = rows.filter(updated_at__gte=self.watermark - overlap)
+        rows = list(rows)
+        if not rows:
+            return
+        moved = defaultdict(list)
+        for row in rows:
+            old, new = self.located.get(row[0]), self.types.get(row[2])
+            if old is not None and old != new:
+                moved[old].append(row[0])
+            if new is None:
+                self.located.pop(row[0], None)
+            else:
+                self.located[row[0]] = new
+        for kind, ids in moved.items():
+            self.tables[kind] = self.tables[kind].without(ids)
+
+        packs, watermark = _pack(rows, self.spaces, self.types)
+        for kind, pack in packs.items():
+            table = self.tables.get(kind)
+            self.tables[kind] = table.upsert(*pack) if table is not None else VectorTable.build(*pack)
+        self.watermark = watermark if self.watermark is None else max(self.watermark, watermark)
+
+    def _apply_deletions(self):
+        """
+        Drop measurements deleted in any worker since the last check, or
+        mark the index for a rebuild if part of the deletion log was lost.
+        """
+        count = get_deleted_count()
+        if count == self.deleted:
+            return
+        if count < self.deleted or count - self.deleted > DELETED_LOG_SIZE:
+            self.stale = True
+        else:
+            keys = [f'{DELETED_KEY}:{number}' for number in range(self.deleted + 1, count + 1)]
+            logged = cache.get_many(keys)
+            if len(logged) < len(keys):
+                self.stale = True
+            self._discard(logged.values())
+        self.deleted = count
+
+    def _discard(self, measurement_ids):
+        gone = defaultdict(list)
+        for pk in measurement_ids:
+            kind = self.located.pop(pk, None)
+            if kind is not None:
+                gone[kind].append(pk)
+        for kind, ids in gone.items():
+            self.tables[kind] = self.tables[kind].without(ids)
+
+    def discard(self, measurement_id):
+        """Stop matching a deleted measurement."""
+        with self.lock:
+            self._discard([measurement_id])
+
+    def closest_sizes(self, queries, limit):
+        """
+        For each ``(template_id, measurements)`` query, return a list of
+        ``(StandardSize, distance_cm)``, closest first. Queries of one type
+        are answered together.
+        """
+        with self.lock:
+            types, spaces, tables, sizes = self.types, self.spaces, self.size_tables, self.sizes
+        results = [[] for _ in queries]
+        grouped = defaultdict(list)
+        for index, (template_id, _) in enumerate(queries):
+            kind = types.get(template_id)
+            if kind in tables:
+                grouped[kind].append(index)
+        for kind, indexes in grouped.items():
+            table = tables[kind]
+            distances = table.distances(spaces[kind].vectorize(queries[index] for index in indexes))
+            for column, index in enumerate(indexes):
+                results[index] = [
+                    (sizes[int(table.ids[position])], float(distances[position, column]))
+                    for position in nearest(distances[:, column], limit)
+                ]
+        return results
+
+    def similar(self, template_id, measurements, limit, exclude_customer=None, candidates=None):
+        """
+        Return ``(measurement_id, customer_id, distance_cm)`` of the closest
+        measurements of other customers, one per customer, closest first.
+        ``candidates`` limits the search to those measurement ids, exactly.
+        """
+        with self.lock:
+            kind = self.types.get(template_id)
+            space, table = self.spaces.get(kind), self.tables.get(kind)
+        if table is None:
+            return []
+        query = space.vectorize([(template_id, measurements)])
+        rows = table.candidate_rows(query) if candidates is None else table.rows_for(candidates)
+        if rows is None:
+            rows = np.arange(len(table))
+        distances = table.distances(query, rows)[:, 0]
+        if exclude_customer is not None:
+            distances[table.owners[rows] == exclude_customer] = np.inf
+        # Over-fetch, then keep each customer's closest measurement.
+        positions = nearest(distances, limit * 4)
+        _, first = np.unique(table.owners[rows[positions]], return_index=True)
+        positions = positions[np.sort(first)][:limit]
+        return [
+            (int(table.ids[rows[position]]), int(table.owners[rows[position]]), float(distances[position]))
+            for position in positions
+        ]
+
+
+_index = MeasurementIndex()
+
+
+def get_index():
+    """Return this process's index, refreshed if it is due."""
+    _index.refresh()
+    return _index
+
+
+def discard_measurement(measurement_id):
+    """
+    Remove a deleted measurement from this process's index and, through
+    the deletion log, every other worker's once the transaction commits.
+    """
+    transaction.on_commit(lambda: log_deletion(measurement_id))
@@ -0,0 +1,170 @@
+"""
+In-process registry of measurement templates.
+
+Templates are a tiny, rarely changing table, so each worker loads all of
+them once, together with their serialized form and standard sizes, and
+serves template endpoints, nested ``template`` fields, template lookups and
+measurement validators (see ``measurements.schema``) from memory.
+Saving or deleting a template or size bumps a version stamp in the shared cache;
+workers compare their copy against it at most every
+``MEASUREMENT_TEMPLATE_REGISTRY_CHECK_SECONDS`` and reload when it moved.
+A template id missing from a worker's copy is looked up in the database
+before being rejected, so a template created through another worker can be
+used straight away.
+"""
+import threading
+import time
+from functools import lru_cache
+
+from django.conf import settings
+from django.core.cache import cache
+from django.db import transaction
+from django.utils.http import parse_etags
+from rest_framework import status
+from rest_framework.response import Response
+from tailors.cache import compute_etag
+from .models import MeasurementTemplate, StandardSize
+from .schema import compile_schema
+
+VERSION_KEY = 'measurements:templates:version'
+
+
+def get_version():
+    """Return the shared template version, initialising it if needed."""
+    version = cache.get(VERSION_KEY)
+    if version is None:
+        # Seed from the clock so a lost stamp never reuses an old version.
+        cache.add(VERSION_KEY, time.time_ns(), timeout=None)
+        version = cache.get(VERSION_KEY)
+    return version
+
+
+def bump_version():
+    try:
+        cache.incr(VERSION_KEY)
+    except ValueError:
+        cache.add(VERSION_KEY, time.time_ns(), timeout=None)
+    _registry.expire()
+
+
+def invalidate_templates():
+    """Bump the template version once the current transaction commits."""
+    transaction.on_commit(bump_version)
+
+
+class TemplateRegistry:
+    """Every measurement template, its serialized data and validator, by id."""
+
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.version = None
+        self.templates = {}
+        self.data = {}
+        self.validators = {}
+        self.sizes = []
+        self.list_data = []
+        self.checked_at = 0.0
+
+    def expire(self):
+        """Check the shared version on next access."""
+        self.checked_at = 0.0
+
+    def refresh(self):
+        now = time.monotonic()
+        if now - self.checked_at < settings.MEASUREMENT_TEMPLATE_REGISTRY_CHECK_SECONDS:
+            return
+        version = get_version()
+        with self.lock:
+            if version != self.version:
+                self._load(version)
+            self.checked_at = now
+
+    def reload(self):
+        """Load every template now, whatever the shared version says."""
+        version = get_version()
+        with self.lock:
+            self._load(version)
+            self.checked_at = time.monotonic()
+
+    def _load(self, version):
+        from .serializers import MeasurementTemplateSerializer
+
+        templates = list(MeasurementTemplate.objects.order_by('id'))
+        data = MeasurementTemplateSerializer(templates, many=True, fields=None, expand=None).data
+        self.templates = {template.pk: template for template in templates}
+        self.data = {template.pk: entry for template, entry in zip(templates, data)}
+        self.validators = {
+            template.pk: compile_schema(template.standard_measurements) for template in templates
+        }
+        self.sizes = list(StandardSize.objects.order_by('template_id', 'id'))
+        self.list_data = list(data)
+        self.version = version
+
+
+_registry = TemplateRegistry()
+
+
+def get_registry():
+    """Return this process's registry, reloaded if the version moved."""
+    _registry.refresh()
+    return _registry
+
+
+def find(template_id):
+    """
+    Return the registry, reloaded first when ``template_id`` is not in it
+    but exists in the database (it was created through another worker).
+    """
+    registry = get_registry()
+    if template_id not in registry.templates \
+            and MeasurementTemplate.objects.filter(pk=template_id).exists():
+        registry.reload()
+    return registry
+
+
+def get_template(template_id):
+    """Return the template with ``template_id``, or None. Do not modify it."""
+    return find(template_id).templates.get(template_id)
+
+
+def template_data(template_id):
+    """Return the serialized template with ``template_id``, or None."""
+    return find(template_id).data.get(template_id)
+
+
+def get_validator(template_id=None):
+    """
+    Return the compiled measurement validator for ``template_id``, or the
+    template-less one (any names, numeric values) when it is None.
+    Returns None for unknown templates.
+    """
+    if template_id is None:
+        return _generic_validator()
+    return find(template_id).validators.get(template_id)
+
+
+@lru_cache(maxsize=None)
+def _generic_validator():
+    return compile_schema({})
+
+
+class TemplateRegistryMixin:
+    """
+    Serve template list or detail responses from the registry.
+
+    Responses carry a strong ETag and may be cached by clients for
+    ``MEASUREMENT_TEMPLATE_MAX_AGE`` seconds; ``If-None-Match`` revalidation
+    returns a bare 304.
+    """
+
+    def finalize_response(self, request, response, *args, **kwargs):
+        response = super().finalize_response(request, response, *args, **kwargs)
+        if request.method not in ('GET', 'HEAD') or response.status_code != 200:
+            return response
+        etag = compute_etag(response.data)
+        if etag in parse_etags(request.headers.get('If-None-Match', '')):
+            response = Response(status=status.HTTP_304_NOT_MODIFIED)
+            response = super().finalize_response(request, response, *args, **kwargs)
+        response['ETag'] = etag
+        response['Cache-Control'] = f'public, max-age={settings.MEASUREMENT_TEMPLATE_MAX_AGE}'
+        return response
@@ -0,0 +1,133 @@
+"""
+Measurement schemas and their compiled validators.
+
+``MeasurementTemplate.standard_measurements`` maps each measurement name to
+its spec::
+
+    {"chest": {"unit": "cm", "min": 60, "max": 160, "required": true},
+     "sleeve": {"unit": "in", "min": 20, "max": 40}}
+
+``unit`` is one of ``UNITS`` (default ``cm``), ``min`` and ``max`` bound the
+value and ``required`` defaults to false. Measurement payloads for a
+template may only contain its fields, with numbers in the field's unit. A
+template without fields accepts any names, up to
+``MEASUREMENT_MAX_FIELDS`` of them, as long as the values are numbers.
+
+Each schema is compiled once into a plain function (see ``compile_schema``)
+that the template registry keeps per template version, so validating a
+payload costs a few dict lookups per value.
+"""
+import math
+
+from django.conf import settings
+
+UNITS = ('cm', 'mm', 'in')
+CM_PER_UNIT = {'cm': 1.0, 'mm': 0.1, 'in': 2.54}
+DEFAULT_UNIT = 'cm'
+SPEC_KEYS = {'unit', 'min', 'max', 'required', 'label'}
+MAX_NAME_LENGTH = 64
+
+
+def _is_number(value):
+    # bool is an int subclass but never a valid measurement.
+    return type(value) in (int, float) and math.isfinite(value)
+
+
+def schema_errors(schema):
+    """Return a list of problems with ``schema``; empty when it is valid."""
+    if not isinstance(schema, dict):
+        return ["Standard measurements must be an object mapping names to specs."]
+    errors = []
+    for name, spec in schema.items():
+        if not name or len(name) > MAX_NAME_LENGTH:
+            errors.append(f"Measurement names must be 1 to {MAX_NAME_LENGTH} characters.")
+            continue
+        if not isinstance(spec, dict):
+            errors.append(f"{name}: spec must be an object.")
+            continue
+        unknown = set(spec) - SPEC_KEYS
+        if unknown:
+            errors.append(f"{name}: unknown keys {', '.join(sorted(unknown))}.")
+        if spec.get('unit', DEFAULT_UNIT) not in UNITS:
+            errors.append(f"{name}: unit must be one of {', '.join(UNITS)}.")
+        for key in ('min', 'max'):
+            if key in spec and not _is_number(spec[key]):
+                errors.append(f"{name}: {key} must be a number.")
+        if _is_number(spec.get('min')) and _is_number(spec.get('max')) and spec['min'] > spec['max']:
+            errors.append(f"{name}: min must not exceed max.")
+        if not isinstance(spec.get('required', False), bool):
+            errors.append(f"{name}: required must be true or false.")
+    return errors
+
+
+def field_scales(schema):
+    """Map each field of a schema to the factor converting its unit to cm."""
+    if not isinstance(schema, dict):
+        return {}
+    scales = {}
+    for name, spec in schema.items():
+        unit = spec.get('unit', DEFAULT_UNIT) if isinstance(spec, dict) else DEFAULT_UNIT
+        scales[name] = CM_PER_UNIT.get(unit, 1.0)
+    return scales
+
+
+def compile_schema(schema):
+    """
+    Compile ``schema`` into ``validate(values, partial=False)``.
+
+    The validator returns a dict of error messages by measurement name,
+    empty when ``values`` is valid. ``partial`` skips required fields, for
+    payloads that only adjust some measurements. Malformed specs saved
+    around ``schema_errors`` are treated as unbounded optional fields.
+    """
+    max_fields = settings.MEASUREMENT_MAX_FIELDS
+    bounds = {}
+    required = []
+    if isinstance(schema, dict):
+        for name, spec in schema.items():
+            if not isinstance(spec, dict):
+                spec = {}
+            low = spec.get('min') if _is_number(spec.get('min')) else -math.inf
+            high = spec.get('max') if _is_number(spec.get('max')) else math.inf
+            bounds[name] = (low, high)
+            if spec.get('required') is True:
+                required.append(name)
+    required = tuple(required)
+    unbounded = (-math.inf, math.inf)
+    strict = bool(bounds)
+    number_types = (int, float)
+    isfinite = math.isfinite
+
+    def validate(values, partial=False):
+        if type(values) is not dict:
+            return {'non_field_errors': ["Measurements must be a dictionary."]}
+        if len(values) > max_fields:
+            return {'non_field_errors': [f"At most {max_fields} measurements are allowed."]}
+        errors = {}
+        for name, value in values.items():
+            if strict:
+                limits = bounds.get(name)
+                if limits is None:
+                    errors[name] = ["Unknown measurement for this template."]
+                    continue
+            else:
+                if len(name) > MAX_NAME_LENGTH:
+                    errors[name[:MAX_NAME_LENGTH]] = [
+                        f"Measurement names must be at most {MAX_NAME_LENGTH} characters."
+                    ]
+                    continue
+                limits = unbounded
+            if type(value) not in number_types or not isfinite(value):
+                errors[name] = ["Must be a number."]
+                continue
+            if value < limits[0]:
+                errors[name] = [f"Must be at least {limits[0]}."]
+            elif value > limits[1]:
+                errors[name] = [f"Must be at most {limits[1]}."]
+        if not partial:
+            for name in required:
+                if name not in values:
+                    errors[name] = ["This measurement is required."]
+        return errors
+
+    return validate
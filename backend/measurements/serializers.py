@@ -1,8 +1,20 @@
 from rest_framework import serializers
-from .models import MeasurementTemplate, CustomerMeasurement
+from core.expansion import ExpandableFieldsMixin
+from .models import MeasurementTemplate, CustomerMeasurement, MeasurementRevision, StandardSize
+from .registry import get_template, get_validator
 
 
-class MeasurementTemplateSerializer(serializers.ModelSerializer):
+def check_measurements(template_id, values, partial=False):
+    """
+    Validate measurement ``values`` against the compiled schema of the
+    template, or only their shape when there is no such template.
+    Returns the errors by measurement name.
+    """
+    validator = get_validator(template_id) or get_validator()
+    return validator(values, partial)
+
+
+class MeasurementTemplateSerializer(ExpandableFieldsMixin, serializers.ModelSerializer):
     """Serializer for measurement templates."""
 
     measurement_type_display = serializers.CharField(
@@ -20,10 +32,17 @@ class MeasurementTemplateSerializer(serializers.ModelSerializer):
         read_only_fields = ('id', 'created_at', 'updated_at')
 
 
-class CustomerMeasurementSerializer(serializers.ModelSerializer):
+class CustomerMeasurementSerializer(ExpandableFieldsMixin, serializers.ModelSerializer):
     """Serializer for customer measurements with template details."""
 
-    template = MeasurementTemplateSerializer(read_only=True)
+    expandable_fields = {
+        'template': (MeasurementTemplateSerializer, {'read_only': True}),
+    }
+    field_relations = {'customer_name': ['customer']}
+    sideload_fields = {'template': 'templates'}
+    # Templates are rendered from the in-process registry, never joined.
+    cached_fields = {'template': 'measurements.registry.template_data'}
+
     template_id = serializers.IntegerField(write_only=True, required=False)
     customer_name = serializers.CharField(
         source='customer.full_name',
@@ -38,17 +57,92 @@ class CustomerMeasurementSerializer(serializers.ModelSerializer):
         )
         read_only_fields = ('id', 'customer', 'created_at', 'updated_at')
 
+    def validate_template_id(self, value):
+        """Validate that the template exists."""
+        if get_template(value) is None:
+            raise serializers.ValidationError("Invalid template ID.")
+        return value
+
+    def validate(self, attrs):
+        """Validate measurements against the (possibly new) template."""
+        if 'measurements' in attrs or 'template_id' in attrs:
+            errors = check_measurements(
+                attrs.get('template_id', getattr(self.instance, 'template_id', None)),
+                attrs.get('measurements', getattr(self.instance, 'measurements', {})),
+            )
+            if errors:
+                raise serializers.ValidationError({'measurements': errors})
+        return attrs
+
+
+class TemplateField(serializers.PrimaryKeyRelatedField):
+    """Template primary key resolved through the template registry."""
+
+    def __init__(self, **kwargs):
+        kwargs.setdefault('queryset', MeasurementTemplate.objects.all())
+        super().__init__(**kwargs)
+
+    def to_internal_value(self, data):
+        try:
+            template = get_template(int(data))
+        except (TypeError, ValueError):
+            self.fail('incorrect_type', data_type=type(data).__name__)
+        if template is None:
+            self.fail('does_not_exist', pk_value=data)
+        return template
+
 
 class CustomerMeasurementCreateSerializer(serializers.ModelSerializer):
     """Serializer for creating customer measurements."""
+    template = TemplateField()
 
     class Meta:
         model = CustomerMeasurement
         fields = ('template', 'measurements', 'notes')
 
-    def validate_measurements(self, value):
-        """Validate that measurements is a dictionary."""
-        if not isinstance(value, dict):
-            raise serializers.ValidationError("Measurements must be a dictionary.")
-        return value
+    def validate(self, attrs):
+        """Validate measurements against the template's schema."""
+        errors = check_measurements(attrs['template'].pk, attrs.get('measurements', {}))
+        if errors:
+            raise serializers.ValidationError({'measurements': errors})
+        return attrs
+
+
+
+class MeasurementRevisionSerializer(serializers.ModelSerializer):
+    """Serializer for the revisions of a customer measurement."""
+
+    class Meta:
+        model = MeasurementRevision
+        fields = ('number', 'is_snapshot', 'created_at')
+        read_only_fields = fields
+
+
+class MeasurementRevisionStateSerializer(serializers.Serializer):
+    """Serializer for a customer measurement as of one revision."""
+    number = serializers.IntegerField()
+    created_at = serializers.DateTimeField()
+    template = serializers.IntegerField()
+    measurements = serializers.JSONField()
+    notes = serializers.CharField()
+
+
+class StandardSizeSerializer(serializers.ModelSerializer):
+    """Serializer for standard sizes."""
+
+    class Meta:
+        model = StandardSize
+        fields = ('id', 'template', 'name', 'measurements')
+        read_only_fields = fields
+
+
+class SizeQuerySerializer(serializers.Serializer):
+    """Measurements to find the closest standard sizes for."""
+    template = TemplateField()
+    measurements = serializers.JSONField()
 
+    def validate(self, attrs):
+        errors = check_measurements(attrs['template'].pk, attrs['measurements'], partial=True)
+        if errors:
+            raise serializers.ValidationError({'measurements': errors})
+        return attrs
@@ -0,0 +1,43 @@
+from django.db.models.signals import post_delete, post_save
+from django.dispatch import receiver
+from .history import record_revision
+from .models import CustomerMeasurement, MeasurementTemplate, StandardSize
+from .projection import rescale_template, sync_values
+from .recommendation import discard_measurement
+from .registry import invalidate_templates
+
+
+@receiver(post_save, sender=MeasurementTemplate)
+@receiver(post_delete, sender=MeasurementTemplate)
+@receiver(post_save, sender=StandardSize)
+@receiver(post_delete, sender=StandardSize)
+def invalidate_template_registry(sender, instance, **kwargs):
+    """Make every worker reload its template registry."""
+    invalidate_templates()
+
+
+@receiver(post_save, sender=CustomerMeasurement)
+def record_measurement_revision(sender, instance, raw=False, **kwargs):
+    """Keep the measurement's history; see ``measurements.history``."""
+    if not raw:
+        record_revision(instance.pk)
+
+
+@receiver(post_delete, sender=CustomerMeasurement)
+def drop_measurement_from_recommendations(sender, instance, **kwargs):
+    """Stop matching a deleted measurement in every worker."""
+    discard_measurement(instance.pk)
+
+
+@receiver(post_save, sender=CustomerMeasurement)
+def project_measurement_values(sender, instance, raw=False, **kwargs):
+    """Keep the typed copy of the measurement's values in sync."""
+    if not raw:
+        sync_values(instance)
+
+
+@receiver(post_save, sender=MeasurementTemplate)
+def rescale_measurement_values(sender, instance, created=False, raw=False, **kwargs):
+    """Re-convert stored values when a template's units change."""
+    if not created and not raw:
+        rescale_template(instance)
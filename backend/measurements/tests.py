@@ -1,3 +1,370 @@
-from django.test import TestCase
+import math
+from datetime import timedelta
+from types import SimpleNamespace
+from unittest import mock
 
-# Create your tests here.
+import numpy as np
+from django.core.cache import cache
+from django.test import TestCase, override_settings
+from django.urls import reverse
+from rest_framework.exceptions import ValidationError
+from rest_framework.test import APIClient
+from users.models import User
+from . import recommendation
+from .filters import MeasurementRangeFilter
+from .history import apply_delta, diff_states, get_revision
+from .models import CustomerMeasurement, MeasurementRevision, MeasurementTemplate, MeasurementValue
+from .recommendation import MeasurementIndex, VectorSpace, VectorTable, nearest
+from .registry import get_registry
+
+
+def make_user(email, user_type='CUSTOMER'):
+    return User.objects.create_user(
+        email=email, password='pass12345!', full_name=email.split('@')[0], user_type=user_type
+    )
+
+
+class MeasurementTestCase(TestCase):
+
+    def setUp(self):
+        self.customer = make_user('customer@example.com')
+        self.template = MeasurementTemplate.objects.create(
+            name='Shirt',
+            measurement_type='SHIRT',
+            standard_measurements={
+                'chest': {'unit': 'cm', 'min': 50, 'max': 200},
+                'waist': {'unit': 'cm'},
+                'sleeve': {'unit': 'in'},
+            },
+        )
+
+    def client_for(self, user):
+        client = APIClient()
+        client.force_authenticate(user)
+        return client
+
+    def create_measurement(self, values, customer=None, template=None, notes=''):
+        return CustomerMeasurement.objects.create(
+            customer=customer or self.customer,
+            template=template or self.template,
+            measurements=values,
+            notes=notes,
+        )
+
+
+class DeltaTests(TestCase):
+
+    def test_delta_round_trip(self):
+        old = {'template': 1, 'notes': '', 'measurements': {'chest': 100, 'waist': 80, 'hip': 95}}
+        new = {'template': 1, 'notes': 'Looser', 'measurements': {'chest': 102, 'waist': 80, 'neck': 40}}
+
+        delta = diff_states(old, new)
+
+        self.assertEqual(delta, {'notes': 'Looser', 'set': {'chest': 102, 'neck': 40}, 'unset': ['hip']})
+        self.assertEqual(apply_delta(old, delta), new)
+
+    def test_non_mapping_values_are_replaced_whole(self):
+        old = {'template': 1, 'notes': '', 'measurements': [1, 2]}
+        new = {'template': 2, 'notes': '', 'measurements': {'chest': 100}}
+
+        self.assertEqual(apply_delta(old, diff_states(old, new)), new)
+
+
+class TemplateRegistryTests(MeasurementTestCase):
+
+    def test_template_created_through_another_worker_is_found(self):
+        get_registry()
+        # The version bump of another worker has not been seen yet.
+        template = MeasurementTemplate.objects.create(
+            name='Trousers', measurement_type='PANTS', standard_measurements={'waist': {'unit': 'cm'}}
+        )
+        client = self.client_for(self.customer)
+        url = reverse('measurements:measurement-list')
+
+        created = client.post(url, {'template': template.pk, 'measurements': {'waist': 80}}, format='json')
+        unknown = client.post(url, {'template': template.pk + 1, 'measurements': {}}, format='json')
+
+        self.assertEqual(created.status_code, 201, created.data)
+        self.assertEqual(unknown.status_code, 400)
+        self.assertIn(template.pk, get_registry().templates)
+
+
+@override_settings(MEASUREMENT_SNAPSHOT_INTERVAL=3)
+class RevisionTests(MeasurementTestCase):
+
+    def save_states(self, count):
+        measurement = self.create_measurement({'chest': 100})
+        states = [{'chest': 100}]
+        for step in range(1, count):
+            values = {'chest': 100 + step, 'waist': 80}
+            if step % 2:
+                values['sleeve'] = 25
+            measurement.measurements = values
+            measurement.save()
+            states.append(values)
+        return measurement, states
+
+    def test_every_interval_starts_a_snapshot(self):
+        measurement, _ = self.save_states(8)
+
+        revisions = MeasurementRevision.objects.filter(measurement=measurement).order_by('number')
+        self.assertEqual(
+            [(revision.number, revision.is_snapshot) for revision in revisions],
+            [(1, True), (2, False), (3, False), (4, True), (5, False), (6, False), (7, True), (8, False)],
+        )
+        self.assertNotIn('measurements', revisions[1].data)
+
+    def test_every_revision_rebuilds_to_the_saved_state(self):
+        measurement, states = self.save_states(8)
+
+        for number, values in enumerate(states, start=1):
+            revision, state = get_revision(measurement.pk, number)
+            self.assertEqual(revision.number, number)
+            self.assertEqual(state['measurements'], values)
+        self.assertIsNone(get_revision(measurement.pk, 9))
+
+    def test_unchanged_save_records_nothing(self):
+        measurement = self.create_measurement({'chest': 100})
+
+        measurement.save()
+
+        self.assertEqual(MeasurementRevision.objects.filter(measurement=measurement).count(), 1)
+
+    def test_diff_endpoint_compares_two_revisions(self):
+        measurement, _ = self.save_states(5)
+        url = reverse('measurements:measurement-revision-diff', kwargs={'id': measurement.pk})
+
+        response = self.client_for(self.customer).get(url, {'from': 1})
+
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual((response.data['from'], response.data['to']), (1, 5))
+        self.assertEqual(response.data['changes']['measurements'], {
+            'chest': {'from': 100, 'to': 104},
+            'waist': {'from': None, 'to': 80},
+        })
+
+    def test_detail_endpoint_returns_the_revision_state(self):
+        measurement, states = self.save_states(5)
+        url = reverse('measurements:measurement-revision-detail', kwargs={'id': measurement.pk, 'number': 4})
+
+        response = self.client_for(self.customer).get(url)
+
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.data['measurements'], states[3])
+
+    def test_history_is_private(self):
+        measurement, _ = self.save_states(2)
+        url = reverse('measurements:measurement-revisions', kwargs={'id': measurement.pk})
+
+        response = self.client_for(make_user('other@example.com')).get(url)
+
+        self.assertEqual(response.status_code, 404)
+
+
+class VectorTableTests(TestCase):
+
+    def setUp(self):
+        self.space = VectorSpace([
+            SimpleNamespace(pk=1, standard_measurements={'chest': {'unit': 'cm'}, 'waist': {'unit': 'cm'}}),
+            SimpleNamespace(pk=2, standard_measurements={'chest': {'unit': 'in'}, 'waist': {'unit': 'in'}}),
+        ])
+
+    def table(self, rows):
+        ids = np.array([pk for pk, _, _ in rows], dtype=np.int64)
+        owners = np.array([owner for _, owner, _ in rows], dtype=np.int64)
+        return VectorTable(ids, owners, self.space.vectorize((1, values) for _, _, values in rows))
+
+    def query(self, values, template_id=1):
+        return self.space.vectorize([(template_id, values)])
+
+    def test_vectors_are_in_cm_with_missing_fields_masked(self):
+        packed = self.space.vectorize([(2, {'chest': 40}), (1, {'waist': 80, 'hip': 90})])
+
+        values, present = packed[:, 2:4], packed[:, 4:]
+        self.assertAlmostEqual(float(values[0, 0]), 101.6, places=4)
+        self.assertEqual(present.tolist(), [[1, 0], [0, 1]])
+
+    def test_distance_is_rms_over_shared_fields(self):
+        table = self.table([(1, 10, {'chest': 100, 'waist': 80}), (2, 20, {'chest': 103, 'waist': 84})])
+
+        distances = table.distances(self.query({'chest': 100, 'waist': 80}))[:, 0]
+
+        self.assertAlmostEqual(float(distances[0]), 0.0, places=4)
+        self.assertAlmostEqual(float(distances[1]), math.sqrt((9 + 16) / 2), places=3)
+
+    @override_settings(MEASUREMENT_RECOMMENDATION_MIN_SHARED=1.0)
+    def test_rows_missing_query_fields_never_match(self):
+        table = self.table([(1, 10, {'chest': 100})])
+
+        distances = table.distances(self.query({'chest': 100, 'waist': 80}))
+
+        self.assertTrue(np.isinf(distances[0, 0]))
+
+    def test_upsert_replaces_and_appends_without_touching_the_old_table(self):
+        old = self.table([(1, 10, {'chest': 100, 'waist': 80}), (2, 20, {'chest': 110, 'waist': 90})])
+
+        new = old.upsert(
+            np.array([2, 3], dtype=np.int64),
+            np.array([20, 30], dtype=np.int64),
+            self.space.vectorize([(1, {'chest': 120, 'waist': 100}), (1, {'chest': 101, 'waist': 81})]),
+        )
+
+        query = self.query({'chest': 120, 'waist': 100})
+        self.assertEqual(new.ids[nearest(new.distances(query)[:, 0], 1)].tolist(), [2])
+        self.assertEqual(new.rows_for([2, 3]).tolist(), [2, 3])
+        # Readers of the old table must not see the new rows.
+        self.assertEqual(old.rows_for([3, 2]).tolist(), [1])
+        self.assertEqual(len(old.distances(query, old.rows_for([3, 2]))), 1)
+        self.assertEqual(len(old.without([3])), 2)
+
+    def test_unchanged_upsert_returns_the_same_table(self):
+        table = self.table([(1, 10, {'chest': 100, 'waist': 80})])
+
+        same = table.upsert(table.ids.copy(), table.owners.copy(), table.packed.copy())
+
+        self.assertIs(same, table)
+
+    def test_upsert_only_appends_changed_rows(self):
+        table = self.table([(1, 10, {'chest': 100, 'waist': 80}), (2, 20, {'chest': 110, 'waist': 90})])
+
+        new = table.upsert(
+            table.ids.copy(),
+            table.owners.copy(),
+            self.space.vectorize([(1, {'chest': 100, 'waist': 80}), (1, {'chest': 111, 'waist': 90})]),
+        )
+
+        self.assertEqual(new.ids.tolist(), [1, 2, 2])
+        self.assertEqual(new.rows_for([1, 2]).tolist(), [0, 2])
+
+    def test_without_hides_rows(self):
+        table = self.table([(1, 10, {'chest': 100, 'waist': 80}), (2, 20, {'chest': 100, 'waist': 80})])
+
+        distances = table.without([1]).distances(self.query({'chest': 100, 'waist': 80}))[:, 0]
+
+        self.assertEqual(nearest(distances, 5).tolist(), [1])
+
+    @mock.patch.object(recommendation, 'CLUSTER_MIN_ROWS', 100)
+    @override_settings(MEASUREMENT_RECOMMENDATION_PROBES=2)
+    def test_clustered_search_finds_the_nearest_row_and_the_tail(self):
+        rng = np.random.default_rng(1)
+        centres = rng.uniform(60, 140, size=(10, 2))
+        points = (centres[rng.integers(0, 10, 1000)] + rng.normal(0, 1, (1000, 2))).tolist()
+        rows = [(pk, pk, {'chest': chest, 'waist': waist}) for pk, (chest, waist) in enumerate(points)]
+        built = self.table(rows)
+        table = VectorTable.build(built.ids, built.owners, built.packed)
+        self.assertIsNotNone(table.centroids)
+        table = table.upsert(
+            np.array([5000], dtype=np.int64),
+            np.array([5000], dtype=np.int64),
+            self.query({'chest': 200, 'waist': 200}),
+        )
+
+        for values, expected in ((points[7], 7), ([200, 200], 5000)):
+            query = self.query({'chest': values[0], 'waist': values[1]})
+            rows = table.candidate_rows(query)
+            self.assertLess(len(rows), len(table))
+            found = rows[nearest(table.distances(query, rows)[:, 0], 1)]
+            self.assertEqual(table.ids[found].tolist(), [expected])
+
+
+class MeasurementIndexTests(MeasurementTestCase):
+
+    def setUp(self):
+        super().setUp()
+        cache.clear()
+        self.others = [make_user(f'customer{index}@example.com') for index in range(3)]
+        self.mine = self.create_measurement({'chest': 100, 'waist': 80})
+        self.near = self.create_measurement({'chest': 101, 'waist': 81}, customer=self.others[0])
+        self.far = self.create_measurement({'chest': 130, 'waist': 110}, customer=self.others[1])
+        self.same = self.create_measurement({'chest': 100, 'waist': 80}, customer=self.others[2])
+
+    def test_similar_excludes_the_customer_and_ranks_by_distance(self):
+        index = MeasurementIndex()
+        index.refresh(force=True)
+
+        found = index.similar(self.template.pk, self.mine.measurements, 5, exclude_customer=self.customer.pk)
+
+        self.assertEqual([pk for pk, _, _ in found], [self.same.pk, self.near.pk, self.far.pk])
+
+    def test_changes_committed_behind_the_watermark_are_picked_up(self):
+        index = MeasurementIndex()
+        index.refresh(force=True)
+        # Saved by a transaction that started before the last refresh.
+        CustomerMeasurement.objects.filter(pk=self.far.pk).update(
+            measurements={'chest': 100, 'waist': 80}, updated_at=index.watermark - timedelta(seconds=5)
+        )
+
+        index._apply_changes()
+
+        found = index.similar(self.template.pk, self.mine.measurements, 5, exclude_customer=self.customer.pk)
+        self.assertEqual(found[-1][0], self.near.pk)
+
+    def test_deletions_reach_every_index(self):
+        first, second = MeasurementIndex(), MeasurementIndex()
+        first.refresh(force=True)
+        second.refresh(force=True)
+
+        with self.captureOnCommitCallbacks(execute=True):
+            self.near.delete()
+        second._apply_changes()
+
+        for index in (recommendation._index, second):
+            found = index.similar(self.template.pk, self.mine.measurements, 5, exclude_customer=self.customer.pk)
+            self.assertNotIn(self.near.pk, [pk for pk, _, _ in found])
+
+
+class RangeFilterTests(MeasurementTestCase):
+
+    def setUp(self):
+        super().setUp()
+        self.small = self.create_measurement({'chest': 100, 'waist': 80, 'sleeve': 24})
+        self.medium = self.create_measurement({'chest': 110, 'waist': 90, 'sleeve': 25})
+        self.large = self.create_measurement({'chest': 120, 'waist': 100, 'sleeve': 26, 'fit': 'loose'})
+        self.create_measurement({'chest': 130}, customer=make_user('other@example.com'))
+        self.url = reverse('measurements:measurement-list')
+
+    def listed(self, params):
+        response = self.client_for(self.customer).get(self.url, params)
+        self.assertEqual(response.status_code, 200, response.data)
+        return sorted(measurement['id'] for measurement in response.data['results'])
+
+    def test_parse_range(self):
+        parse = MeasurementRangeFilter().parse_range
+
+        self.assertEqual(parse('chest:110:', 1.0), ('chest', 110.0, None))
+        self.assertEqual(parse('waist::90', 1.0), ('waist', None, 90.0))
+        self.assertEqual(parse('chest:10:20', 2.54), ('chest', 25.4, 50.8))
+        for value in ('chest', 'chest::', 'chest:x:', ':1:2'):
+            with self.assertRaises(ValidationError, msg=value):
+                parse(value, 1.0)
+
+    def test_values_are_projected_to_cm(self):
+        values = dict(MeasurementValue.objects.filter(measurement=self.medium).values_list('key', 'value'))
+
+        self.assertEqual(set(values), {'chest', 'waist', 'sleeve'})
+        self.assertEqual(values['chest'], 110)
+        self.assertAlmostEqual(values['sleeve'], 63.5)
+
+    def test_bounds_are_inclusive_and_combine(self):
+        self.assertEqual(self.listed({'range': 'chest:110:'}), [self.medium.pk, self.large.pk])
+        self.assertEqual(self.listed({'range': 'chest::110'}), [self.small.pk, self.medium.pk])
+        self.assertEqual(self.listed({'range': ['chest:100:', 'waist::90']}), [self.small.pk, self.medium.pk])
+        self.assertEqual(self.listed({'range': 'hip:0:'}), [])
+
+    def test_bounds_in_another_unit(self):
+        self.assertEqual(self.listed({'range': 'sleeve:63:64'}), [self.medium.pk])
+        self.assertEqual(self.listed({'range': 'sleeve:25:', 'unit': 'in'}), [self.medium.pk, self.large.pk])
+
+    def test_invalid_parameters_are_rejected(self):
+        client = self.client_for(self.customer)
+
+        for params in ({'range': 'chest:x:'}, {'range': 'chest:1:', 'unit': 'furlong'}):
+            self.assertEqual(client.get(self.url, params).status_code, 400, params)
+
+    def test_unit_changes_rescale_stored_values(self):
+        self.template.standard_measurements = {'chest': {'unit': 'in'}, 'waist': {'unit': 'cm'}}
+        self.template.save()
+
+        self.assertEqual(self.listed({'range': 'chest:254:280'}), [self.small.pk, self.medium.pk])
+        # Sleeve left the schema, so its values are taken as cm again.
+        self.assertEqual(self.listed({'range': 'sleeve:25:'}), [self.medium.pk, self.large.pk])
@@ -3,7 +3,14 @@ from .views import (
     MeasurementTemplateListView,
     MeasurementTemplateDetailView,
     CustomerMeasurementListView,
-    CustomerMeasurementDetailView
+    CustomerMeasurementDetailView,
+    CustomerMeasurementExportView,
+    MeasurementRevisionListView,
+    MeasurementRevisionDetailView,
+    MeasurementRevisionDiffView,
+    MeasurementSizeView,
+    SimilarMeasurementView,
+    StandardSizeMatchView
 )
 
 app_name = 'measurements'
@@ -16,5 +23,18 @@ urlpatterns = [
     # Customer measurement endpoints (authenticated)
     path('', CustomerMeasurementListView.as_view(), name='measurement-list'),
     path('<int:id>/', CustomerMeasurementDetailView.as_view(), name='measurement-detail'),
+    path('<int:id>/revisions/', MeasurementRevisionListView.as_view(), name='measurement-revisions'),
+    path('<int:id>/revisions/diff/', MeasurementRevisionDiffView.as_view(), name='measurement-revision-diff'),
+    path('<int:id>/sizes/', MeasurementSizeView.as_view(), name='measurement-sizes'),
+    path('<int:id>/similar/', SimilarMeasurementView.as_view(), name='measurement-similar'),
+    path('sizes/', StandardSizeMatchView.as_view(), name='size-match'),
+    path(
+        '<int:id>/revisions/<int:number>/',
+        MeasurementRevisionDetailView.as_view(),
+        name='measurement-revision-detail'
+    ),
+
+    # Admin export
+    path('export/', CustomerMeasurementExportView.as_view(), name='measurement-export'),
 ]
 
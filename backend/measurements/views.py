@@ -1,41 +1,80 @@
+from django.db.models import Exists, Max, OuterRef
+from django_filters.rest_framework import DjangoFilterBackend
 from rest_framework import generics
+from rest_framework.exceptions import NotFound, PermissionDenied, ValidationError
+from rest_framework.filters import OrderingFilter
 from rest_framework.permissions import AllowAny, IsAuthenticated
-from .models import MeasurementTemplate, CustomerMeasurement
+from rest_framework.response import Response
+from core.expansion import ExpandableQuerysetMixin
+from core.exports import ExportView
+from core.idempotency import IdempotencyMixin
+from core.pagination import KeysetPagination
+from orders.models import ArchivedOrder, Order
+from . import exports
+from .filters import MeasurementRangeFilter
+from .history import compare_states, get_revision
+from .models import CustomerMeasurement, MeasurementRevision
+from .recommendation import get_index
+from .registry import TemplateRegistryMixin, get_registry, template_data
 from .serializers import (
     MeasurementTemplateSerializer,
     CustomerMeasurementSerializer,
-    CustomerMeasurementCreateSerializer
+    CustomerMeasurementCreateSerializer,
+    MeasurementRevisionSerializer,
+    MeasurementRevisionStateSerializer,
+    SizeQuerySerializer,
+    StandardSizeSerializer
 )
 
 
-class MeasurementTemplateListView(generics.ListAPIView):
-    """List all measurement templates."""
+class MeasurementTemplateListView(TemplateRegistryMixin, generics.ListAPIView):
+    """List all measurement templates, served from the template registry."""
 
-    queryset = MeasurementTemplate.objects.all()
     serializer_class = MeasurementTemplateSerializer
     permission_classes = (AllowAny,)
 
+    def list(self, request, *args, **kwargs):
+        templates = get_registry().list_data
+        page = self.paginate_queryset(templates)
+        if page is not None:
+            return self.get_paginated_response(page)
+        return Response(templates)
 
-class MeasurementTemplateDetailView(generics.RetrieveAPIView):
+
+class MeasurementTemplateDetailView(TemplateRegistryMixin, generics.RetrieveAPIView):
     """Get detailed information about a measurement template."""
 
-    queryset = MeasurementTemplate.objects.all()
     serializer_class = MeasurementTemplateSerializer
     permission_classes = (AllowAny,)
     lookup_field = 'id'
 
+    def retrieve(self, request, *args, **kwargs):
+        data = template_data(self.kwargs['id'])
+        if data is None:
+            raise NotFound("Measurement template not found.")
+        return Response(data)
+
 
-class CustomerMeasurementListView(generics.ListCreateAPIView):
-    """List user's measurements or create a new measurement."""
+class CustomerMeasurementListView(IdempotencyMixin, ExpandableQuerysetMixin, generics.ListCreateAPIView):
+    """
+    List user's measurements or create a new measurement.
+
+    Admins list every customer's measurements. ``?range=``,
+    ``?measurement_type=`` and ``?template=`` filter on measurement values;
+    see ``measurements.filters.MeasurementRangeFilter``.
+    """
 
     serializer_class = CustomerMeasurementSerializer
     permission_classes = (IsAuthenticated,)
+    pagination_class = KeysetPagination
+    filter_backends = [DjangoFilterBackend, OrderingFilter, MeasurementRangeFilter]
 
     def get_queryset(self):
-        """Return only the authenticated user's measurements."""
-        return CustomerMeasurement.objects.filter(
-            customer=self.request.user
-        ).select_related('template', 'customer')
+        """Return the authenticated user's measurements, or all for admins."""
+        queryset = CustomerMeasurement.objects.all()
+        if self.request.user.user_type != 'ADMIN':
+            queryset = queryset.filter(customer=self.request.user)
+        return self.expand_queryset(queryset)
 
     def get_serializer_class(self):
         """Use different serializer for creation."""
@@ -48,7 +87,9 @@ class CustomerMeasurementListView(generics.ListCreateAPIView):
         serializer.save(customer=self.request.user)
 
 
-class CustomerMeasurementDetailView(generics.RetrieveUpdateDestroyAPIView):
+class CustomerMeasurementDetailView(
+    IdempotencyMixin, ExpandableQuerysetMixin, generics.RetrieveUpdateDestroyAPIView
+):
     """Get, update, or delete a specific measurement."""
 
     serializer_class = CustomerMeasurementSerializer
@@ -57,6 +98,236 @@ class CustomerMeasurementDetailView(generics.RetrieveUpdateDestroyAPIView):
 
     def get_queryset(self):
         """Return only the authenticated user's measurements."""
-        return CustomerMeasurement.objects.filter(
-            customer=self.request.user
-        ).select_related('template', 'customer')
+        return self.expand_queryset(
+            CustomerMeasurement.objects.filter(customer=self.request.user)
+        )
+
+
+class MeasurementAccessMixin:
+    """
+    Access to one customer measurement by ``id``.
+
+    Customers see their own measurements, tailors those attached to their
+    orders, archived ones included, and admins every measurement.
+    """
+
+    permission_classes = (IsAuthenticated,)
+
+    def get_measurement_queryset(self):
+        user = self.request.user
+        queryset = CustomerMeasurement.objects.filter(pk=self.kwargs['id'])
+        if user.user_type == 'CUSTOMER':
+            queryset = queryset.filter(customer=user)
+        elif user.user_type == 'TAILOR':
+            queryset = queryset.filter(
+                Exists(Order.objects.filter(customer_measurement=OuterRef('pk'), tailor=user))
+                | Exists(ArchivedOrder.objects.filter(customer_measurement=OuterRef('pk'), tailor=user))
+            )
+        return queryset
+
+    def get_measurement_id(self):
+        """Return the id of the requested measurement if the user may see it."""
+        if not self.get_measurement_queryset().exists():
+            raise NotFound("Measurement not found.")
+        return int(self.kwargs['id'])
+
+    def get_measurement_values(self):
+        """Return the measurement's id, customer, template and values."""
+        measurement = self.get_measurement_queryset().values(
+            'id', 'customer_id', 'template_id', 'measurements'
+        ).first()
+        if measurement is None:
+            raise NotFound("Measurement not found.")
+        return measurement
+
+
+class MeasurementHistoryMixin(MeasurementAccessMixin):
+    """Access to one measurement's history."""
+
+    def get_state(self, measurement_id, number):
+        """Return ``(revision, state)`` for a revision or raise NotFound."""
+        found = get_revision(measurement_id, number)
+        if found is None:
+            raise NotFound(f"Revision {number} not found.")
+        return found
+
+
+class MeasurementRevisionListView(MeasurementHistoryMixin, generics.ListAPIView):
+    """List the revisions of a measurement, newest first."""
+
+    serializer_class = MeasurementRevisionSerializer
+
+    def get_queryset(self):
+        return MeasurementRevision.objects.filter(
+            measurement_id=self.get_measurement_id()
+        ).order_by('-number')
+
+
+class MeasurementRevisionDetailView(MeasurementHistoryMixin, generics.GenericAPIView):
+    """A measurement as it was at one revision."""
+
+    serializer_class = MeasurementRevisionStateSerializer
+
+    def get(self, request, *args, **kwargs):
+        revision, state = self.get_state(self.get_measurement_id(), self.kwargs['number'])
+        return Response(self.get_serializer({
+            'number': revision.number,
+            'created_at': revision.created_at,
+            **state,
+        }).data)
+
+
+class MeasurementRevisionDiffView(MeasurementHistoryMixin, generics.GenericAPIView):
+    """
+    Changes between two revisions of a measurement.
+
+    ``?from=`` and ``?to=`` are revision numbers; ``to`` defaults to the
+    latest revision.
+    """
+
+    def get(self, request, *args, **kwargs):
+        measurement_id = self.get_measurement_id()
+        params = request.query_params
+        if not params.get('from'):
+            raise ValidationError({'from': "This parameter is required."})
+        try:
+            old_number = int(params['from'])
+            new_number = int(params['to']) if params.get('to') else None
+        except ValueError:
+            raise ValidationError("from and to must be revision numbers.")
+        if new_number is None:
+            new_number = MeasurementRevision.objects.filter(
+                measurement_id=measurement_id
+            ).aggregate(latest=Max('number'))['latest'] or 0
+        old, old_state = self.get_state(measurement_id, old_number)
+        new, new_state = self.get_state(measurement_id, new_number)
+        return Response({
+            'from': old.number,
+            'to': new.number,
+            'changes': compare_states(old_state, new_state),
+        })
+
+
+class RecommendationMixin:
+    """``?limit=`` handling for recommendation views."""
+
+    default_limit = 3
+    max_limit = 20
+
+    def get_limit(self):
+        try:
+            limit = int(self.request.query_params.get('limit', self.default_limit))
+        except ValueError:
+            raise ValidationError({'limit': "Must be a number."})
+        return min(max(limit, 1), self.max_limit)
+
+    def size_results(self, matches):
+        return [
+            {'size': StandardSizeSerializer(size).data, 'distance_cm': round(distance, 2)}
+            for size, distance in matches
+        ]
+
+
+class MeasurementSizeView(RecommendationMixin, MeasurementAccessMixin, generics.GenericAPIView):
+    """
+    Standard sizes closest to a saved measurement, closest first.
+
+    ``distance_cm`` is the root mean square difference over the fields both
+    share; see ``measurements.recommendation``.
+    """
+
+    def get(self, request, *args, **kwargs):
+        measurement = self.get_measurement_values()
+        matches, = get_index().closest_sizes(
+            [(measurement['template_id'], measurement['measurements'])], self.get_limit()
+        )
+        return Response({'measurement': measurement['id'], 'results': self.size_results(matches)})
+
+
+class StandardSizeMatchView(RecommendationMixin, generics.GenericAPIView):
+    """
+    Standard sizes closest to measurements that are not saved.
+
+    Accepts one ``{template, measurements}`` object, or a list of up to
+    ``max_batch`` of them answered in one pass, and responds in the same
+    shape.
+    """
+
+    serializer_class = SizeQuerySerializer
+    permission_classes = (IsAuthenticated,)
+    max_batch = 100
+
+    def post(self, request, *args, **kwargs):
+        many = isinstance(request.data, list)
+        serializer = self.get_serializer(
+            data=request.data, many=many, **({'max_length': self.max_batch} if many else {})
+        )
+        serializer.is_valid(raise_exception=True)
+        queries = serializer.validated_data if many else [serializer.validated_data]
+        results = get_index().closest_sizes(
+            [(query['template'].pk, query['measurements']) for query in queries], self.get_limit()
+        )
+        data = [{'results': self.size_results(matches)} for matches in results]
+        return Response(data if many else data[0])
+
+
+class SimilarMeasurementView(RecommendationMixin, MeasurementAccessMixin, generics.GenericAPIView):
+    """
+    Other customers whose measurements are closest to this one (tailors
+    and admins only). Tailors only see customers who ordered from them.
+    """
+
+    default_limit = 10
+    max_limit = 50
+
+    def get(self, request, *args, **kwargs):
+        from orders.models import Order
+        from users.models import User
+
+        user = request.user
+        if user.user_type not in ('TAILOR', 'ADMIN'):
+            raise PermissionDenied("Only tailors and admins can search for similar customers.")
+        measurement = self.get_measurement_values()
+        candidates = None
+        if user.user_type == 'TAILOR':
+            candidates = CustomerMeasurement.objects.filter(
+                customer__in=Order.objects.filter(tailor=user).values('customer_id')
+            ).values_list('id', flat=True)
+        matches = get_index().similar(
+            measurement['template_id'],
+            measurement['measurements'],
+            self.get_limit(),
+            exclude_customer=measurement['customer_id'],
+            candidates=None if candidates is None else list(candidates),
+        )
+        names = User.objects.filter(
+            id__in=[customer for _, customer, _ in matches]
+        ).in_bulk()
+        return Response({
+            'measurement': measurement['id'],
+            'results': [
+                {
+                    'measurement': measurement_id,
+                    'customer': customer,
+                    'customer_name': names[customer].full_name if customer in names else None,
+                    'distance_cm': round(distance, 2),
+                }
+                for measurement_id, customer, distance in matches
+            ],
+        })
+
+
+class CustomerMeasurementExportView(ExportView):
+    """
+    Stream customer measurements (admins only).
+
+    Filters: ``created_after``, ``created_before``, ``customer`` and
+    ``measurement_type``.
+    """
+
+    filename = 'measurements'
+    columns = exports.COLUMNS
+    filters = exports.FILTERS
+
+    def get_records(self, filters):
+        return exports.measurement_records(filters)
@@ -1,5 +1,9 @@
 from django.contrib import admin
-from .models import Order, OrderItem
+from django.db import transaction
+from tailors.workload import record_orders_created
+from . import rollups
+from .models import ArchivedOrder, ArchivedOrderItem, Order, OrderEvent, OrderItem
+from .realtime import publish_events
 
 
 class OrderItemInline(admin.TabularInline):
@@ -38,3 +42,65 @@ class OrderAdmin(admin.ModelAdmin):
             'classes': ('collapse',)
         }),
     )
+    
+    def get_readonly_fields(self, request, obj=None):
+        # Status changes go through the order status endpoint, which keeps
+        # the event log, rollups and tailor workload counters in step.
+        if obj is not None:
+            return self.readonly_fields + ('tailor', 'status')
+        return self.readonly_fields
+    
+    def save_model(self, request, obj, form, change):
+        with transaction.atomic():
+            super().save_model(request, obj, form, change)
+            if not change:
+                event = OrderEvent.for_created(obj)
+                event.actor = request.user
+                event.save()
+                publish_events([event])
+                rollups.record_created([obj])
+                record_orders_created(obj.tailor_id, [obj.status])
+
+
+@admin.register(OrderEvent)
+class OrderEventAdmin(admin.ModelAdmin):
+    """Read-only admin for the order event log."""
+    
+    list_display = ('order', 'sequence', 'event_type', 'from_status', 'to_status', 'actor', 'created_at')
+    list_filter = ('event_type', 'to_status')
+    search_fields = ('order__order_number',)
+    
+    def has_add_permission(self, request):
+        return False
+    
+    def has_change_permission(self, request, obj=None):
+        return False
+    
+    def has_delete_permission(self, request, obj=None):
+        return False
+
+
+class ArchivedOrderItemInline(admin.TabularInline):
+    """Read-only inline for archived order items."""
+    model = ArchivedOrderItem
+    extra = 0
+    fields = ('item_name', 'quantity', 'price', 'measurements', 'special_instructions')
+    readonly_fields = fields
+    can_delete = False
+
+
+@admin.register(ArchivedOrder)
+class ArchivedOrderAdmin(admin.ModelAdmin):
+    """Read-only admin for archived orders."""
+    
+    inlines = [ArchivedOrderItemInline]
+    
+    list_display = ('order_number', 'customer', 'tailor', 'order_type', 'status', 'total_price', 'created_at', 'archived_at')
+    list_filter = ('status', 'order_type')
+    search_fields = ('order_number', 'customer__email', 'tailor__email')
+    
+    def has_add_permission(self, request):
+        return False
+    
+    def has_change_permission(self, request, obj=None):
+        return False
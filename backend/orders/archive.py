@@ -0,0 +1,76 @@
+"""
+Hot/cold storage for closed orders.
+
+Completed and cancelled orders untouched for ``ORDER_ARCHIVE_AFTER_DAYS``
+are moved, with their items, from ``Order``/``OrderItem`` into
+``ArchivedOrder``/``ArchivedOrderItem`` by ``archive_orders``, keeping ids,
+order numbers and timestamps. The active tables and their indexes then only
+hold the working set. Order detail views fall back to the archive, so
+lookups by id or order number keep working; order events and reviews are
+not foreign-key constrained and survive the move.
+"""
+from contextvars import ContextVar
+from datetime import timedelta
+
+from django.conf import settings
+from django.db import transaction
+from django.utils import timezone
+from .models import ArchivedOrder, ArchivedOrderItem, Order, OrderItem
+from .state_machine import TERMINAL_STATUSES
+
+ORDER_FIELDS = (
+    'id', 'order_number', 'customer_id', 'tailor_id', 'order_type', 'status',
+    'version', 'total_price', 'deposit_amount', 'delivery_date',
+    'customer_measurement_id', 'special_instructions', 'created_at', 'updated_at',
+)
+ITEM_FIELDS = (
+    'id', 'order_id', 'item_name', 'quantity', 'price', 'measurements',
+    'special_instructions', 'created_at', 'updated_at',
+)
+
+_archiving = ContextVar('archiving', default=False)
+
+
+def is_archiving():
+    """Whether orders are being deleted because they were archived."""
+    return _archiving.get()
+
+
+def archive_cutoff(days=None):
+    """Closed orders last updated before this time are archived."""
+    if days is None:
+        days = settings.ORDER_ARCHIVE_AFTER_DAYS
+    return timezone.now() - timedelta(days=days)
+
+
+def archive_batch(cutoff, batch_size):
+    """
+    Move up to ``batch_size`` closed orders updated before ``cutoff`` into
+    the archive in one transaction. Returns the number of orders moved.
+
+    Rows locked by another run are skipped, so runs may overlap.
+    """
+    with transaction.atomic():
+        ids = list(
+            Order.objects.filter(status__in=TERMINAL_STATUSES, updated_at__lt=cutoff)
+            .order_by('id').select_for_update(skip_locked=True)
+            .values_list('id', flat=True)[:batch_size]
+        )
+        if not ids:
+            return 0
+        now = timezone.now()
+        ArchivedOrder.objects.bulk_create([
+            ArchivedOrder(archived_at=now, **row)
+            for row in Order.objects.filter(id__in=ids).values(*ORDER_FIELDS)
+        ])
+        ArchivedOrderItem.objects.bulk_create(
+            [ArchivedOrderItem(**row) for row in OrderItem.objects.filter(order_id__in=ids).values(*ITEM_FIELDS)],
+            batch_size=batch_size,
+        )
+        token = _archiving.set(True)
+        try:
+            Order.objects.filter(id__in=ids).delete()
+        finally:
+            _archiving.reset(token)
+    return len(ids)
+
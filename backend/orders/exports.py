@@ -0,0 +1,94 @@
+"""Order and order item exports; see ``core.exports``."""
+import heapq
+from datetime import date
+from operator import attrgetter
+
+from core.exports import CHUNK_SIZE
+from .models import ArchivedOrder, Order
+
+ORDER_COLUMNS = [
+    'order_number', 'status', 'order_type', 'customer_id', 'customer_email',
+    'tailor_id', 'tailor_email', 'total_price', 'deposit_amount',
+    'delivery_date', 'special_instructions', 'created_at', 'updated_at',
+]
+ITEM_COLUMNS = ['item_name', 'quantity', 'price', 'measurements', 'item_special_instructions']
+CSV_COLUMNS = ORDER_COLUMNS + ITEM_COLUMNS
+
+FILTERS = ('created_after', 'created_before', 'status', 'tailor')
+
+
+def filter_orders(queryset, filters):
+    """
+    Apply ``created_after``/``created_before`` (YYYY-MM-DD, inclusive),
+    ``status`` and ``tailor`` (user id) filters. Raises ValueError.
+    """
+    if filters.get('created_after'):
+        queryset = queryset.filter(created_at__date__gte=date.fromisoformat(filters['created_after']))
+    if filters.get('created_before'):
+        queryset = queryset.filter(created_at__date__lte=date.fromisoformat(filters['created_before']))
+    if filters.get('status'):
+        statuses = filters['status'].split(',')
+        unknown = set(statuses) - {code for code, _ in Order.STATUS_CHOICES}
+        if unknown:
+            raise ValueError(f"Unknown status: {', '.join(sorted(unknown))}")
+        queryset = queryset.filter(status__in=statuses)
+    if filters.get('tailor'):
+        queryset = queryset.filter(tailor_id=int(filters['tailor']))
+    return queryset
+
+
+def order_records(filters=None, chunk_size=CHUNK_SIZE):
+    """
+    Return an iterator of one dict per order with its items nested, oldest
+    first, archived orders included. Filters are validated immediately,
+    before anything is streamed.
+    """
+    querysets = [
+        filter_orders(model.objects.all(), filters or {}).select_related('customer', 'tailor').only(
+            *[column for column in ORDER_COLUMNS if not column.endswith('_email')],
+            'customer__email', 'tailor__email',
+        ).prefetch_related('items').order_by('id')
+        for model in (Order, ArchivedOrder)
+    ]
+    return _order_records(querysets, chunk_size)
+
+
+def _order_records(querysets, chunk_size):
+    # Archived orders keep their ids, so both tables merge in id order.
+    orders = heapq.merge(
+        *[queryset.iterator(chunk_size=chunk_size) for queryset in querysets],
+        key=attrgetter('pk'),
+    )
+    for order in orders:
+        record = {
+            column: getattr(order, column)
+            for column in ORDER_COLUMNS if not column.endswith('_email')
+        }
+        record['customer_email'] = order.customer.email
+        record['tailor_email'] = order.tailor.email
+        record['items'] = [
+            {
+                'item_name': item.item_name,
+                'quantity': item.quantity,
+                'price': item.price,
+                'measurements': item.measurements,
+                'special_instructions': item.special_instructions,
+            }
+            for item in order.items.all()
+        ]
+        yield record
+
+
+def order_rows(records):
+    """Flatten order records into one CSV row per item."""
+    for record in records:
+        items = record.pop('items') or [{}]
+        for item in items:
+            yield {
+                **record,
+                'item_name': item.get('item_name'),
+                'quantity': item.get('quantity'),
+                'price': item.get('price'),
+                'measurements': item.get('measurements'),
+                'item_special_instructions': item.get('special_instructions'),
+            }
@@ -0,0 +1,35 @@
+import time
+
+from django.core.management.base import BaseCommand
+from orders.archive import archive_batch, archive_cutoff
+
+
+class Command(BaseCommand):
+    help = (
+        "Move completed and cancelled orders older than ORDER_ARCHIVE_AFTER_DAYS, "
+        "with their items, into the archive tables in batches."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--older-than-days', type=int, help="Overrides ORDER_ARCHIVE_AFTER_DAYS.")
+        parser.add_argument('--batch-size', type=int, default=1000)
+        parser.add_argument('--max-batches', type=int, help="Stop after this many batches.")
+        parser.add_argument('--pause', type=float, default=0.0, help="Seconds to sleep between batches.")
+
+    def handle(self, *args, older_than_days, batch_size, max_batches, pause, **options):
+        cutoff = archive_cutoff(older_than_days)
+        total = batches = 0
+        started = time.monotonic()
+        while max_batches is None or batches < max_batches:
+            moved = archive_batch(cutoff, batch_size)
+            if not moved:
+                break
+            total += moved
+            batches += 1
+            if options['verbosity'] >= 2:
+                self.stdout.write(f"Archived {total} orders ({total / (time.monotonic() - started):.0f}/s)")
+            if pause:
+                time.sleep(pause)
+        self.stdout.write(self.style.SUCCESS(
+            f"Archived {total} orders last updated before {cutoff:%Y-%m-%d %H:%M}."
+        ))
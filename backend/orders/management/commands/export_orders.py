@@ -0,0 +1,14 @@
+from core.exports import ExportCommand
+from orders.exports import CSV_COLUMNS, FILTERS, order_records, order_rows
+
+
+class Command(ExportCommand):
+    help = "Stream orders, archived ones included, and their items as CSV (one row per item) or NDJSON."
+    columns = CSV_COLUMNS
+    filters = FILTERS
+
+    def get_records(self, filters, chunk_size):
+        return order_records(filters, chunk_size)
+
+    def flatten(self, records):
+        return order_rows(records)
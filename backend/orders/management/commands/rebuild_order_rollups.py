@@ -0,0 +1,84 @@
+from collections import defaultdict
+
+from django.core.management.base import BaseCommand
+from django.db import connection, transaction
+from django.db.models import Count, OuterRef, Subquery, Sum
+from django.db.models.functions import TruncDate
+from orders.models import ArchivedOrder, Order, OrderEvent, TailorDailyRollup
+from orders.rollups import STATUS_COUNTERS, STATUS_TOTALS
+
+
+class Command(BaseCommand):
+    help = (
+        "Rebuild daily tailor order rollups from orders and order events. "
+        "Order creation and status changes wait while the rebuild runs."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--since', help="First day to rebuild (YYYY-MM-DD); defaults to all days.")
+        parser.add_argument('--batch-size', type=int, default=1000)
+
+    def handle(self, *args, since, batch_size, **options):
+        with transaction.atomic():
+            with connection.cursor() as cursor:
+                # Writers update the rollups in the same transaction as the
+                # orders they count, so with the table locked every counted
+                # change is in the snapshot read below and the rest waits to
+                # be counted on top of the new rows. Repeatable read keeps
+                # orders being archived meanwhile from being read twice.
+                cursor.execute('SET TRANSACTION ISOLATION LEVEL REPEATABLE READ')
+                cursor.execute(f'LOCK TABLE {TailorDailyRollup._meta.db_table} IN EXCLUSIVE MODE')
+            events = OrderEvent.objects.exclude(event_type='CREATED').annotate(day=TruncDate('created_at'))
+            rollups = TailorDailyRollup.objects.all()
+            if since:
+                events = events.filter(day__gte=since)
+                rollups = rollups.filter(day__gte=since)
+
+            rows = defaultdict(lambda: defaultdict(int))
+            # Archived orders still count towards the days they happened on.
+            for model in (Order, ArchivedOrder):
+                orders = model.objects.annotate(day=TruncDate('created_at'))
+                if since:
+                    orders = orders.filter(day__gte=since)
+                created = orders.values('tailor_id', 'day').annotate(
+                    created_count=Count('id'),
+                    booked_total=Sum('total_price'),
+                    deposit_total=Sum('deposit_amount'),
+                ).order_by()
+                for row in created:
+                    values = rows[row.pop('tailor_id'), row.pop('day')]
+                    for field, value in row.items():
+                        values[field] += value or 0
+
+            transitions = events.filter(to_status__in=STATUS_COUNTERS).values(
+                'tailor_id', 'day', 'to_status'
+            ).annotate(count=Count('id')).order_by()
+            for row in transitions:
+                rows[row['tailor_id'], row['day']][STATUS_COUNTERS[row['to_status']]] = row['count']
+
+            # Orders enter a status with a total at most once and stay in it, so
+            # the total goes to the day of the event that moved them there.
+            for model in (Order, ArchivedOrder):
+                closed_on = events.filter(
+                    order_id=OuterRef('pk'), to_status=OuterRef('status')
+                ).order_by('-sequence').values('day')[:1]
+                closed = model.objects.filter(status__in=STATUS_TOTALS).annotate(
+                    day=Subquery(closed_on)
+                ).exclude(day=None).values('tailor_id', 'day', 'status').annotate(
+                    total=Sum('total_price')
+                ).order_by()
+                for row in closed:
+                    rows[row['tailor_id'], row['day']][STATUS_TOTALS[row['status']]] += row['total']
+
+            deleted, _ = rollups.delete()
+            TailorDailyRollup.objects.bulk_create(
+                [
+                    TailorDailyRollup(tailor_id=tailor_id, day=day, **values)
+                    for (tailor_id, day), values in rows.items()
+                ],
+                batch_size=batch_size,
+            )
+
+        self.stdout.write(self.style.SUCCESS(
+            f"Replaced {deleted} rollup rows with {len(rows)}."
+        ))
@@ -0,0 +1,41 @@
+# Generated by Django 6.0 on 2026-10-18 04:51
+
+import django.db.models.deletion
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('orders', '0004_orderevent'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='TailorDailyRollup',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('day', models.DateField()),
+                ('created_count', models.PositiveIntegerField(default=0)),
+                ('confirmed_count', models.PositiveIntegerField(default=0)),
+                ('in_progress_count', models.PositiveIntegerField(default=0)),
+                ('ready_count', models.PositiveIntegerField(default=0)),
+                ('completed_count', models.PositiveIntegerField(default=0)),
+                ('cancelled_count', models.PositiveIntegerField(default=0)),
+                ('booked_total', models.DecimalField(decimal_places=2, default=0, help_text='Total price of orders created on this day', max_digits=14)),
+                ('deposit_total', models.DecimalField(decimal_places=2, default=0, help_text='Deposits of orders created on this day', max_digits=14)),
+                ('revenue_total', models.DecimalField(decimal_places=2, default=0, help_text='Total price of orders completed on this day', max_digits=14)),
+                ('cancelled_total', models.DecimalField(decimal_places=2, default=0, help_text='Total price of orders cancelled on this day', max_digits=14)),
+                ('tailor', models.ForeignKey(db_constraint=False, db_index=False, on_delete=django.db.models.deletion.CASCADE, related_name='+', to=settings.AUTH_USER_MODEL)),
+            ],
+            options={
+                'verbose_name': 'Tailor Daily Rollup',
+                'verbose_name_plural': 'Tailor Daily Rollups',
+                'ordering': ['tailor', 'day'],
+                'indexes': [models.Index(fields=['day'], name='tailor_daily_rollup_day_idx')],
+                'constraints': [models.UniqueConstraint(fields=('tailor', 'day'), name='tailor_daily_rollup_unique')],
+            },
+        ),
+    ]
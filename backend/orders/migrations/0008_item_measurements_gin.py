@@ -0,0 +1,18 @@
+# Generated by Django 6.0 on 2026-10-18 05:17
+
+import django.contrib.postgres.indexes
+from django.db import migrations
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('orders', '0007_archive'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='orderitem',
+            index=django.contrib.postgres.indexes.GinIndex(fields=['measurements'], name='order_item_measurements_gin'),
+        ),
+    ]
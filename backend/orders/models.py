@@ -1,3 +1,4 @@
+from django.contrib.postgres.indexes import GinIndex
 from django.db import models
 from django.utils import timezone
 from users.models import User
@@ -40,6 +41,11 @@ class Order(models.Model):
     )
     order_type = models.CharField(max_length=20, choices=ORDER_TYPE_CHOICES)
     status = models.CharField(max_length=20, choices=STATUS_CHOICES, default='PENDING')
+    version = models.PositiveIntegerField(
+        default=1,
+        editable=False,
+        help_text="Incremented on every status change for optimistic concurrency"
+    )
     total_price = models.DecimalField(max_digits=10, decimal_places=2)
     deposit_amount = models.DecimalField(max_digits=10, decimal_places=2, default=0.00)
     delivery_date = models.DateField(null=True, blank=True)
@@ -58,19 +64,33 @@ class Order(models.Model):
         verbose_name = 'Order'
         verbose_name_plural = 'Orders'
         ordering = ['-created_at']
+        indexes = [
+            models.Index(fields=['customer', '-created_at', '-id'], name='order_customer_created_idx'),
+            models.Index(fields=['tailor', '-created_at', '-id'], name='order_tailor_created_idx'),
+            models.Index(fields=['customer', 'updated_at'], name='order_customer_updated_idx'),
+            models.Index(fields=['tailor', 'updated_at'], name='order_tailor_updated_idx'),
+        ]
     
-    def save(self, *args, **kwargs):
-        """Generate unique order_number if not set and validate user types."""
-        if not self.order_number:
-            date_str = timezone.now().strftime('%Y%m%d')
-            unique_id = str(uuid.uuid4())[:8].upper()
-            self.order_number = f"ORD-{date_str}-{unique_id}"
-        
-        # Validation
+    @staticmethod
+    def generate_order_number():
+        """Return a new ``ORD-<date>-<random>`` order number."""
+        date_str = timezone.now().strftime('%Y%m%d')
+        unique_id = str(uuid.uuid4())[:8].upper()
+        return f"ORD-{date_str}-{unique_id}"
+    
+    def validate_user_types(self):
+        """Ensure the customer and tailor have the matching user types."""
         if self.customer.user_type != 'CUSTOMER':
             raise ValueError("Customer must have user_type='CUSTOMER'")
         if self.tailor.user_type != 'TAILOR':
             raise ValueError("Tailor must have user_type='TAILOR'")
+    
+    def save(self, *args, **kwargs):
+        """Generate unique order_number if not set and validate user types."""
+        if not self.order_number:
+            self.order_number = self.generate_order_number()
+        
+        self.validate_user_types()
         
         super().save(*args, **kwargs)
     
@@ -99,10 +119,219 @@ class OrderItem(models.Model):
     )
     special_instructions = models.TextField(blank=True)
     created_at = models.DateTimeField(auto_now_add=True)
+    updated_at = models.DateTimeField(auto_now=True)
     
     class Meta:
         verbose_name = 'Order Item'
         verbose_name_plural = 'Order Items'
+        indexes = [
+            GinIndex(fields=['measurements'], name='order_item_measurements_gin'),
+        ]
     
     def __str__(self):
         return f"{self.order.order_number} - {self.item_name} (x{self.quantity})"
+
+
+class OrderEvent(models.Model):
+    """Append-only history of order creation and status changes."""
+    
+    EVENT_TYPE_CHOICES = [
+        ('CREATED', 'Created'),
+        ('STATUS_CHANGED', 'Status Changed'),
+        ('CANCELLED', 'Cancelled'),
+    ]
+    
+    # No database constraints: events outlive the orders they describe.
+    # The composite indexes below cover every foreign key lookup.
+    order = models.ForeignKey(
+        Order,
+        on_delete=models.DO_NOTHING,
+        db_constraint=False,
+        db_index=False,
+        related_name='events'
+    )
+    sequence = models.PositiveIntegerField(help_text="Order version after this event")
+    event_type = models.CharField(max_length=20, choices=EVENT_TYPE_CHOICES)
+    from_status = models.CharField(max_length=20, choices=Order.STATUS_CHOICES, blank=True)
+    to_status = models.CharField(max_length=20, choices=Order.STATUS_CHOICES)
+    actor = models.ForeignKey(
+        User,
+        on_delete=models.DO_NOTHING,
+        db_constraint=False,
+        db_index=False,
+        null=True,
+        related_name='+'
+    )
+    customer = models.ForeignKey(
+        User,
+        on_delete=models.DO_NOTHING,
+        db_constraint=False,
+        db_index=False,
+        related_name='+'
+    )
+    tailor = models.ForeignKey(
+        User,
+        on_delete=models.DO_NOTHING,
+        db_constraint=False,
+        db_index=False,
+        related_name='+'
+    )
+    created_at = models.DateTimeField(default=timezone.now)
+    
+    class Meta:
+        verbose_name = 'Order Event'
+        verbose_name_plural = 'Order Events'
+        ordering = ['order', 'sequence']
+        constraints = [
+            models.UniqueConstraint(fields=['order', 'sequence'], name='order_event_sequence_unique'),
+        ]
+        indexes = [
+            models.Index(fields=['tailor', '-created_at', '-id'], name='order_event_tailor_idx'),
+            models.Index(fields=['customer', '-created_at', '-id'], name='order_event_customer_idx'),
+        ]
+    
+    @classmethod
+    def for_created(cls, order):
+        """Unsaved CREATED event for a newly inserted order."""
+        return cls(
+            order=order,
+            sequence=order.version,
+            event_type='CREATED',
+            to_status=order.status,
+            actor_id=order.customer_id,
+            customer_id=order.customer_id,
+            tailor_id=order.tailor_id,
+            created_at=order.created_at,
+        )
+    
+    def __str__(self):
+        return f"{self.order_id} #{self.sequence} {self.event_type}"
+
+
+class TailorDailyRollup(models.Model):
+    """Per-tailor daily order counts and totals, maintained incrementally."""
+    
+    tailor = models.ForeignKey(
+        User,
+        on_delete=models.CASCADE,
+        db_constraint=False,
+        db_index=False,
+        related_name='+'
+    )
+    day = models.DateField()
+    created_count = models.PositiveIntegerField(default=0)
+    confirmed_count = models.PositiveIntegerField(default=0)
+    in_progress_count = models.PositiveIntegerField(default=0)
+    ready_count = models.PositiveIntegerField(default=0)
+    completed_count = models.PositiveIntegerField(default=0)
+    cancelled_count = models.PositiveIntegerField(default=0)
+    booked_total = models.DecimalField(
+        max_digits=14,
+        decimal_places=2,
+        default=0,
+        help_text="Total price of orders created on this day"
+    )
+    deposit_total = models.DecimalField(
+        max_digits=14,
+        decimal_places=2,
+        default=0,
+        help_text="Deposits of orders created on this day"
+    )
+    revenue_total = models.DecimalField(
+        max_digits=14,
+        decimal_places=2,
+        default=0,
+        help_text="Total price of orders completed on this day"
+    )
+    cancelled_total = models.DecimalField(
+        max_digits=14,
+        decimal_places=2,
+        default=0,
+        help_text="Total price of orders cancelled on this day"
+    )
+    
+    class Meta:
+        verbose_name = 'Tailor Daily Rollup'
+        verbose_name_plural = 'Tailor Daily Rollups'
+        ordering = ['tailor', 'day']
+        constraints = [
+            models.UniqueConstraint(fields=['tailor', 'day'], name='tailor_daily_rollup_unique'),
+        ]
+        indexes = [
+            models.Index(fields=['day'], name='tailor_daily_rollup_day_idx'),
+        ]
+    
+    def __str__(self):
+        return f"{self.tailor_id} {self.day}"
+
+
+class ArchivedOrder(models.Model):
+    """
+    Completed or cancelled order moved out of the active ``Order`` table.
+
+    Rows keep the id, order number and timestamps they had as orders; see
+    ``orders.archive``.
+    """
+    
+    id = models.BigIntegerField(primary_key=True)
+    order_number = models.CharField(max_length=50, unique=True, editable=False)
+    customer = models.ForeignKey(
+        User,
+        on_delete=models.CASCADE,
+        related_name='+'
+    )
+    tailor = models.ForeignKey(
+        User,
+        on_delete=models.CASCADE,
+        related_name='+'
+    )
+    order_type = models.CharField(max_length=20, choices=Order.ORDER_TYPE_CHOICES)
+    status = models.CharField(max_length=20, choices=Order.STATUS_CHOICES)
+    version = models.PositiveIntegerField(editable=False)
+    total_price = models.DecimalField(max_digits=10, decimal_places=2)
+    deposit_amount = models.DecimalField(max_digits=10, decimal_places=2, default=0.00)
+    delivery_date = models.DateField(null=True, blank=True)
+    customer_measurement = models.ForeignKey(
+        CustomerMeasurement,
+        on_delete=models.SET_NULL,
+        null=True,
+        blank=True,
+        related_name='+'
+    )
+    special_instructions = models.TextField(blank=True)
+    created_at = models.DateTimeField()
+    updated_at = models.DateTimeField()
+    archived_at = models.DateTimeField(default=timezone.now)
+    
+    class Meta:
+        verbose_name = 'Archived Order'
+        verbose_name_plural = 'Archived Orders'
+        ordering = ['-created_at']
+    
+    def __str__(self):
+        return f"{self.order_number} (archived)"
+
+
+class ArchivedOrderItem(models.Model):
+    """Item of an :class:`ArchivedOrder`, keeping its original id."""
+    
+    id = models.BigIntegerField(primary_key=True)
+    order = models.ForeignKey(
+        ArchivedOrder,
+        on_delete=models.CASCADE,
+        related_name='items'
+    )
+    item_name = models.CharField(max_length=255)
+    quantity = models.PositiveIntegerField(default=1)
+    price = models.DecimalField(max_digits=10, decimal_places=2)
+    measurements = models.JSONField(default=dict)
+    special_instructions = models.TextField(blank=True)
+    created_at = models.DateTimeField()
+    updated_at = models.DateTimeField()
+    
+    class Meta:
+        verbose_name = 'Archived Order Item'
+        verbose_name_plural = 'Archived Order Items'
+    
+    def __str__(self):
+        return f"{self.order_id} - {self.item_name} (x{self.quantity})"
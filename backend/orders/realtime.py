@@ -0,0 +1,353 @@
+"""
+Real-time order event push over Server-Sent Events.
+
+Order events are published to a broker once the transaction that recorded
+them commits, and ``order_event_stream`` relays them to subscribed
+customers, tailors and admins. The ``OrderEvent`` table stays the source of
+truth: a client reconnecting with ``Last-Event-ID`` (or ``?last_event_id=``)
+is first replayed every event it missed from the table, and a subscriber
+that falls too far behind is resynchronised the same way.
+
+Event ids are assigned when an event is inserted but it only becomes
+visible when its transaction commits, so an event can show up after ones
+with higher ids were already sent. Besides everything after the last sent
+id, replays and polls therefore also pick up events created in the last
+``ORDER_EVENT_COMMIT_GRACE`` seconds that were not sent on this
+connection. A client resuming with ``Last-Event-ID`` may receive events
+from that window again and should ignore ids it has already seen.
+
+``ORDER_EVENT_BROKER`` selects the broker. :class:`InProcessBroker` fans
+events out in memory and only reaches clients connected to the process
+that made the change; :class:`DatabaseBroker` polls the event table
+instead, so any process can serve any stream. The stream must be served by
+the ASGI application (``core.asgi``).
+"""
+import asyncio
+import json
+import logging
+import threading
+import time
+from datetime import timedelta
+from functools import lru_cache
+
+from asgiref.sync import sync_to_async
+from django.conf import settings
+from django.db import transaction
+from django.http import JsonResponse, StreamingHttpResponse
+from django.utils import timezone
+from django.utils.module_loading import import_string
+from django.views.decorators.http import require_GET
+from rest_framework.exceptions import APIException
+from rest_framework.fields import DateTimeField
+from rest_framework_simplejwt.authentication import JWTAuthentication
+from .models import OrderEvent
+
+logger = logging.getLogger(__name__)
+
+REPLAY_BATCH_SIZE = 500
+
+
+def event_message(event):
+    """
+    Broker message for an ``OrderEvent``: the ``OrderEventSerializer``
+    representation plus the parties the event concerns.
+    """
+    return {
+        'id': event.id,
+        'order': event.order_id,
+        'sequence': event.sequence,
+        'event_type': event.event_type,
+        'event_type_display': event.get_event_type_display(),
+        'from_status': event.from_status,
+        'to_status': event.to_status,
+        'actor': event.actor_id,
+        'customer': event.customer_id,
+        'tailor': event.tailor_id,
+        'created_at': DateTimeField().to_representation(event.created_at),
+    }
+
+
+def publish_events(events):
+    """Publish saved ``events`` once the current transaction commits."""
+    messages = [event_message(event) for event in events]
+    transaction.on_commit(lambda: _publish(messages))
+
+
+def _publish(messages):
+    try:
+        get_broker().publish(messages)
+    except Exception:
+        # Subscribers catch up from the event table when they reconnect.
+        logger.exception("Failed to publish %d order events", len(messages))
+
+
+@lru_cache(maxsize=None)
+def get_broker():
+    """The broker configured by ``ORDER_EVENT_BROKER``, one per process."""
+    return import_string(settings.ORDER_EVENT_BROKER)()
+
+
+def subscription_filters(user, order_id=None):
+    """Message fields that must match for ``user`` to receive an event."""
+    filters = {}
+    if user.user_type == 'CUSTOMER':
+        filters['customer'] = user.pk
+    elif user.user_type == 'TAILOR':
+        filters['tailor'] = user.pk
+    if order_id is not None:
+        filters['order'] = order_id
+    return filters
+
+
+def filter_events(filters):
+    """``OrderEvent`` queryset matching subscription ``filters``."""
+    return OrderEvent.objects.filter(
+        **{f'{field}_id': value for field, value in filters.items()}
+    )
+
+
+def late_events(queryset, before_id, sent):
+    """
+    Events of ``queryset`` below ``before_id`` created within the commit
+    grace period and not in ``sent``; they committed after later ones.
+    """
+    since = timezone.now() - timedelta(seconds=settings.ORDER_EVENT_COMMIT_GRACE)
+    return queryset.filter(id__lt=before_id, created_at__gte=since).exclude(id__in=sent.ids())
+
+
+class SentEvents:
+    """Ids of the events sent on one stream within the commit grace period."""
+
+    def __init__(self, ids=()):
+        now = time.monotonic()
+        self.sent_at = dict.fromkeys(ids, now)
+
+    def __contains__(self, event_id):
+        return event_id in self.sent_at
+
+    def add(self, event_id):
+        self.sent_at[event_id] = time.monotonic()
+
+    def ids(self):
+        cutoff = time.monotonic() - settings.ORDER_EVENT_COMMIT_GRACE
+        self.sent_at = {event_id: at for event_id, at in self.sent_at.items() if at >= cutoff}
+        return list(self.sent_at)
+
+
+class SubscriptionOverflow(Exception):
+    """The subscriber fell behind and must resynchronise from the event table."""
+
+
+class InProcessBroker:
+    """Fan events out to subscribers in this process through asyncio queues."""
+
+    def __init__(self):
+        self._subscriptions = set()
+        self._lock = threading.Lock()
+
+    def publish(self, messages):
+        """Deliver ``messages``; safe to call from any thread."""
+        with self._lock:
+            subscriptions = list(self._subscriptions)
+        for subscription in subscriptions:
+            matching = [message for message in messages if subscription.matches(message)]
+            if matching:
+                subscription.deliver(matching)
+
+    def subscribe(self, filters):
+        subscription = _QueueSubscription(self, filters)
+        with self._lock:
+            self._subscriptions.add(subscription)
+        return subscription
+
+    def unsubscribe(self, subscription):
+        with self._lock:
+            self._subscriptions.discard(subscription)
+
+
+class _QueueSubscription:
+    def __init__(self, broker, filters):
+        self.broker = broker
+        self.filters = filters
+        self.loop = asyncio.get_running_loop()
+        self.queue = asyncio.Queue(maxsize=settings.ORDER_EVENT_STREAM_QUEUE_SIZE)
+        self.overflowed = False
+
+    def matches(self, message):
+        return all(message[field] == value for field, value in self.filters.items())
+
+    def deliver(self, messages):
+        self.loop.call_soon_threadsafe(self._put, messages)
+
+    def _put(self, messages):
+        for message in messages:
+            try:
+                self.queue.put_nowait(message)
+            except asyncio.QueueFull:
+                self.overflowed = True
+                return
+
+    async def get(self, after_id, sent, timeout):
+        """Next message, or None after ``timeout`` seconds without one."""
+        if self.overflowed:
+            self.overflowed = False
+            while not self.queue.empty():
+                self.queue.get_nowait()
+            raise SubscriptionOverflow
+        try:
+            return await asyncio.wait_for(self.queue.get(), timeout)
+        except asyncio.TimeoutError:
+            return None
+
+    def close(self):
+        self.broker.unsubscribe(self)
+
+
+class DatabaseBroker:
+    """
+    Poll the ``OrderEvent`` table every ``ORDER_EVENT_POLL_INTERVAL`` seconds.
+
+    Works across processes without extra infrastructure; publishing is a
+    no-op because the events are already in the table.
+    """
+
+    def publish(self, messages):
+        pass
+
+    def subscribe(self, filters):
+        return _PollingSubscription(filters)
+
+
+class _PollingSubscription:
+    def __init__(self, filters):
+        self.queryset = filter_events(filters).order_by('id')
+        self.buffer = []
+
+    async def get(self, after_id, sent, timeout):
+        """
+        Next message after ``after_id`` or late and not yet ``sent``, or
+        None after ``timeout`` seconds.
+        """
+        loop = asyncio.get_running_loop()
+        deadline = loop.time() + timeout
+        while not self.buffer:
+            events = await sync_to_async(self.poll)(after_id, sent)
+            self.buffer = [event_message(event) for event in events]
+            remaining = deadline - loop.time()
+            if self.buffer or remaining <= 0:
+                break
+            await asyncio.sleep(min(settings.ORDER_EVENT_POLL_INTERVAL, remaining))
+        return self.buffer.pop(0) if self.buffer else None
+
+    def poll(self, after_id, sent):
+        late = list(late_events(self.queryset, after_id, sent)[:REPLAY_BATCH_SIZE])
+        return late + list(self.queryset.filter(id__gt=after_id)[:REPLAY_BATCH_SIZE])
+
+    def close(self):
+        self.buffer = []
+
+
+def _format(message):
+    data = json.dumps(message, separators=(',', ':'))
+    return f"id: {message['id']}\nevent: order_event\ndata: {data}\n\n"
+
+
+async def _replay(filters, after_id, sent):
+    queryset = filter_events(filters).order_by('id')
+    for event in await sync_to_async(list)(late_events(queryset, after_id, sent)):
+        yield event_message(event)
+    while True:
+        events = await sync_to_async(list)(queryset.filter(id__gt=after_id)[:REPLAY_BATCH_SIZE])
+        for event in events:
+            yield event_message(event)
+        if len(events) < REPLAY_BATCH_SIZE:
+            return
+        after_id = events[-1].id
+
+
+async def _stream(filters, last_id, seen=()):
+    subscription = get_broker().subscribe(filters)
+    keepalive = settings.ORDER_EVENT_STREAM_KEEPALIVE
+    sent = SentEvents(seen)
+    try:
+        yield f"retry: {settings.ORDER_EVENT_STREAM_RETRY_MS}\n\n"
+        replay = True
+        while True:
+            if replay:
+                # Subscribed first, so nothing committed meanwhile is lost;
+                # live copies of replayed events are skipped below.
+                async for message in _replay(filters, last_id, sent):
+                    sent.add(message['id'])
+                    last_id = max(last_id, message['id'])
+                    yield _format(message)
+                replay = False
+            try:
+                message = await subscription.get(last_id, sent, keepalive)
+            except SubscriptionOverflow:
+                replay = True
+                continue
+            if message is None:
+                yield ": keepalive\n\n"
+            elif message['id'] not in sent:
+                sent.add(message['id'])
+                last_id = max(last_id, message['id'])
+                yield _format(message)
+    finally:
+        subscription.close()
+
+
+def _authenticate(request):
+    result = JWTAuthentication().authenticate(request)
+    return result[0] if result else None
+
+
+def _int_param(value, name):
+    if value in (None, ''):
+        return None
+    try:
+        return int(value)
+    except ValueError:
+        raise ValueError(f"{name} must be an integer.")
+
+
+@require_GET
+async def order_event_stream(request):
+    """
+    Stream the user's order events as ``text/event-stream``.
+
+    Authenticates with the usual ``Authorization: Bearer`` access token.
+    Customers and tailors receive events for their own orders and admins
+    for all orders; ``?order=`` narrows the stream to one order.
+    """
+    try:
+        user = await sync_to_async(_authenticate)(request)
+    except APIException as exc:
+        return JsonResponse({'error': str(exc.detail)}, status=exc.status_code)
+    if user is None:
+        return JsonResponse({'error': "Authentication credentials were not provided."}, status=401)
+
+    try:
+        order_id = _int_param(request.GET.get('order'), 'order')
+        last_id = _int_param(
+            request.headers.get('Last-Event-ID') or request.GET.get('last_event_id'),
+            'Last-Event-ID',
+        )
+    except ValueError as exc:
+        return JsonResponse({'error': str(exc)}, status=400)
+    filters = subscription_filters(user, order_id)
+    seen = ()
+    if last_id is None:
+        # New subscribers only receive events from now on, including late
+        # commits but not the recent events that are already visible.
+        last_id = await filter_events({}).order_by('-id').values_list('id', flat=True).afirst() or 0
+        seen = await sync_to_async(list)(
+            late_events(filter_events(filters), last_id + 1, SentEvents()).values_list('id', flat=True)
+        )
+
+    response = StreamingHttpResponse(
+        _stream(filters, last_id, seen),
+        content_type='text/event-stream',
+    )
+    response['Cache-Control'] = 'no-cache'
+    response['X-Accel-Buffering'] = 'no'
+    return response
@@ -0,0 +1,75 @@
+"""
+Daily per-tailor order rollups.
+
+``TailorDailyRollup`` rows are incremented in the same transaction as order
+creation and status changes, so reports read O(days) rollup rows instead of
+aggregating the orders table. ``rebuild_order_rollups`` recomputes them from
+orders and the order event log.
+"""
+from collections import defaultdict
+from decimal import Decimal
+
+from django.db import IntegrityError, transaction
+from django.db.models import F
+from django.utils import timezone
+from .models import TailorDailyRollup
+
+# Rollup counter incremented when an order enters each status.
+STATUS_COUNTERS = {
+    'CONFIRMED': 'confirmed_count',
+    'IN_PROGRESS': 'in_progress_count',
+    'READY': 'ready_count',
+    'COMPLETED': 'completed_count',
+    'CANCELLED': 'cancelled_count',
+}
+# Rollup total receiving the order's price when it enters each status.
+STATUS_TOTALS = {
+    'COMPLETED': 'revenue_total',
+    'CANCELLED': 'cancelled_total',
+}
+
+COUNT_FIELDS = ('created_count', *STATUS_COUNTERS.values())
+TOTAL_FIELDS = ('booked_total', 'deposit_total', *STATUS_TOTALS.values())
+
+
+def increment(tailor_id, day, deltas):
+    """
+    Add ``deltas`` to the tailor's rollup for ``day``, creating it if needed.
+
+    Must run inside the transaction that made the change being counted.
+    """
+    deltas = {field: value for field, value in deltas.items() if value}
+    if not deltas:
+        return
+    rollups = TailorDailyRollup.objects.filter(tailor_id=tailor_id, day=day)
+    changes = {field: F(field) + value for field, value in deltas.items()}
+    if rollups.update(**changes):
+        return
+    try:
+        with transaction.atomic():
+            TailorDailyRollup.objects.create(tailor_id=tailor_id, day=day, **deltas)
+    except IntegrityError:
+        # Another transaction created the row first.
+        rollups.update(**changes)
+
+
+def record_created(orders):
+    """Count newly created orders, one rollup update per tailor and day."""
+    deltas = defaultdict(lambda: defaultdict(int))
+    for order in orders:
+        key = (order.tailor_id, timezone.localdate(order.created_at))
+        deltas[key]['created_count'] += 1
+        deltas[key]['booked_total'] += Decimal(order.total_price)
+        deltas[key]['deposit_total'] += Decimal(order.deposit_amount or 0)
+    for (tailor_id, day), values in deltas.items():
+        increment(tailor_id, day, values)
+
+
+def record_transition(tailor_id, new_status, total_price, at):
+    """Count an order entering ``new_status`` at ``at``."""
+    deltas = {}
+    if new_status in STATUS_COUNTERS:
+        deltas[STATUS_COUNTERS[new_status]] = 1
+    if new_status in STATUS_TOTALS:
+        deltas[STATUS_TOTALS[new_status]] = total_price
+    increment(tailor_id, timezone.localdate(at), deltas)
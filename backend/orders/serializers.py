@@ -1,19 +1,28 @@
+from collections import defaultdict
+
+from django.db import transaction
+from django.db.models import prefetch_related_objects
 from rest_framework import serializers
-from .models import Order, OrderItem
+from core.expansion import ExpandableFieldsMixin
+from tailors.workload import record_orders_created
+from . import rollups
+from .models import ArchivedOrder, ArchivedOrderItem, Order, OrderEvent, OrderItem
+from .realtime import publish_events
+from .state_machine import InvalidTransition, check_transition
 from users.serializers import UserSerializer
-from measurements.serializers import CustomerMeasurementSerializer
+from measurements.serializers import CustomerMeasurementSerializer, check_measurements
 
 
-class OrderItemSerializer(serializers.ModelSerializer):
+class OrderItemSerializer(ExpandableFieldsMixin, serializers.ModelSerializer):
     """Serializer for order items."""
 
     class Meta:
         model = OrderItem
         fields = (
             'id', 'item_name', 'quantity', 'price',
-            'measurements', 'special_instructions', 'created_at'
+            'measurements', 'special_instructions', 'created_at', 'updated_at'
         )
-        read_only_fields = ('id', 'created_at')
+        read_only_fields = ('id', 'created_at', 'updated_at')
 
 
 class OrderItemCreateSerializer(serializers.ModelSerializer):
@@ -24,12 +33,19 @@ class OrderItemCreateSerializer(serializers.ModelSerializer):
         fields = ('item_name', 'quantity', 'price', 'measurements', 'special_instructions')
 
 
-class OrderSerializer(serializers.ModelSerializer):
+class OrderSerializer(ExpandableFieldsMixin, serializers.ModelSerializer):
     """Serializer for orders with nested items."""
-    customer = UserSerializer(read_only=True)
-    tailor = UserSerializer(read_only=True)
-    items = OrderItemSerializer(many=True, read_only=True)
-    customer_measurement = CustomerMeasurementSerializer(read_only=True)
+    expandable_fields = {
+        'customer': (UserSerializer, {'read_only': True}),
+        'tailor': (UserSerializer, {'read_only': True}),
+        'items': (OrderItemSerializer, {'many': True, 'read_only': True}),
+        'customer_measurement': (CustomerMeasurementSerializer, {'read_only': True}),
+    }
+    sideload_fields = {
+        'customer': 'users',
+        'tailor': 'users',
+        'customer_measurement': 'measurements',
+    }
     status_display = serializers.CharField(
         source='get_status_display',
         read_only=True
@@ -43,7 +59,7 @@ class OrderSerializer(serializers.ModelSerializer):
         model = Order
         fields = (
             'id', 'order_number', 'customer', 'tailor', 'order_type',
-            'order_type_display', 'status', 'status_display',
+            'order_type_display', 'status', 'status_display', 'version',
             'total_price', 'deposit_amount', 'delivery_date',
             'customer_measurement', 'special_instructions',
             'items', 'created_at', 'updated_at'
@@ -51,6 +67,139 @@ class OrderSerializer(serializers.ModelSerializer):
         read_only_fields = ('id', 'order_number', 'created_at', 'updated_at')
 
 
+
+class ArchivedOrderItemSerializer(OrderItemSerializer):
+    """Serializer for archived order items."""
+
+    class Meta(OrderItemSerializer.Meta):
+        model = ArchivedOrderItem
+
+
+class ArchivedOrderSerializer(OrderSerializer):
+    """Serializer for archived orders, shaped like ``OrderSerializer``."""
+    expandable_fields = {
+        **OrderSerializer.expandable_fields,
+        'items': (ArchivedOrderItemSerializer, {'many': True, 'read_only': True}),
+    }
+
+    class Meta(OrderSerializer.Meta):
+        model = ArchivedOrder
+        fields = (*OrderSerializer.Meta.fields, 'archived_at')
+        read_only_fields = fields
+
+
+def create_orders(customer, entries):
+    """
+    Create orders and their items for ``customer`` in one transaction.
+
+    ``entries`` are validated ``OrderCreateSerializer`` data with ``tailor``
+    and ``customer_measurement`` already resolved, so the number of queries
+    does not grow with the number of orders or items.
+    """
+    orders = []
+    items = []
+    for data in entries:
+        data = dict(data)
+        items_data = data.pop('items')
+        order = Order(customer=customer, order_number=Order.generate_order_number(), **data)
+        order.validate_user_types()
+        orders.append(order)
+        items.extend((order, item_data) for item_data in items_data)
+
+    with transaction.atomic():
+        Order.objects.bulk_create(orders)
+        OrderItem.objects.bulk_create([
+            OrderItem(order=order, **item_data) for order, item_data in items
+        ])
+        events = OrderEvent.objects.bulk_create([OrderEvent.for_created(order) for order in orders])
+        publish_events(events)
+        rollups.record_created(orders)
+        statuses = defaultdict(list)
+        for order in orders:
+            statuses[order.tailor_id].append(order.status)
+        for tailor_id, tailor_statuses in statuses.items():
+            record_orders_created(tailor_id, tailor_statuses)
+
+    return orders
+
+
+class OrderEventSerializer(serializers.ModelSerializer):
+    """Serializer for order history events."""
+    event_type_display = serializers.CharField(
+        source='get_event_type_display',
+        read_only=True
+    )
+
+    class Meta:
+        model = OrderEvent
+        fields = (
+            'id', 'order', 'sequence', 'event_type', 'event_type_display',
+            'from_status', 'to_status', 'actor', 'created_at'
+        )
+        read_only_fields = fields
+
+
+class DailyRollupSerializer(serializers.Serializer):
+    """Serializer for one day of (possibly summed) tailor rollups."""
+    day = serializers.DateField(required=False)
+    created_count = serializers.IntegerField()
+    confirmed_count = serializers.IntegerField()
+    in_progress_count = serializers.IntegerField()
+    ready_count = serializers.IntegerField()
+    completed_count = serializers.IntegerField()
+    cancelled_count = serializers.IntegerField()
+    booked_total = serializers.DecimalField(max_digits=14, decimal_places=2)
+    deposit_total = serializers.DecimalField(max_digits=14, decimal_places=2)
+    revenue_total = serializers.DecimalField(max_digits=14, decimal_places=2)
+    cancelled_total = serializers.DecimalField(max_digits=14, decimal_places=2)
+    average_ticket = serializers.SerializerMethodField()
+
+    def get_average_ticket(self, obj):
+        """Mean total price of the orders created."""
+        if not obj['created_count']:
+            return None
+        return str(round(obj['booked_total'] / obj['created_count'], 2))
+
+
+class OrderBatchCreateSerializer(serializers.ListSerializer):
+    """Create many orders at once, resolving tailors and measurements in bulk."""
+
+    def to_internal_value(self, data):
+        if isinstance(data, list):
+            self.preload(data)
+        return super().to_internal_value(data)
+
+    def preload(self, data):
+        """Load every referenced tailor and measurement with one query each."""
+        from users.models import User
+        from measurements.models import CustomerMeasurement
+
+        def ids(field):
+            values = set()
+            for entry in data:
+                try:
+                    values.add(int(entry.get(field)))
+                except (AttributeError, TypeError, ValueError):
+                    pass
+            return values
+
+        tailor_ids = ids('tailor_id')
+        tailors = User.objects.filter(id__in=tailor_ids, user_type='TAILOR').in_bulk()
+        self.context['tailors'] = {pk: tailors.get(pk) for pk in tailor_ids}
+
+        measurement_ids = ids('customer_measurement_id')
+        measurements = CustomerMeasurement.objects.filter(
+            id__in=measurement_ids,
+            customer=self.context['request'].user
+        ).select_related('customer', 'template').in_bulk()
+        self.context['measurements'] = {pk: measurements.get(pk) for pk in measurement_ids}
+
+    def create(self, validated_data):
+        orders = create_orders(self.context['request'].user, validated_data)
+        prefetch_related_objects(orders, 'items')
+        return orders
+
+
 class OrderCreateSerializer(serializers.ModelSerializer):
     """Serializer for creating orders."""
     items = OrderItemCreateSerializer(many=True)
@@ -63,55 +212,73 @@ class OrderCreateSerializer(serializers.ModelSerializer):
             'tailor_id', 'order_type', 'total_price', 'deposit_amount',
             'delivery_date', 'customer_measurement_id', 'special_instructions', 'items'
         )
+        list_serializer_class = OrderBatchCreateSerializer
+
+    def get_tailor(self, tailor_id):
+        """Return the tailor user, cached in the context for batch creation."""
+        from users.models import User
+        tailors = self.context.setdefault('tailors', {})
+        if tailor_id not in tailors:
+            tailors[tailor_id] = User.objects.filter(id=tailor_id, user_type='TAILOR').first()
+        return tailors[tailor_id]
+
+    def get_customer_measurement(self, measurement_id):
+        """Return the requesting customer's measurement, or None."""
+        from measurements.models import CustomerMeasurement
+        measurements = self.context.setdefault('measurements', {})
+        if measurement_id not in measurements:
+            measurements[measurement_id] = CustomerMeasurement.objects.filter(
+                id=measurement_id,
+                customer=self.context['request'].user
+            ).first()
+        return measurements[measurement_id]
 
     def validate_tailor_id(self, value):
         """Validate that tailor exists and is a TAILOR user."""
-        from users.models import User
-        try:
-            tailor = User.objects.get(id=value, user_type='TAILOR')
-        except User.DoesNotExist:
+        if self.get_tailor(value) is None:
             raise serializers.ValidationError("Invalid tailor ID or user is not a tailor.")
         return value
 
-    def create(self, validated_data):
-        items_data = validated_data.pop('items')
-        tailor_id = validated_data.pop('tailor_id')
-        customer_measurement_id = validated_data.pop('customer_measurement_id', None)
-
-        from users.models import User
-        tailor = User.objects.get(id=tailor_id)
-        customer = self.context['request'].user
-
-        # Get customer measurement if provided
-        customer_measurement = None
-        if customer_measurement_id:
-            from measurements.models import CustomerMeasurement
-            try:
-                customer_measurement = CustomerMeasurement.objects.get(
-                    id=customer_measurement_id,
-                    customer=customer
-                )
-            except CustomerMeasurement.DoesNotExist:
-                pass
-
-        # Create order
-        order = Order.objects.create(
-            customer=customer,
-            tailor=tailor,
-            customer_measurement=customer_measurement,
-            **validated_data
+    def validate(self, attrs):
+        attrs['tailor'] = self.get_tailor(attrs.pop('tailor_id'))
+        measurement_id = attrs.pop('customer_measurement_id', None)
+        # Unknown measurements are ignored rather than rejected.
+        attrs['customer_measurement'] = (
+            self.get_customer_measurement(measurement_id) if measurement_id else None
         )
+        self.validate_item_measurements(attrs)
+        return attrs
 
-        # Create order items
-        for item_data in items_data:
-            OrderItem.objects.create(order=order, **item_data)
+    def validate_item_measurements(self, attrs):
+        """
+        Check item measurement adjustments against the template of the
+        order's measurement, or only their shape without one.
+        """
+        measurement = attrs['customer_measurement']
+        template_id = measurement.template_id if measurement else None
+        errors = [
+            {'measurements': item_errors} if item_errors else {}
+            for item_errors in (
+                check_measurements(template_id, item.get('measurements', {}), partial=True)
+                for item in attrs['items']
+            )
+        ]
+        if any(errors):
+            raise serializers.ValidationError({'items': errors})
 
+    def create(self, validated_data):
+        order, = create_orders(self.context['request'].user, [validated_data])
         return order
 
 
 class OrderStatusUpdateSerializer(serializers.Serializer):
     """Serializer for updating order status."""
     status = serializers.ChoiceField(choices=Order.STATUS_CHOICES)
+    version = serializers.IntegerField(
+        required=False,
+        min_value=1,
+        help_text="Order version the client last saw; the update fails with 409 if it changed"
+    )
 
     def validate_status(self, value):
         """Validate status transition based on user role."""
@@ -121,38 +288,9 @@ class OrderStatusUpdateSerializer(serializers.Serializer):
         if not request or not order:
             return value
 
-        user = request.user
-        current_status = order.status
-
-        # Customers can only cancel pending/confirmed orders
-        if user.user_type == 'CUSTOMER':
-            if value != 'CANCELLED':
-                raise serializers.ValidationError(
-                    "Customers can only cancel orders."
-                )
-            if current_status not in ['PENDING', 'CONFIRMED']:
-                raise serializers.ValidationError(
-                    f"Cannot cancel order with status: {current_status}"
-                )
-
-        # Tailors can update to IN_PROGRESS, READY, COMPLETED, or CANCELLED
-        elif user.user_type == 'TAILOR':
-            if value not in ['CONFIRMED', 'IN_PROGRESS', 'READY', 'COMPLETED', 'CANCELLED']:
-                raise serializers.ValidationError(
-                    "Invalid status transition for tailor."
-                )
-            # Validate status flow
-            valid_transitions = {
-                'PENDING': ['CONFIRMED', 'CANCELLED'],
-                'CONFIRMED': ['IN_PROGRESS', 'CANCELLED'],
-                'IN_PROGRESS': ['READY', 'CANCELLED'],
-                'READY': ['COMPLETED'],
-            }
-            if current_status in valid_transitions:
-                if value not in valid_transitions[current_status]:
-                    raise serializers.ValidationError(
-                        f"Cannot transition from {current_status} to {value}"
-                    )
+        try:
+            check_transition(request.user.user_type, order.status, value)
+        except InvalidTransition as exc:
+            raise serializers.ValidationError(str(exc))
 
         return value
-
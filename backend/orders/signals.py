@@ -0,0 +1,10 @@
+from django.db.models.signals import post_delete
+from django.dispatch import receiver
+from tailors.workload import record_order_deleted
+from .models import Order
+
+
+@receiver(post_delete, sender=Order)
+def release_tailor_workload(sender, instance, **kwargs):
+    """Keep the tailor's open order counters in step when an order is deleted."""
+    record_order_deleted(instance.tailor_id, instance.status)
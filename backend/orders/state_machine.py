@@ -0,0 +1,145 @@
+"""
+Declarative order status transitions with optimistic concurrency.
+
+A transition is applied as a single conditional UPDATE matching the order's
+id, the status it was read with and its ``version``. When another request
+changed the order first no row matches and :class:`TransitionConflict` is
+raised instead of silently overwriting the other change; no row locks are
+taken. Every applied transition is returned as a :class:`Transition` record
+and appended to the ``OrderEvent`` log in the same transaction, then pushed
+to subscribers once it commits (see ``orders.realtime``).
+"""
+import logging
+from dataclasses import dataclass
+from datetime import datetime
+
+from django.db import transaction
+from django.db.models import F
+from django.db.models.functions import Now
+from django.utils import timezone
+from tailors.workload import record_status_change
+from . import rollups
+from .realtime import publish_events
+from .models import Order, OrderEvent
+
+logger = logging.getLogger(__name__)
+
+TERMINAL_STATUSES = frozenset({'COMPLETED', 'CANCELLED'})
+
+# Allowed transitions per user type: {current status: {new statuses}}.
+TRANSITIONS = {
+    'CUSTOMER': {
+        'PENDING': {'CANCELLED'},
+        'CONFIRMED': {'CANCELLED'},
+    },
+    'TAILOR': {
+        'PENDING': {'CONFIRMED', 'CANCELLED'},
+        'CONFIRMED': {'IN_PROGRESS', 'CANCELLED'},
+        'IN_PROGRESS': {'READY', 'CANCELLED'},
+        'READY': {'COMPLETED'},
+    },
+}
+# Admins may move an order to any other status, reopening closed orders
+# included, to correct mistakes.
+ADMIN_STATUSES = frozenset(code for code, _ in Order.STATUS_CHOICES)
+
+# Fields needed to check and apply a transition.
+TRANSITION_FIELDS = ('id', 'status', 'version', 'customer', 'tailor', 'total_price')
+
+
+class InvalidTransition(Exception):
+    """The requested status change is not allowed from the current status."""
+
+
+class TransitionConflict(Exception):
+    """The order changed after it was read; the transition was not applied."""
+
+    def __init__(self, order_id, expected_status, expected_version):
+        self.order_id = order_id
+        self.expected_status = expected_status
+        self.expected_version = expected_version
+        super().__init__(
+            f"Order {order_id} changed since version {expected_version}; reload and retry."
+        )
+
+
+@dataclass(frozen=True)
+class Transition:
+    """Audit record of one applied status change."""
+    order_id: int
+    customer_id: int
+    tailor_id: int
+    from_status: str
+    to_status: str
+    version: int
+    actor_id: int
+    at: datetime
+
+
+def allowed_statuses(user_type, current_status):
+    """Statuses a user of ``user_type`` may move an order to from ``current_status``."""
+    if user_type == 'ADMIN':
+        return ADMIN_STATUSES - {current_status}
+    if current_status in TERMINAL_STATUSES:
+        return set()
+    return TRANSITIONS.get(user_type, {}).get(current_status, set())
+
+
+def check_transition(user_type, current_status, new_status):
+    """Raise :class:`InvalidTransition` unless the change is allowed."""
+    if current_status in TERMINAL_STATUSES and user_type != 'ADMIN':
+        raise InvalidTransition(f"Cannot change an order with status: {current_status}")
+    if new_status not in allowed_statuses(user_type, current_status):
+        raise InvalidTransition(f"Cannot transition from {current_status} to {new_status}")
+
+
+def apply_transition(order, new_status, actor, expected_version=None):
+    """
+    Move ``order`` to ``new_status`` if nobody else changed it first.
+
+    ``order`` only needs :data:`TRANSITION_FIELDS` loaded. ``expected_version``
+    lets clients assert the version they last saw. Updates ``order`` in place
+    and returns the :class:`Transition`.
+    """
+    check_transition(actor.user_type, order.status, new_status)
+    if expected_version is not None and expected_version != order.version:
+        raise TransitionConflict(order.pk, order.status, expected_version)
+
+    record = Transition(
+        order_id=order.pk,
+        customer_id=order.customer_id,
+        tailor_id=order.tailor_id,
+        from_status=order.status,
+        to_status=new_status,
+        version=order.version + 1,
+        actor_id=actor.pk,
+        at=timezone.now(),
+    )
+    with transaction.atomic():
+        updated = Order.objects.filter(
+            pk=order.pk, status=order.status, version=order.version
+        ).update(status=new_status, version=F('version') + 1, updated_at=Now())
+        if not updated:
+            raise TransitionConflict(order.pk, order.status, order.version)
+        record_status_change(order.tailor_id, order.status, new_status)
+        event = OrderEvent.objects.create(
+            order_id=record.order_id,
+            sequence=record.version,
+            event_type='CANCELLED' if new_status == 'CANCELLED' else 'STATUS_CHANGED',
+            from_status=record.from_status,
+            to_status=record.to_status,
+            actor_id=record.actor_id,
+            customer_id=record.customer_id,
+            tailor_id=record.tailor_id,
+            created_at=record.at,
+        )
+        publish_events([event])
+        rollups.record_transition(order.tailor_id, new_status, order.total_price, record.at)
+
+    logger.info(
+        "Order %s moved from %s to %s (version %s) by user %s",
+        record.order_id, record.from_status, record.to_status, record.version, record.actor_id,
+    )
+    order.status = new_status
+    order.version = record.version
+    return record
@@ -1,3 +1,563 @@
-from django.test import TestCase
+import hashlib
+import json
+from io import StringIO
+from datetime import timedelta
+from types import SimpleNamespace
+from unittest import mock
 
-# Create your tests here.
+from asgiref.sync import async_to_sync
+from django.conf import settings
+from django.contrib.admin.sites import site
+from django.core.cache import caches
+from django.core.management import call_command
+from django.test import RequestFactory, TestCase, TransactionTestCase, override_settings
+from django.urls import reverse
+from django.utils import timezone
+from rest_framework.test import APIClient
+from rest_framework_simplejwt.tokens import RefreshToken
+from core.idempotency import PENDING, IdempotencyMixin
+from core.testing import requires_postgresql
+from measurements.models import CustomerMeasurement, MeasurementTemplate
+from tailors.models import TailorProfile
+from users.models import User
+from .archive import archive_batch, archive_cutoff
+from .models import ArchivedOrder, ArchivedOrderItem, Order, OrderEvent, OrderItem, TailorDailyRollup
+from .realtime import (
+    DatabaseBroker, SentEvents, _replay, _stream, filter_events, get_broker, late_events,
+    subscription_filters,
+)
+
+
+def make_user(email, user_type):
+    return User.objects.create_user(
+        email=email, password='pass12345!', full_name=email.split('@')[0], user_type=user_type
+    )
+
+
+class OrderFixtures:
+    """A tailor, a customer and helpers to place orders through the API."""
+
+    def setUp(self):
+        self.tailor = make_user('tailor@example.com', 'TAILOR')
+        self.customer = make_user('customer@example.com', 'CUSTOMER')
+        self.profile = TailorProfile.objects.create(
+            user=self.tailor,
+            shop_name='Stitch',
+            shop_address='1 Main St',
+            specialization='FORMAL',
+            availability_status='AVAILABLE',
+        )
+
+    def client_for(self, user):
+        client = APIClient()
+        client.force_authenticate(user)
+        return client
+
+    def order_payload(self, **overrides):
+        return {
+            'tailor_id': self.tailor.pk,
+            'order_type': 'SHIRT',
+            'total_price': '40.00',
+            'items': [{'item_name': 'Shirt', 'quantity': 1, 'price': '40.00', 'measurements': {}}],
+            **overrides,
+        }
+
+    def create_order(self):
+        response = self.client_for(self.customer).post(
+            reverse('orders:order-create'), self.order_payload(), format='json'
+        )
+        self.assertEqual(response.status_code, 201)
+        return Order.objects.filter(customer=self.customer).latest('id')
+
+    def set_status(self, user, order, new_status, **data):
+        return self.client_for(user).patch(
+            reverse('orders:order-status-update', kwargs={'id': order.pk}),
+            {'status': new_status, **data},
+            format='json',
+        )
+
+
+@requires_postgresql
+class OrderTestCase(OrderFixtures, TestCase):
+    pass
+
+
+class OrderTransitionTests(OrderTestCase):
+
+    def test_tailor_moves_order_through_its_statuses(self):
+        order = self.create_order()
+        for new_status in ('CONFIRMED', 'IN_PROGRESS', 'READY', 'COMPLETED'):
+            response = self.set_status(self.tailor, order, new_status)
+            self.assertEqual(response.status_code, 200, response.data)
+            self.assertEqual(response.data['status'], new_status)
+
+        order.refresh_from_db()
+        self.assertEqual(order.version, 5)
+        self.assertEqual(
+            list(OrderEvent.objects.filter(order=order).order_by('sequence').values_list('sequence', 'to_status')),
+            [(1, 'PENDING'), (2, 'CONFIRMED'), (3, 'IN_PROGRESS'), (4, 'READY'), (5, 'COMPLETED')],
+        )
+
+    def test_disallowed_transition_is_rejected(self):
+        order = self.create_order()
+
+        response = self.set_status(self.customer, order, 'CONFIRMED')
+
+        self.assertEqual(response.status_code, 400)
+        order.refresh_from_db()
+        self.assertEqual((order.status, order.version), ('PENDING', 1))
+
+    def test_terminal_order_cannot_change(self):
+        order = self.create_order()
+        self.set_status(self.tailor, order, 'CANCELLED')
+
+        response = self.set_status(self.tailor, order, 'CONFIRMED')
+
+        self.assertEqual(response.status_code, 400)
+
+    def test_stale_version_returns_conflict_with_current_state(self):
+        order = self.create_order()
+        self.set_status(self.tailor, order, 'CONFIRMED', version=1)
+
+        response = self.set_status(self.customer, order, 'CANCELLED', version=1)
+
+        self.assertEqual(response.status_code, 409)
+        self.assertEqual((response.data['status'], response.data['version']), ('CONFIRMED', 2))
+        order.refresh_from_db()
+        self.assertEqual(order.status, 'CONFIRMED')
+
+    def test_matching_version_applies(self):
+        order = self.create_order()
+
+        response = self.set_status(self.tailor, order, 'CONFIRMED', version=1)
+
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.data['version'], 2)
+
+    def test_admin_can_set_any_status(self):
+        admin = make_user('admin@example.com', 'ADMIN')
+        order = self.create_order()
+
+        completed = self.set_status(admin, order, 'COMPLETED')
+        reopened = self.set_status(admin, order, 'IN_PROGRESS')
+        unchanged = self.set_status(admin, order, 'IN_PROGRESS')
+
+        self.assertEqual((completed.status_code, reopened.status_code), (200, 200))
+        self.assertEqual(unchanged.status_code, 400)
+        self.profile.refresh_from_db()
+        self.assertEqual((self.profile.open_orders, self.profile.in_progress_orders), (1, 1))
+
+    def test_transitions_keep_tailor_workload_counters(self):
+        first, second = self.create_order(), self.create_order()
+        self.set_status(self.tailor, first, 'CONFIRMED')
+        self.set_status(self.tailor, second, 'CANCELLED')
+
+        self.profile.refresh_from_db()
+        self.assertEqual(
+            (self.profile.open_orders, self.profile.pending_orders, self.profile.confirmed_orders),
+            (1, 0, 1),
+        )
+
+
+class BatchCreateTests(OrderTestCase):
+
+    def setUp(self):
+        super().setUp()
+        self.url = reverse('orders:order-batch-create')
+
+    def test_creates_every_order_with_events_and_counters(self):
+        self.customer.profile_picture = 'profile_pictures/me.png'
+        self.customer.profile_picture_renditions = {
+            'source': 'profile_pictures/me.png',
+            'renditions': {'thumb': {'webp': 'profile_pictures/renditions/me_thumb.webp'}},
+        }
+        self.customer.save()
+        payloads = [self.order_payload(), self.order_payload(order_type='SUIT', total_price='90.00')]
+
+        response = self.client_for(self.customer).post(self.url, payloads, format='json')
+
+        self.assertEqual(response.status_code, 201, response.data)
+        self.assertEqual([order['order_type'] for order in response.data], ['SHIRT', 'SUIT'])
+        thumb = response.data[0]['customer']['profile_picture_renditions']['thumb']['webp']
+        self.assertTrue(thumb.startswith('http://testserver/'), thumb)
+        orders = Order.objects.filter(customer=self.customer)
+        self.assertEqual(orders.count(), 2)
+        self.assertEqual(OrderEvent.objects.filter(order__in=orders, event_type='CREATED').count(), 2)
+        self.profile.refresh_from_db()
+        self.assertEqual((self.profile.open_orders, self.profile.pending_orders), (2, 2))
+
+    def test_one_invalid_order_rejects_the_batch_by_index(self):
+        payloads = [self.order_payload(), self.order_payload(tailor_id=self.customer.pk)]
+
+        response = self.client_for(self.customer).post(self.url, payloads, format='json')
+
+        self.assertEqual(response.status_code, 400)
+        self.assertEqual(list(response.data), [1])
+        self.assertIn('tailor_id', response.data[1])
+        self.assertFalse(Order.objects.exists())
+
+    @override_settings(ORDER_BATCH_MAX_SIZE=2)
+    def test_batches_are_capped(self):
+        response = self.client_for(self.customer).post(self.url, [self.order_payload()] * 3, format='json')
+
+        self.assertEqual(response.status_code, 400)
+        self.assertFalse(Order.objects.exists())
+
+    def test_only_customers_create_orders(self):
+        response = self.client_for(self.tailor).post(self.url, [self.order_payload()], format='json')
+
+        self.assertEqual(response.status_code, 403)
+
+
+class OrderAdminTests(OrderTestCase):
+
+    def test_order_created_in_the_admin_gets_its_created_event(self):
+        admin_user = make_user('admin@example.com', 'ADMIN')
+        request = RequestFactory().post('/admin/orders/order/add/')
+        request.user = admin_user
+        order = Order(customer=self.customer, tailor=self.tailor, order_type='SHIRT', total_price='40.00')
+
+        with mock.patch('orders.admin.publish_events') as publish:
+            site._registry[Order].save_model(request, order, form=None, change=False)
+
+        event = OrderEvent.objects.get(order=order)
+        self.assertEqual((event.event_type, event.to_status, event.actor), ('CREATED', 'PENDING', admin_user))
+        publish.assert_called_once_with([event])
+        self.profile.refresh_from_db()
+        self.assertEqual((self.profile.open_orders, self.profile.pending_orders), (1, 1))
+
+
+def collect(stream, count):
+    """The first ``count`` chunks of the async ``stream``."""
+    async def take():
+        chunks = []
+        async for chunk in stream:
+            chunks.append(chunk)
+            if len(chunks) == count:
+                break
+        await stream.aclose()
+        return chunks
+    return async_to_sync(take)()
+
+
+class EventStreamTests(OrderTestCase):
+
+    def setUp(self):
+        super().setUp()
+        for _ in range(3):
+            self.create_order()
+        self.events = list(OrderEvent.objects.order_by('id'))
+
+    def ids(self, events):
+        return [event.id for event in events]
+
+    def test_late_events_are_limited_to_the_commit_grace_period(self):
+        first, second, third = self.events
+        OrderEvent.objects.filter(pk=first.pk).update(created_at=timezone.now() - timedelta(hours=1))
+
+        late = late_events(filter_events({}), third.id, SentEvents())
+        self.assertEqual(self.ids(late), [second.id])
+        self.assertFalse(late_events(filter_events({}), third.id, SentEvents([second.id])).exists())
+
+    def test_sent_events_are_forgotten_after_the_grace_period(self):
+        with mock.patch('orders.realtime.time.monotonic', return_value=100.0):
+            sent = SentEvents([1])
+        self.assertIn(1, sent)
+
+        later = 100.0 + settings.ORDER_EVENT_COMMIT_GRACE + 1
+        with mock.patch('orders.realtime.time.monotonic', return_value=later):
+            self.assertEqual(sent.ids(), [])
+        self.assertNotIn(1, sent)
+
+    def test_replay_includes_late_events_that_were_not_sent(self):
+        first, second, third = self.events
+
+        async def replay(sent):
+            return [message['id'] async for message in _replay({}, second.id, sent)]
+
+        self.assertEqual(async_to_sync(replay)(SentEvents()), [first.id, third.id])
+        self.assertEqual(async_to_sync(replay)(SentEvents([first.id])), [third.id])
+
+    def test_polling_picks_up_late_events(self):
+        first, second, third = self.events
+        subscription = DatabaseBroker().subscribe({})
+
+        self.assertEqual(self.ids(subscription.poll(second.id, SentEvents())), [first.id, third.id])
+        self.assertEqual(self.ids(subscription.poll(second.id, SentEvents([first.id]))), [third.id])
+
+    @override_settings(
+        ORDER_EVENT_BROKER='orders.realtime.DatabaseBroker', ORDER_EVENT_STREAM_KEEPALIVE=0,
+    )
+    def test_stream_does_not_resend_events(self):
+        first, second, third = self.events
+        get_broker.cache_clear()
+        self.addCleanup(get_broker.cache_clear)
+
+        chunks = collect(_stream({}, first.id, seen=[first.id]), 4)
+
+        self.assertTrue(chunks[0].startswith('retry: '))
+        self.assertTrue(chunks[1].startswith(f'id: {second.id}\n'))
+        self.assertTrue(chunks[2].startswith(f'id: {third.id}\n'))
+        self.assertEqual(chunks[3], ': keepalive\n\n')
+
+    def test_subscriptions_are_scoped_to_the_user(self):
+        other = make_user('other@example.com', 'CUSTOMER')
+        admin = make_user('admin@example.com', 'ADMIN')
+
+        for user, expected in ((self.customer, 3), (self.tailor, 3), (other, 0), (admin, 3)):
+            self.assertEqual(filter_events(subscription_filters(user)).count(), expected)
+        order_id = self.events[0].order_id
+        self.assertEqual(self.ids(filter_events(subscription_filters(admin, order_id))), [self.events[0].id])
+
+    def test_stream_endpoint(self):
+        url = reverse('orders:order-event-stream')
+        token = RefreshToken.for_user(self.customer).access_token
+        auth = {'HTTP_AUTHORIZATION': f'Bearer {token}'}
+
+        self.assertEqual(self.client.get(url).status_code, 401)
+        response = self.client.get(url, HTTP_LAST_EVENT_ID='abc', **auth)
+        self.assertEqual(response.status_code, 400)
+        self.assertEqual(response.json(), {'error': "Last-Event-ID must be an integer."})
+        response = self.client.get(url, **auth)
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response['Content-Type'], 'text/event-stream')
+        self.assertEqual(response['Cache-Control'], 'no-cache')
+
+
+class IdempotencyTests(OrderTestCase):
+
+    def setUp(self):
+        super().setUp()
+        caches[settings.IDEMPOTENCY_CACHE].clear()
+        self.url = reverse('orders:order-create')
+
+    def post(self, key, payload):
+        return self.client_for(self.customer).post(
+            self.url, payload, format='json', HTTP_IDEMPOTENCY_KEY=key
+        )
+
+    def test_retry_replays_the_stored_response(self):
+        first = self.post('order-1', self.order_payload())
+        retry = self.post('order-1', self.order_payload())
+
+        self.assertEqual(first.status_code, 201)
+        self.assertEqual(retry.status_code, 201)
+        self.assertEqual(retry.data, first.data)
+        self.assertEqual(retry['Idempotent-Replayed'], 'true')
+        self.assertEqual(Order.objects.filter(customer=self.customer).count(), 1)
+
+    def test_keys_are_scoped_per_user(self):
+        other = make_user('other@example.com', 'CUSTOMER')
+        self.post('order-1', self.order_payload())
+
+        response = self.client_for(other).post(
+            self.url, self.order_payload(), format='json', HTTP_IDEMPOTENCY_KEY='order-1'
+        )
+
+        self.assertEqual(response.status_code, 201)
+        self.assertFalse(response.has_header('Idempotent-Replayed'))
+
+    def test_reusing_a_key_for_another_request_is_rejected(self):
+        self.post('order-1', self.order_payload())
+
+        response = self.post('order-1', self.order_payload(total_price='55.00'))
+
+        self.assertEqual(response.status_code, 422)
+        self.assertEqual(Order.objects.filter(customer=self.customer).count(), 1)
+
+    @override_settings(IDEMPOTENCY_WAIT_SECONDS=0)
+    def test_retry_during_the_original_request_conflicts(self):
+        payload = self.order_payload()
+        fingerprint = IdempotencyMixin().request_fingerprint(
+            SimpleNamespace(method='POST', path=self.url, data=payload)
+        )
+        cache_key = 'idempotency:{}:{}'.format(
+            self.customer.pk, hashlib.sha256(b'order-1').hexdigest()
+        )
+        caches[settings.IDEMPOTENCY_CACHE].set(cache_key, {'state': PENDING, 'fingerprint': fingerprint})
+
+        response = self.post('order-1', payload)
+
+        self.assertEqual(response.status_code, 409)
+        self.assertEqual(response['Retry-After'], '1')
+        self.assertFalse(Order.objects.filter(customer=self.customer).exists())
+
+    def test_invalid_key_is_rejected(self):
+        response = self.post('k' * 256, self.order_payload())
+
+        self.assertEqual(response.status_code, 400)
+
+
+class ArchiveTests(OrderTestCase):
+
+    def setUp(self):
+        super().setUp()
+        self.closed = self.create_order()
+        self.set_status(self.tailor, self.closed, 'CANCELLED')
+        self.open = self.create_order()
+        old = timezone.now() - timedelta(days=settings.ORDER_ARCHIVE_AFTER_DAYS + 1)
+        Order.objects.update(updated_at=old)
+
+    def test_closed_orders_move_with_their_items(self):
+        moved = archive_batch(archive_cutoff(), batch_size=100)
+
+        self.assertEqual(moved, 1)
+        self.assertEqual(list(Order.objects.values_list('id', flat=True)), [self.open.pk])
+        archived = ArchivedOrder.objects.get()
+        self.assertEqual(
+            (archived.pk, archived.order_number, archived.status),
+            (self.closed.pk, self.closed.order_number, 'CANCELLED'),
+        )
+        self.assertEqual(ArchivedOrderItem.objects.filter(order=archived).count(), 1)
+        self.assertFalse(OrderItem.objects.filter(order_id=self.closed.pk).exists())
+        self.assertTrue(OrderEvent.objects.filter(order_id=self.closed.pk).exists())
+
+    def test_recently_closed_orders_stay(self):
+        Order.objects.filter(pk=self.closed.pk).update(updated_at=timezone.now())
+
+        self.assertEqual(archive_batch(archive_cutoff(), batch_size=100), 0)
+
+    def test_detail_falls_back_to_the_archive(self):
+        archive_batch(archive_cutoff(), batch_size=100)
+        client = self.client_for(self.customer)
+
+        by_id = client.get(reverse('orders:order-detail', kwargs={'id': self.closed.pk}))
+        by_number = client.get(
+            reverse('orders:order-number-detail', kwargs={'order_number': self.closed.order_number})
+        )
+
+        self.assertEqual(by_id.status_code, 200)
+        self.assertEqual(by_id.data['status'], 'CANCELLED')
+        self.assertIsNotNone(by_id.data['archived_at'])
+        self.assertEqual(len(by_id.data['items']), 1)
+        self.assertEqual(by_number.status_code, 200)
+        self.assertEqual(by_number.data['id'], self.closed.pk)
+
+    def test_archived_orders_stay_private(self):
+        archive_batch(archive_cutoff(), batch_size=100)
+        stranger = make_user('stranger@example.com', 'CUSTOMER')
+
+        response = self.client_for(stranger).get(reverse('orders:order-detail', kwargs={'id': self.closed.pk}))
+
+        self.assertEqual(response.status_code, 404)
+
+    def test_list_shows_archived_orders_on_request(self):
+        archive_batch(archive_cutoff(), batch_size=100)
+        client = self.client_for(self.customer)
+
+        active = client.get(reverse('orders:order-list'))
+        archived = client.get(reverse('orders:order-list'), {'archived': 'true'})
+
+        self.assertEqual([order['id'] for order in active.data['results']], [self.open.pk])
+        self.assertEqual([order['id'] for order in archived.data['results']], [self.closed.pk])
+
+    def test_tailor_keeps_access_to_measurements_of_archived_orders(self):
+        template = MeasurementTemplate.objects.create(
+            name='Shirt', measurement_type='SHIRT', standard_measurements={'chest': {'unit': 'cm'}}
+        )
+        measurement = CustomerMeasurement.objects.create(
+            customer=self.customer, template=template, measurements={'chest': 100}
+        )
+        Order.objects.filter(pk=self.closed.pk).update(customer_measurement=measurement)
+        archive_batch(archive_cutoff(), batch_size=100)
+        url = reverse('measurements:measurement-revisions', kwargs={'id': measurement.pk})
+
+        response = self.client_for(self.tailor).get(url)
+        other = self.client_for(make_user('other@example.com', 'TAILOR')).get(url)
+
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(other.status_code, 404)
+
+    def test_export_includes_archived_orders(self):
+        archive_batch(archive_cutoff(), batch_size=100)
+        admin = make_user('admin@example.com', 'ADMIN')
+
+        response = self.client_for(admin).get(reverse('orders:order-export'), {'export_format': 'ndjson'})
+        cancelled = self.client_for(admin).get(
+            reverse('orders:order-export'), {'export_format': 'ndjson', 'status': 'CANCELLED'}
+        )
+
+        records = [json.loads(line) for line in b''.join(response.streaming_content).splitlines()]
+        self.assertEqual(
+            [(record['order_number'], len(record['items'])) for record in records],
+            [(self.closed.order_number, 1), (self.open.order_number, 1)],
+        )
+        self.assertEqual(len(b''.join(cancelled.streaming_content).splitlines()), 1)
+
+
+class RollupFixtures(OrderFixtures):
+
+    def place_orders(self):
+        """Complete one order, cancel one and leave one pending."""
+        completed, cancelled = self.create_order(), self.create_order()
+        self.create_order()
+        for new_status in ('CONFIRMED', 'IN_PROGRESS', 'READY', 'COMPLETED'):
+            self.set_status(self.tailor, completed, new_status)
+        self.set_status(self.customer, cancelled, 'CANCELLED')
+
+    def report(self, user, **params):
+        return self.client_for(user).get(reverse('orders:order-daily-report'), params)
+
+    def rollup_rows(self):
+        return list(TailorDailyRollup.objects.order_by('tailor_id', 'day').values(
+            'tailor_id', 'day', 'created_count', 'confirmed_count', 'in_progress_count', 'ready_count',
+            'completed_count', 'cancelled_count', 'booked_total', 'deposit_total', 'revenue_total',
+            'cancelled_total',
+        ))
+
+
+class RollupTests(RollupFixtures, OrderTestCase):
+
+    def test_order_writes_update_the_daily_rollup(self):
+        self.place_orders()
+
+        response = self.report(self.tailor)
+
+        self.assertEqual(response.status_code, 200)
+        totals = response.data['totals']
+        self.assertEqual(
+            [totals[field] for field in ('created_count', 'confirmed_count', 'completed_count', 'cancelled_count')],
+            [3, 1, 1, 1],
+        )
+        self.assertEqual(
+            (totals['booked_total'], totals['revenue_total'], totals['cancelled_total'], totals['average_ticket']),
+            ('120.00', '40.00', '40.00', '40.00'),
+        )
+        self.assertEqual([day['day'] for day in response.data['days']], [str(timezone.localdate())])
+
+    def test_report_scope(self):
+        self.place_orders()
+        other = make_user('other@example.com', 'TAILOR')
+        admin = make_user('admin@example.com', 'ADMIN')
+
+        self.assertEqual(self.report(other).data['totals']['created_count'], 0)
+        self.assertEqual(self.report(admin, tailor=self.tailor.pk).data['totals']['created_count'], 3)
+        self.assertEqual(self.report(self.customer).status_code, 403)
+        self.assertEqual(self.report(admin, start='2026-02-01', end='2026-01-01').status_code, 400)
+
+
+@requires_postgresql
+class RollupRebuildTests(RollupFixtures, TransactionTestCase):
+    """``rebuild_order_rollups`` sets its own isolation level, so it needs real transactions."""
+
+    def rebuild(self, *args):
+        call_command('rebuild_order_rollups', *args, stdout=StringIO())
+
+    def test_rebuild_matches_the_incremental_rollups(self):
+        self.place_orders()
+        expected = self.rollup_rows()
+        TailorDailyRollup.objects.update(created_count=99, revenue_total=0)
+
+        self.rebuild()
+
+        self.assertEqual(self.rollup_rows(), expected)
+
+    def test_rebuild_counts_archived_orders(self):
+        self.place_orders()
+        expected = self.rollup_rows()
+        Order.objects.update(updated_at=timezone.now() - timedelta(days=settings.ORDER_ARCHIVE_AFTER_DAYS + 1))
+        self.assertEqual(archive_batch(archive_cutoff(), batch_size=100), 2)
+
+        self.rebuild('--since', str(timezone.localdate()))
+
+        self.assertEqual(self.rollup_rows(), expected)
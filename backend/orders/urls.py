@@ -1,10 +1,17 @@
 from django.urls import path
+from .realtime import order_event_stream
 from .views import (
     OrderListView,
     OrderCreateView,
+    OrderBatchCreateView,
     OrderDetailView,
+    OrderNumberDetailView,
     OrderStatusUpdateView,
-    OrderCancelView
+    OrderCancelView,
+    OrderEventListView,
+    OrderHistoryView,
+    DailyReportView,
+    OrderExportView
 )
 
 app_name = 'orders'
@@ -12,8 +19,15 @@ app_name = 'orders'
 urlpatterns = [
     path('', OrderListView.as_view(), name='order-list'),
     path('create/', OrderCreateView.as_view(), name='order-create'),
+    path('batch/', OrderBatchCreateView.as_view(), name='order-batch-create'),
     path('<int:id>/', OrderDetailView.as_view(), name='order-detail'),
+    path('number/<str:order_number>/', OrderNumberDetailView.as_view(), name='order-number-detail'),
     path('<int:id>/status/', OrderStatusUpdateView.as_view(), name='order-status-update'),
     path('<int:id>/cancel/', OrderCancelView.as_view(), name='order-cancel'),
+    path('<int:id>/events/', OrderHistoryView.as_view(), name='order-history'),
+    path('events/stream/', order_event_stream, name='order-event-stream'),
+    path('events/', OrderEventListView.as_view(), name='order-event-list'),
+    path('reports/daily/', DailyReportView.as_view(), name='order-daily-report'),
+    path('export/', OrderExportView.as_view(), name='order-export'),
 ]
 
@@ -1,41 +1,76 @@
+from datetime import date, timedelta
+from decimal import Decimal
+
+from django.conf import settings
+from django.db.models import DecimalField, Sum
+from django.db.models.functions import Coalesce
+from django.utils import timezone
 from rest_framework import generics, status
 from rest_framework.permissions import IsAuthenticated
 from rest_framework.response import Response
-from rest_framework.exceptions import PermissionDenied
-from .models import Order, OrderItem
+from rest_framework.exceptions import NotFound, PermissionDenied, ValidationError
+from core.expansion import ExpandableQuerysetMixin
+from core.exports import ExportView
+from core.idempotency import IdempotencyMixin
+from core.pagination import KeysetPagination
+from . import exports
+from .models import ArchivedOrder, Order, OrderEvent, OrderItem, TailorDailyRollup
+from .rollups import COUNT_FIELDS, TOTAL_FIELDS
+from .state_machine import (
+    TRANSITION_FIELDS,
+    InvalidTransition,
+    TransitionConflict,
+    apply_transition
+)
 from .serializers import (
+    ArchivedOrderSerializer,
     OrderSerializer,
     OrderCreateSerializer,
+    OrderEventSerializer,
+    DailyRollupSerializer,
     OrderStatusUpdateSerializer
 )
 
 
-class OrderListView(generics.ListAPIView):
-    """List orders filtered by user role."""
+class OrderListView(ExpandableQuerysetMixin, generics.ListAPIView):
+    """
+    List orders filtered by user role.
+
+    ``?fields=`` and ``?expand=`` select the fields and nested relations
+    returned and ``?sideload=true`` moves users and measurements into an
+    ``included`` map; see ``core.expansion``.
+
+    Closed orders moved to the archive (see ``orders.archive``) are no
+    longer listed here; ``?archived=true`` lists them instead.
+    """
 
     serializer_class = OrderSerializer
     permission_classes = (IsAuthenticated,)
+    pagination_class = KeysetPagination
+
+    @property
+    def archived(self):
+        return self.request.query_params.get('archived', '').lower() in ('true', '1')
+
+    def get_serializer_class(self):
+        return ArchivedOrderSerializer if self.archived else OrderSerializer
 
     def get_queryset(self):
         """Return orders based on user role."""
         user = self.request.user
+        model = ArchivedOrder if self.archived else Order
 
         if user.user_type == 'CUSTOMER':
-            return Order.objects.filter(customer=user).select_related(
-                'customer', 'tailor', 'customer_measurement'
-            ).prefetch_related('items')
+            queryset = model.objects.filter(customer=user)
         elif user.user_type == 'TAILOR':
-            return Order.objects.filter(tailor=user).select_related(
-                'customer', 'tailor', 'customer_measurement'
-            ).prefetch_related('items')
+            queryset = model.objects.filter(tailor=user)
         else:
             # Admin can see all orders
-            return Order.objects.all().select_related(
-                'customer', 'tailor', 'customer_measurement'
-            ).prefetch_related('items')
+            queryset = model.objects.all()
+        return self.expand_queryset(queryset)
 
 
-class OrderCreateView(generics.CreateAPIView):
+class OrderCreateView(IdempotencyMixin, generics.CreateAPIView):
     """Create a new order (customers only)."""
 
     serializer_class = OrderCreateSerializer
@@ -48,40 +83,245 @@ class OrderCreateView(generics.CreateAPIView):
         serializer.save()
 
 
-class OrderDetailView(generics.RetrieveAPIView):
-    """Get order details."""
+class OrderBatchCreateView(IdempotencyMixin, generics.CreateAPIView):
+    """
+    Create many orders in one request (customers only).
+
+    Accepts a list of order payloads, as sent by devices syncing orders
+    captured offline. Either every order is created or none is, and errors
+    are reported per list index.
+    """
+
+    serializer_class = OrderCreateSerializer
+    permission_classes = (IsAuthenticated,)
+
+    def get_serializer(self, *args, **kwargs):
+        kwargs.setdefault('many', True)
+        kwargs.setdefault('max_length', settings.ORDER_BATCH_MAX_SIZE)
+        return super().get_serializer(*args, **kwargs)
+
+    def create(self, request, *args, **kwargs):
+        if request.user.user_type != 'CUSTOMER':
+            raise PermissionDenied("Only customers can create orders.")
+        serializer = self.get_serializer(data=request.data)
+        serializer.is_valid(raise_exception=True)
+        orders = serializer.save()
+        data = OrderSerializer(orders, many=True, context=self.get_serializer_context()).data
+        return Response(data, status=status.HTTP_201_CREATED)
+
+
+class OrderDetailView(ExpandableQuerysetMixin, generics.RetrieveAPIView):
+    """
+    Get order details.
+
+    Orders moved to the archive (see ``orders.archive``) are found there
+    when they are no longer in the active table.
+    """
 
     serializer_class = OrderSerializer
     permission_classes = (IsAuthenticated,)
     lookup_field = 'id'
+    archived = False
 
     def get_queryset(self):
         """Return orders user has access to."""
         user = self.request.user
+        model = ArchivedOrder if self.archived else Order
         if user.user_type == 'CUSTOMER':
-            return Order.objects.filter(customer=user).select_related(
-                'customer', 'tailor', 'customer_measurement'
-            ).prefetch_related('items')
+            queryset = model.objects.filter(customer=user)
         elif user.user_type == 'TAILOR':
-            return Order.objects.filter(tailor=user).select_related(
-                'customer', 'tailor', 'customer_measurement'
-            ).prefetch_related('items')
+            queryset = model.objects.filter(tailor=user)
         else:
-            return Order.objects.all().select_related(
-                'customer', 'tailor', 'customer_measurement'
-            ).prefetch_related('items')
+            queryset = model.objects.all()
+        return self.expand_queryset(queryset)
+
+    def get_serializer_class(self):
+        return ArchivedOrderSerializer if self.archived else OrderSerializer
 
     def get_object(self):
         """Ensure user can only access their own orders."""
-        obj = super().get_object()
+        lookup = {self.lookup_field: self.kwargs[self.lookup_url_kwarg or self.lookup_field]}
+        try:
+            obj = self.get_queryset().get(**lookup)
+        except Order.DoesNotExist:
+            self.archived = True
+            try:
+                obj = self.get_queryset().get(**lookup)
+            except ArchivedOrder.DoesNotExist:
+                raise NotFound("Order not found.")
+        self.check_object_permissions(self.request, obj)
         user = self.request.user
-        if user.user_type not in ['ADMIN'] and obj.customer != user and obj.tailor != user:
+        if user.user_type not in ['ADMIN'] and obj.customer_id != user.id and obj.tailor_id != user.id:
             raise PermissionDenied("You do not have permission to access this order.")
         return obj
 
 
-class OrderStatusUpdateView(generics.UpdateAPIView):
-    """Update order status."""
+class OrderNumberDetailView(OrderDetailView):
+    """Get order details by order number."""
+
+    lookup_field = 'order_number'
+
+
+class OrderEventListView(generics.ListAPIView):
+    """
+    Order history visible to the user, newest first.
+
+    Tailors see events for their orders and customers for theirs; admins
+    see everything and may filter with ``?tailor=`` or ``?customer=``.
+    Reads only the event table through its per-party indexes.
+    """
+
+    serializer_class = OrderEventSerializer
+    permission_classes = (IsAuthenticated,)
+    pagination_class = KeysetPagination
+
+    def get_queryset(self):
+        user = self.request.user
+        queryset = OrderEvent.objects.order_by('-created_at', '-id')
+        if user.user_type == 'TAILOR':
+            return queryset.filter(tailor=user)
+        if user.user_type == 'CUSTOMER':
+            return queryset.filter(customer=user)
+        for party in ('tailor', 'customer'):
+            value = self.request.query_params.get(party)
+            if value:
+                try:
+                    queryset = queryset.filter(**{f'{party}_id': int(value)})
+                except ValueError:
+                    pass
+        return queryset
+
+
+class OrderHistoryView(generics.ListAPIView):
+    """Events of one order in sequence order."""
+
+    serializer_class = OrderEventSerializer
+    permission_classes = (IsAuthenticated,)
+    pagination_class = KeysetPagination
+
+    def get_queryset(self):
+        user = self.request.user
+        queryset = OrderEvent.objects.filter(order_id=self.kwargs['id']).order_by('sequence')
+        if user.user_type == 'TAILOR':
+            return queryset.filter(tailor=user)
+        if user.user_type == 'CUSTOMER':
+            return queryset.filter(customer=user)
+        return queryset
+
+
+class DailyReportView(generics.GenericAPIView):
+    """
+    Daily order volume and revenue from the rollup table.
+
+    ``?start=`` and ``?end=`` (YYYY-MM-DD) bound the report, which defaults
+    to the last 30 days. Tailors see their own figures; admins see all
+    tailors combined or one with ``?tailor=``.
+    """
+
+    serializer_class = DailyRollupSerializer
+    permission_classes = (IsAuthenticated,)
+    max_days = 366
+
+    def get_queryset(self):
+        user = self.request.user
+        queryset = TailorDailyRollup.objects.all()
+        if user.user_type == 'TAILOR':
+            return queryset.filter(tailor=user)
+        if user.user_type != 'ADMIN':
+            raise PermissionDenied("Only tailors and admins can view order reports.")
+        tailor = self.request.query_params.get('tailor')
+        if tailor:
+            try:
+                queryset = queryset.filter(tailor_id=int(tailor))
+            except ValueError:
+                raise ValidationError({'tailor': "Must be a user id."})
+        return queryset
+
+    def get_range(self):
+        """Return the validated ``(start, end)`` dates of the report."""
+        params = self.request.query_params
+        try:
+            end = date.fromisoformat(params['end']) if params.get('end') else timezone.localdate()
+            start = date.fromisoformat(params['start']) if params.get('start') else end - timedelta(days=29)
+        except ValueError:
+            raise ValidationError("start and end must be dates in YYYY-MM-DD format.")
+        if start > end:
+            raise ValidationError("start must not be after end.")
+        if (end - start).days >= self.max_days:
+            raise ValidationError(f"Reports cover at most {self.max_days} days.")
+        return start, end
+
+    def get(self, request, *args, **kwargs):
+        start, end = self.get_range()
+        sums = {field: Coalesce(Sum(field), 0) for field in COUNT_FIELDS}
+        sums.update({
+            field: Coalesce(Sum(field), Decimal('0'), output_field=DecimalField())
+            for field in TOTAL_FIELDS
+        })
+        rollups = self.get_queryset().filter(day__range=(start, end))
+        days = rollups.values('day').annotate(**sums).order_by('day')
+        totals = rollups.aggregate(**sums)
+        return Response({
+            'start': start,
+            'end': end,
+            'days': self.get_serializer(days, many=True).data,
+            'totals': self.get_serializer(totals).data,
+        })
+
+
+class OrderExportView(ExportView):
+    """
+    Stream orders with their items (admins only), archived orders
+    included.
+
+    Filters: ``created_after``, ``created_before``, ``status`` (comma
+    separated) and ``tailor``. CSV has one row per item.
+    """
+
+    filename = 'orders'
+    columns = exports.CSV_COLUMNS
+    filters = exports.FILTERS
+
+    def get_records(self, filters):
+        return exports.order_records(filters)
+
+    def flatten(self, records):
+        return exports.order_rows(records)
+
+
+class OrderTransitionMixin:
+    """Apply status transitions through ``orders.state_machine``."""
+
+    def get_transition_queryset(self):
+        """Orders the user may change, loading only the transition fields."""
+        return Order.objects.only(*TRANSITION_FIELDS)
+
+    def transition(self, order, new_status, expected_version=None):
+        """Apply the transition and return the response for it."""
+        try:
+            apply_transition(order, new_status, self.request.user, expected_version)
+        except InvalidTransition as exc:
+            return Response({"error": str(exc)}, status=status.HTTP_400_BAD_REQUEST)
+        except TransitionConflict as exc:
+            current = Order.objects.filter(pk=order.pk).values('status', 'version').first() or {}
+            return Response(
+                {"error": str(exc), **current},
+                status=status.HTTP_409_CONFLICT
+            )
+
+        order = OrderSerializer.expand_queryset(
+            Order.objects.filter(pk=order.pk), self.request
+        ).get()
+        return Response(OrderSerializer(order, context=self.get_serializer_context()).data)
+
+
+class OrderStatusUpdateView(IdempotencyMixin, OrderTransitionMixin, generics.UpdateAPIView):
+    """
+    Update order status.
+
+    An optional ``version`` makes the update conditional on the order being
+    unchanged since the client read it; conflicts return 409.
+    """
 
     serializer_class = OrderStatusUpdateSerializer
     permission_classes = (IsAuthenticated,)
@@ -90,18 +330,13 @@ class OrderStatusUpdateView(generics.UpdateAPIView):
     def get_queryset(self):
         """Return orders user can update."""
         user = self.request.user
+        queryset = self.get_transition_queryset()
         if user.user_type == 'TAILOR':
-            return Order.objects.filter(tailor=user).select_related(
-                'customer', 'tailor', 'customer_measurement'
-            ).prefetch_related('items')
+            return queryset.filter(tailor=user)
         elif user.user_type == 'CUSTOMER':
-            return Order.objects.filter(customer=user).select_related(
-                'customer', 'tailor', 'customer_measurement'
-            ).prefetch_related('items')
+            return queryset.filter(customer=user)
         else:
-            return Order.objects.all().select_related(
-                'customer', 'tailor', 'customer_measurement'
-            ).prefetch_related('items')
+            return queryset
 
     def get_object(self):
         """Get order and validate access."""
@@ -109,7 +344,7 @@ class OrderStatusUpdateView(generics.UpdateAPIView):
         user = self.request.user
 
         # Ensure user is either customer or tailor
-        if obj.customer != user and obj.tailor != user and user.user_type != 'ADMIN':
+        if obj.customer_id != user.id and obj.tailor_id != user.id and user.user_type != 'ADMIN':
             raise PermissionDenied("You do not have permission to update this order.")
 
         return obj
@@ -123,13 +358,14 @@ class OrderStatusUpdateView(generics.UpdateAPIView):
         )
         serializer.is_valid(raise_exception=True)
 
-        order.status = serializer.validated_data['status']
-        order.save()
-
-        return Response(OrderSerializer(order).data)
+        return self.transition(
+            order,
+            serializer.validated_data['status'],
+            serializer.validated_data.get('version')
+        )
 
 
-class OrderCancelView(generics.DestroyAPIView):
+class OrderCancelView(IdempotencyMixin, OrderTransitionMixin, generics.DestroyAPIView):
     """Cancel an order (customers only, if status allows)."""
 
     serializer_class = OrderSerializer
@@ -138,9 +374,7 @@ class OrderCancelView(generics.DestroyAPIView):
 
     def get_queryset(self):
         """Return customer's orders."""
-        return Order.objects.filter(customer=self.request.user).select_related(
-            'customer', 'tailor', 'customer_measurement'
-        ).prefetch_related('items')
+        return self.get_transition_queryset().filter(customer=self.request.user)
 
     def destroy(self, request, *args, **kwargs):
         """Cancel order by updating status instead of deleting."""
@@ -152,10 +386,4 @@ class OrderCancelView(generics.DestroyAPIView):
                 status=status.HTTP_400_BAD_REQUEST
             )
 
-        order.status = 'CANCELLED'
-        order.save()
-
-        return Response(
-            OrderSerializer(order).data,
-            status=status.HTTP_200_OK
-        )
+        return self.transition(order, 'CANCELLED')
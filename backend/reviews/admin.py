@@ -0,0 +1,19 @@
+from django.contrib import admin
+from .models import Review
+
+
+@admin.register(Review)
+class ReviewAdmin(admin.ModelAdmin):
+    """Admin configuration for Review model."""
+
+    list_display = ('order_number', 'customer', 'tailor', 'rating', 'created_at')
+    list_filter = ('rating', 'created_at')
+    search_fields = ('order_number', 'customer__email', 'tailor__email', 'comment')
+    readonly_fields = ('order_number', 'customer', 'tailor', 'created_at', 'updated_at')
+    raw_id_fields = ('order',)
+
+    fieldsets = (
+        (None, {'fields': ('order', 'order_number', 'customer', 'tailor')}),
+        ('Review', {'fields': ('rating', 'comment')}),
+        ('Important Dates', {'fields': ('created_at', 'updated_at')}),
+    )
@@ -0,0 +1,72 @@
+from decimal import ROUND_HALF_UP, Decimal
+
+from django.core.management.base import BaseCommand
+from django.db import transaction
+from django.db.models import Count, Sum
+from tailors.cache import invalidate_directory
+from tailors.models import TailorProfile
+from reviews.models import Review
+
+
+class Command(BaseCommand):
+    help = "Recompute tailor rating totals from reviews in batches and fix any drift."
+
+    def add_arguments(self, parser):
+        parser.add_argument('--batch-size', type=int, default=500)
+        parser.add_argument(
+            '--dry-run',
+            action='store_true',
+            help="Report drifted profiles without updating them.",
+        )
+
+    def handle(self, *args, batch_size, dry_run, **options):
+        last_id = 0
+        checked = fixed = 0
+        while True:
+            with transaction.atomic():
+                # Lock the batch so concurrent review writes queue behind us
+                # and apply their deltas on top of the reconciled totals.
+                profiles = list(
+                    TailorProfile.objects.select_for_update()
+                    .filter(id__gt=last_id)
+                    .order_by('id')
+                    .only('id', 'user_id', 'rating', 'rating_sum', 'total_reviews')[:batch_size]
+                )
+                if not profiles:
+                    break
+                last_id = profiles[-1].id
+                checked += len(profiles)
+
+                totals = {
+                    row['tailor_id']: (row['rating_sum'], row['review_count'])
+                    for row in Review.objects.filter(
+                        tailor_id__in=[profile.user_id for profile in profiles]
+                    ).values('tailor_id').annotate(
+                        rating_sum=Sum('rating'),
+                        review_count=Count('id'),
+                    )
+                }
+
+                drifted = []
+                for profile in profiles:
+                    rating_sum, review_count = totals.get(profile.user_id, (0, 0))
+                    rating = Decimal('0.00')
+                    if review_count:
+                        rating = (Decimal(rating_sum) / review_count).quantize(
+                            Decimal('0.01'), rounding=ROUND_HALF_UP
+                        )
+                    if (profile.rating_sum, profile.total_reviews, profile.rating) != (rating_sum, review_count, rating):
+                        profile.rating_sum = rating_sum
+                        profile.total_reviews = review_count
+                        profile.rating = rating
+                        drifted.append(profile)
+
+                fixed += len(drifted)
+                if drifted and not dry_run:
+                    TailorProfile.objects.bulk_update(drifted, ['rating_sum', 'total_reviews', 'rating'])
+                    invalidate_directory()
+
+        action = "would fix" if dry_run else "fixed"
+        self.stdout.write(self.style.SUCCESS(
+            f"Checked {checked} tailor profiles, {action} {fixed}."
+        ))
@@ -0,0 +1,35 @@
+# Generated by Django 6.0 on 2026-10-18 05:04
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+def copy_order_numbers(apps, schema_editor):
+    Order = apps.get_model('orders', 'Order')
+    Review = apps.get_model('reviews', 'Review')
+    Review.objects.update(order_number=models.Subquery(
+        Order.objects.filter(pk=models.OuterRef('order_id')).values('order_number')[:1]
+    ))
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('orders', '0007_archive'),
+        ('reviews', '0001_initial'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='review',
+            name='order_number',
+            field=models.CharField(default='', editable=False, max_length=50),
+            preserve_default=False,
+        ),
+        migrations.RunPython(copy_order_numbers, migrations.RunPython.noop),
+        migrations.AlterField(
+            model_name='review',
+            name='order',
+            field=models.OneToOneField(db_constraint=False, on_delete=django.db.models.deletion.DO_NOTHING, related_name='review', to='orders.order'),
+        ),
+    ]
@@ -0,0 +1,70 @@
+from django.core.validators import MaxValueValidator, MinValueValidator
+from django.db import models, transaction
+from users.models import User
+from orders.models import Order
+from .ratings import apply_rating_change
+
+
+class Review(models.Model):
+    """Customer review of a completed order, rated 1 to 5."""
+
+    # Not constrained: reviews stay when their order is archived.
+    order = models.OneToOneField(
+        Order,
+        on_delete=models.DO_NOTHING,
+        db_constraint=False,
+        related_name='review'
+    )
+    order_number = models.CharField(max_length=50, editable=False)
+    customer = models.ForeignKey(
+        User,
+        on_delete=models.CASCADE,
+        related_name='reviews_written'
+    )
+    tailor = models.ForeignKey(
+        User,
+        on_delete=models.CASCADE,
+        related_name='reviews_received'
+    )
+    rating = models.PositiveSmallIntegerField(
+        validators=[MinValueValidator(1), MaxValueValidator(5)]
+    )
+    comment = models.TextField(blank=True)
+    created_at = models.DateTimeField(auto_now_add=True)
+    updated_at = models.DateTimeField(auto_now=True)
+
+    class Meta:
+        verbose_name = 'Review'
+        verbose_name_plural = 'Reviews'
+        ordering = ['-created_at']
+        indexes = [
+            models.Index(fields=['tailor', '-created_at', '-id'], name='review_tailor_created_idx'),
+        ]
+
+    @classmethod
+    def from_db(cls, db, field_names, values):
+        instance = super().from_db(db, field_names, values)
+        instance._stored_rating = instance.__dict__.get('rating')
+        return instance
+
+    def save(self, *args, **kwargs):
+        """Save the review and apply the rating delta to the tailor's profile."""
+        adding = self._state.adding
+        if adding:
+            if self.order.status != 'COMPLETED':
+                raise ValueError("Only completed orders can be reviewed")
+            self.customer_id = self.order.customer_id
+            self.tailor_id = self.order.tailor_id
+            self.order_number = self.order.order_number
+
+        stored_rating = getattr(self, '_stored_rating', None)
+        with transaction.atomic():
+            super().save(*args, **kwargs)
+            if adding:
+                apply_rating_change(self.tailor_id, self.rating, 1)
+            elif stored_rating is not None and stored_rating != self.rating:
+                apply_rating_change(self.tailor_id, self.rating - stored_rating, 0)
+        self._stored_rating = self.rating
+
+    def __str__(self):
+        return f"{self.order_number} - {self.rating}/5"
@@ -0,0 +1,40 @@
+"""
+Incremental maintenance of the denormalized tailor rating.
+
+``TailorProfile`` keeps a running ``rating_sum`` and ``total_reviews``; every
+review write applies its delta in a single UPDATE built from F-expressions, so
+the average never has to be recomputed from the reviews table.
+"""
+from decimal import Decimal
+
+from django.db.models import Case, DecimalField, F, Q, Value, When
+from django.db.models.functions import Cast, Now
+from tailors.cache import invalidate_tailor
+from tailors.models import TailorProfile
+
+
+def rating_expression(rating_sum, review_count, empty_when):
+    """Average rating expression; ``empty_when`` selects rows with no reviews."""
+    return Case(
+        When(empty_when, then=Value(Decimal('0.00'))),
+        default=Cast(
+            Cast(rating_sum, DecimalField(max_digits=12, decimal_places=4)) / review_count,
+            DecimalField(max_digits=3, decimal_places=2),
+        ),
+        output_field=DecimalField(max_digits=3, decimal_places=2),
+    )
+
+
+def apply_rating_change(tailor_id, sum_delta, count_delta):
+    """Atomically add ``sum_delta``/``count_delta`` to a tailor's rating totals."""
+    new_sum = F('rating_sum') + sum_delta
+    new_count = F('total_reviews') + count_delta
+    updated = TailorProfile.objects.filter(user_id=tailor_id).update(
+        rating_sum=new_sum,
+        total_reviews=new_count,
+        rating=rating_expression(new_sum, new_count, Q(total_reviews__lte=-count_delta)),
+        updated_at=Now(),
+    )
+    if updated:
+        invalidate_tailor(tailor_id)
+    return updated
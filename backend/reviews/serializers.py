@@ -0,0 +1,49 @@
+from rest_framework import serializers
+from orders.models import Order
+from .models import Review
+
+
+class ReviewSerializer(serializers.ModelSerializer):
+    """Serializer for reviews."""
+    customer_name = serializers.CharField(
+        source='customer.full_name',
+        read_only=True
+    )
+
+    class Meta:
+        model = Review
+        fields = (
+            'id', 'order', 'order_number', 'customer', 'customer_name',
+            'tailor', 'rating', 'comment', 'created_at', 'updated_at'
+        )
+        read_only_fields = ('id', 'order', 'customer', 'tailor', 'created_at', 'updated_at')
+
+
+class ReviewCreateSerializer(serializers.ModelSerializer):
+    """Serializer for reviewing a completed order."""
+    order_id = serializers.IntegerField()
+
+    class Meta:
+        model = Review
+        fields = ('order_id', 'rating', 'comment')
+
+    def validate_order_id(self, value):
+        """Validate that the order belongs to the customer and can be reviewed."""
+        request = self.context['request']
+        try:
+            order = Order.objects.get(id=value, customer=request.user)
+        except Order.DoesNotExist:
+            raise serializers.ValidationError("Invalid order ID.")
+        if order.status != 'COMPLETED':
+            raise serializers.ValidationError("Only completed orders can be reviewed.")
+        if Review.objects.filter(order=order).exists():
+            raise serializers.ValidationError("This order has already been reviewed.")
+        self.context['order'] = order
+        return value
+
+    def create(self, validated_data):
+        validated_data.pop('order_id')
+        return Review.objects.create(order=self.context['order'], **validated_data)
+
+    def to_representation(self, instance):
+        return ReviewSerializer(instance, context=self.context).data
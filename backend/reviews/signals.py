@@ -0,0 +1,14 @@
+from django.db.models.signals import post_delete
+from django.dispatch import receiver
+from .models import Review
+from .ratings import apply_rating_change
+
+
+@receiver(post_delete, sender=Review)
+def remove_review_rating(sender, instance, **kwargs):
+    """
+    Remove a deleted review's rating from the tailor's profile. Covers
+    queryset, admin bulk and cascade deletes as well as ``Review.delete``.
+    """
+    rating = getattr(instance, '_stored_rating', None) or instance.rating
+    apply_rating_change(instance.tailor_id, -rating, -1)
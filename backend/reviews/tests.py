@@ -0,0 +1,106 @@
+from decimal import Decimal
+
+from django.test import TestCase
+from django.urls import reverse
+from rest_framework.test import APIClient
+from core.testing import requires_postgresql
+from orders.models import Order
+from tailors.models import TailorProfile
+from users.models import User
+from .models import Review
+
+
+def make_user(email, user_type):
+    return User.objects.create_user(
+        email=email, password='pass12345!', full_name=email.split('@')[0], user_type=user_type
+    )
+
+
+@requires_postgresql
+class RatingAggregationTests(TestCase):
+    """The tailor's rating totals follow every review write and delete."""
+
+    def setUp(self):
+        self.tailor = make_user('tailor@example.com', 'TAILOR')
+        self.profile = TailorProfile.objects.create(
+            user=self.tailor,
+            shop_name='Stitch',
+            shop_address='1 Main St',
+            specialization='FORMAL',
+            availability_status='AVAILABLE',
+        )
+
+    def review(self, rating, email='customer@example.com'):
+        customer = User.objects.filter(email=email).first() or make_user(email, 'CUSTOMER')
+        order = Order.objects.create(
+            customer=customer, tailor=self.tailor, order_type='SHIRT',
+            total_price='40.00', status='COMPLETED',
+        )
+        return Review.objects.create(order=order, rating=rating)
+
+    def assertTotals(self, rating, rating_sum, total_reviews):
+        self.profile.refresh_from_db()
+        self.assertEqual(
+            (self.profile.rating, self.profile.rating_sum, self.profile.total_reviews),
+            (Decimal(rating), rating_sum, total_reviews),
+        )
+
+    def test_new_and_edited_reviews_apply_their_delta(self):
+        first = self.review(5)
+        self.review(3, email='other@example.com')
+        self.assertTotals('4.00', 8, 2)
+
+        first.rating = 3
+        first.save()
+        first.save()
+
+        self.assertTotals('3.00', 6, 2)
+
+    def test_review_edited_through_the_api(self):
+        review = self.review(5)
+        client = APIClient()
+        client.force_authenticate(review.customer)
+
+        response = client.patch(
+            reverse('reviews:review-detail', kwargs={'id': review.pk}), {'rating': 3}, format='json'
+        )
+
+        self.assertEqual(response.status_code, 200)
+        self.assertTotals('3.00', 3, 1)
+
+    def test_instance_delete_removes_the_rating(self):
+        review = self.review(5)
+        self.review(3, email='other@example.com')
+
+        review.delete()
+
+        self.assertTotals('3.00', 3, 1)
+
+    def test_queryset_delete_removes_every_rating(self):
+        self.review(5)
+        self.review(3, email='other@example.com')
+        self.review(4, email='third@example.com')
+
+        Review.objects.filter(rating__gte=4).delete()
+
+        self.assertTotals('3.00', 3, 1)
+
+    def test_cascade_delete_of_the_customer_removes_their_reviews(self):
+        self.review(5)
+        self.review(3, email='other@example.com')
+
+        User.objects.get(email='customer@example.com').delete()
+
+        self.assertTotals('3.00', 3, 1)
+        Review.objects.all().delete()
+        self.assertTotals('0.00', 0, 0)
+
+    def test_only_completed_orders_can_be_reviewed(self):
+        customer = make_user('customer@example.com', 'CUSTOMER')
+        order = Order.objects.create(
+            customer=customer, tailor=self.tailor, order_type='SHIRT', total_price='40.00'
+        )
+
+        with self.assertRaises(ValueError):
+            Review.objects.create(order=order, rating=5)
+        self.assertTotals('0.00', 0, 0)
@@ -0,0 +1,9 @@
+from django.urls import path
+from .views import ReviewListView, ReviewDetailView
+
+app_name = 'reviews'
+
+urlpatterns = [
+    path('', ReviewListView.as_view(), name='review-list'),
+    path('<int:id>/', ReviewDetailView.as_view(), name='review-detail'),
+]
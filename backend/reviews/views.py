@@ -0,0 +1,61 @@
+from rest_framework import generics
+from rest_framework.permissions import AllowAny, IsAuthenticated
+from rest_framework.exceptions import PermissionDenied
+from core.idempotency import IdempotencyMixin
+from core.pagination import KeysetPagination
+from .models import Review
+from .serializers import ReviewSerializer, ReviewCreateSerializer
+
+
+class ReviewListView(IdempotencyMixin, generics.ListCreateAPIView):
+    """List reviews (optionally for one tailor) or review a completed order."""
+
+    pagination_class = KeysetPagination
+
+    def get_permissions(self):
+        if self.request.method == 'POST':
+            return [IsAuthenticated()]
+        return [AllowAny()]
+
+    def get_serializer_class(self):
+        """Use different serializer for creation."""
+        if self.request.method == 'POST':
+            return ReviewCreateSerializer
+        return ReviewSerializer
+
+    def get_queryset(self):
+        """Return reviews, filtered by ``?tailor=<user id>`` when given."""
+        queryset = Review.objects.select_related('customer')
+        tailor = self.request.query_params.get('tailor', None)
+        if tailor:
+            try:
+                queryset = queryset.filter(tailor_id=int(tailor))
+            except ValueError:
+                pass
+        return queryset
+
+    def perform_create(self, serializer):
+        """Ensure only customers can write reviews."""
+        if self.request.user.user_type != 'CUSTOMER':
+            raise PermissionDenied("Only customers can write reviews.")
+        serializer.save()
+
+
+class ReviewDetailView(IdempotencyMixin, generics.RetrieveUpdateDestroyAPIView):
+    """Get a review; its author can edit or delete it."""
+
+    serializer_class = ReviewSerializer
+    lookup_field = 'id'
+    queryset = Review.objects.select_related('customer')
+
+    def get_permissions(self):
+        if self.request.method in ('GET', 'HEAD', 'OPTIONS'):
+            return [AllowAny()]
+        return [IsAuthenticated()]
+
+    def get_object(self):
+        """Ensure only the author can modify a review."""
+        obj = super().get_object()
+        if self.request.method not in ('GET', 'HEAD', 'OPTIONS') and obj.customer != self.request.user:
+            raise PermissionDenied("You do not have permission to modify this review.")
+        return obj
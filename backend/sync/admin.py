@@ -0,0 +1,16 @@
+from django.contrib import admin
+from .models import Tombstone
+
+
+@admin.register(Tombstone)
+class TombstoneAdmin(admin.ModelAdmin):
+    """Read-only admin for sync tombstones."""
+    
+    list_display = ('object_type', 'object_id', 'customer', 'tailor', 'deleted_at')
+    list_filter = ('object_type',)
+    
+    def has_add_permission(self, request):
+        return False
+    
+    def has_change_permission(self, request, obj=None):
+        return False
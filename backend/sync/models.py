@@ -0,0 +1,46 @@
+from django.db import models
+from django.utils import timezone
+from users.models import User
+
+
+class Tombstone(models.Model):
+    """Record of a deleted object, reported to delta-sync clients."""
+    
+    OBJECT_TYPE_CHOICES = [
+        ('orders', 'Order'),
+        ('order_items', 'Order Item'),
+        ('measurements', 'Customer Measurement'),
+    ]
+    
+    object_type = models.CharField(max_length=20, choices=OBJECT_TYPE_CHOICES)
+    object_id = models.PositiveBigIntegerField()
+    # No database constraints: tombstones outlive the users they belong to.
+    customer = models.ForeignKey(
+        User,
+        on_delete=models.DO_NOTHING,
+        db_constraint=False,
+        db_index=False,
+        related_name='+'
+    )
+    tailor = models.ForeignKey(
+        User,
+        on_delete=models.DO_NOTHING,
+        db_constraint=False,
+        db_index=False,
+        null=True,
+        blank=True,
+        related_name='+'
+    )
+    deleted_at = models.DateTimeField(default=timezone.now)
+    
+    class Meta:
+        verbose_name = 'Tombstone'
+        verbose_name_plural = 'Tombstones'
+        indexes = [
+            models.Index(fields=['customer', 'deleted_at'], name='tombstone_customer_idx'),
+            models.Index(fields=['tailor', 'deleted_at'], name='tombstone_tailor_idx'),
+            models.Index(fields=['deleted_at'], name='tombstone_deleted_idx'),
+        ]
+    
+    def __str__(self):
+        return f"{self.object_type} #{self.object_id}"
@@ -0,0 +1,9 @@
+from orders.serializers import OrderItemSerializer
+
+
+class OrderItemSyncSerializer(OrderItemSerializer):
+    """Order item with the order it belongs to, for flat sync payloads."""
+
+    class Meta(OrderItemSerializer.Meta):
+        fields = ('order', *OrderItemSerializer.Meta.fields)
+        read_only_fields = fields
@@ -0,0 +1,60 @@
+from django.db.models.functions import Now
+from django.db.models.signals import post_delete, post_save, pre_delete
+from django.dispatch import receiver
+from measurements.models import CustomerMeasurement
+from orders.archive import is_archiving
+from orders.models import Order, OrderItem
+from .models import Tombstone
+
+
+def _deleting_order(origin):
+    """Whether a delete signal is part of deleting the item's order."""
+    return isinstance(origin, Order) or getattr(origin, 'model', None) is Order
+
+
+@receiver(post_delete, sender=Order)
+def record_order_deletion(sender, instance, **kwargs):
+    """Leave a tombstone for the order's customer and tailor, unless archived."""
+    if is_archiving():
+        return
+    Tombstone.objects.create(
+        object_type='orders',
+        object_id=instance.pk,
+        customer_id=instance.customer_id,
+        tailor_id=instance.tailor_id,
+    )
+
+
+@receiver(post_delete, sender=OrderItem)
+def record_order_item_deletion(sender, instance, origin=None, **kwargs):
+    """Leave a tombstone for the item; clients drop the items of deleted orders."""
+    if is_archiving() or _deleting_order(origin):
+        return
+    parties = Order.objects.filter(pk=instance.order_id).values('customer_id', 'tailor_id').first()
+    if parties:
+        Tombstone.objects.create(object_type='order_items', object_id=instance.pk, **parties)
+
+
+@receiver(post_save, sender=OrderItem)
+@receiver(post_delete, sender=OrderItem)
+def touch_order(sender, instance, origin=None, **kwargs):
+    """Item changes mark their order as changed, which sync finds through its index."""
+    if is_archiving() or _deleting_order(origin):
+        return
+    Order.objects.filter(pk=instance.order_id).update(updated_at=Now())
+
+
+@receiver(pre_delete, sender=CustomerMeasurement)
+def touch_measurement_orders(sender, instance, **kwargs):
+    """Orders referencing a deleted measurement change when it is unset."""
+    Order.objects.filter(customer_measurement=instance).update(updated_at=Now())
+
+
+@receiver(post_delete, sender=CustomerMeasurement)
+def record_measurement_deletion(sender, instance, **kwargs):
+    """Leave a tombstone for the measurement's customer."""
+    Tombstone.objects.create(
+        object_type='measurements',
+        object_id=instance.pk,
+        customer_id=instance.customer_id,
+    )
@@ -0,0 +1,151 @@
+from datetime import timedelta
+
+from django.conf import settings
+from django.test import TestCase
+from django.urls import reverse
+from django.utils import timezone
+from rest_framework.test import APIClient
+from core.testing import requires_postgresql
+from measurements.models import CustomerMeasurement, MeasurementTemplate
+from orders.models import Order, OrderItem
+from tailors.models import TailorProfile
+from users.models import User
+from .tokens import issue_token
+
+
+def make_user(email, user_type):
+    return User.objects.create_user(
+        email=email, password='pass12345!', full_name=email.split('@')[0], user_type=user_type
+    )
+
+
+@requires_postgresql
+class SyncTests(TestCase):
+    """Full and delta syncs for customers and tailors."""
+
+    def setUp(self):
+        self.tailor = make_user('tailor@example.com', 'TAILOR')
+        self.customer = make_user('customer@example.com', 'CUSTOMER')
+        TailorProfile.objects.create(
+            user=self.tailor,
+            shop_name='Stitch',
+            shop_address='1 Main St',
+            specialization='FORMAL',
+            availability_status='AVAILABLE',
+        )
+        template = MeasurementTemplate.objects.create(
+            name='Shirt', measurement_type='SHIRT', standard_measurements={'chest': {'unit': 'cm'}}
+        )
+        self.measurement = CustomerMeasurement.objects.create(
+            customer=self.customer, template=template, measurements={'chest': 100}
+        )
+        self.first = self.place_order()
+        self.second = self.place_order()
+        self.item = OrderItem.objects.create(order=self.first, item_name='Shirt', price='40.00')
+
+    def place_order(self):
+        return Order.objects.create(
+            customer=self.customer, tailor=self.tailor, order_type='SHIRT', total_price='40.00'
+        )
+
+    def sync(self, user, token=None):
+        client = APIClient()
+        client.force_authenticate(user)
+        params = {'token': token} if token else {}
+        return client.get(reverse('sync:sync'), params)
+
+    def ids(self, rows):
+        return sorted(row['id'] for row in rows)
+
+    def test_full_sync(self):
+        response = self.sync(self.customer)
+
+        self.assertEqual(response.status_code, 200)
+        self.assertTrue(response.data['full'])
+        self.assertTrue(response.data['token'])
+        self.assertEqual(self.ids(response.data['orders']), [self.first.pk, self.second.pk])
+        self.assertNotIn('items', response.data['orders'][0])
+        self.assertEqual(self.ids(response.data['order_items']), [self.item.pk])
+        self.assertEqual(self.ids(response.data['measurements']), [self.measurement.pk])
+        self.assertEqual(response.data['deleted'], {})
+
+    def test_tailors_sync_their_orders_without_measurements(self):
+        response = self.sync(self.tailor)
+
+        self.assertEqual(self.ids(response.data['orders']), [self.first.pk, self.second.pk])
+        self.assertEqual(response.data['measurements'], [])
+
+    def test_token_returns_only_later_changes(self):
+        token = self.sync(self.customer).data['token']
+
+        response = self.sync(self.customer, token)
+        self.assertFalse(response.data['full'])
+        # Everything was written within the overlap window.
+        self.assertEqual(len(response.data['orders']), 2)
+
+        later = issue_token(self.customer, timezone.now() + timedelta(hours=1))
+        response = self.sync(self.customer, later)
+        self.assertEqual(response.data['orders'], [])
+        self.assertEqual(response.data['order_items'], [])
+        self.assertEqual(response.data['measurements'], [])
+
+        Order.objects.filter(pk=self.second.pk).update(updated_at=timezone.now() + timedelta(hours=2))
+        response = self.sync(self.customer, later)
+        self.assertEqual(self.ids(response.data['orders']), [self.second.pk])
+
+    def test_changes_shortly_before_the_token_are_returned_again(self):
+        at = timezone.now() + timedelta(hours=1)
+        token = issue_token(self.customer, at)
+        overlap = timedelta(seconds=settings.SYNC_OVERLAP_SECONDS)
+        Order.objects.filter(pk=self.first.pk).update(updated_at=at - overlap / 2)
+        Order.objects.filter(pk=self.second.pk).update(updated_at=at - overlap * 2)
+
+        response = self.sync(self.customer, token)
+
+        self.assertEqual(self.ids(response.data['orders']), [self.first.pk])
+
+    def test_deletions_are_reported(self):
+        token = self.sync(self.customer).data['token']
+        other_item = OrderItem.objects.create(order=self.second, item_name='Cuffs', price='5.00')
+        order_id, other_item_id, measurement_id = self.first.pk, other_item.pk, self.measurement.pk
+        self.first.delete()
+        other_item.delete()
+        self.measurement.delete()
+
+        response = self.sync(self.customer, token)
+
+        # The items of the deleted order are dropped along with it.
+        self.assertEqual(response.data['deleted'], {
+            'orders': [order_id],
+            'order_items': [other_item_id],
+            'measurements': [measurement_id],
+        })
+        response = self.sync(self.tailor, issue_token(self.tailor, timezone.now()))
+        self.assertEqual(response.data['deleted'], {
+            'orders': [order_id],
+            'order_items': [other_item_id],
+        })
+
+    def test_old_tokens_trigger_a_full_sync(self):
+        age = timedelta(days=settings.SYNC_TOMBSTONE_RETENTION_DAYS + 1)
+        token = issue_token(self.customer, timezone.now() - age)
+        self.first.delete()
+
+        response = self.sync(self.customer, token)
+
+        self.assertTrue(response.data['full'])
+        self.assertEqual(self.ids(response.data['orders']), [self.second.pk])
+        self.assertEqual(response.data['deleted'], {})
+
+    def test_invalid_tokens_are_rejected(self):
+        other = make_user('other@example.com', 'CUSTOMER')
+
+        for token in ('garbage', issue_token(other, timezone.now())):
+            response = self.sync(self.customer, token)
+            self.assertEqual(response.status_code, 400)
+            self.assertEqual(response.data, {'token': "Invalid sync token."})
+
+    def test_admins_cannot_sync(self):
+        admin = make_user('admin@example.com', 'ADMIN')
+
+        self.assertEqual(self.sync(admin).status_code, 403)
@@ -0,0 +1,30 @@
+"""
+Server-issued sync tokens.
+
+A token is the signed time a sync started, bound to the user it was issued
+to. Clients treat it as opaque and send it back on their next sync.
+"""
+from datetime import datetime, timezone
+
+from django.core import signing
+
+SALT = 'sync.token'
+
+
+class InvalidSyncToken(Exception):
+    """The token was tampered with or issued to another user."""
+
+
+def issue_token(user, at):
+    return signing.dumps({'u': user.pk, 't': at.timestamp()}, salt=SALT)
+
+
+def read_token(token, user):
+    """Return the time encoded in ``token``; raise :class:`InvalidSyncToken`."""
+    try:
+        payload = signing.loads(token, salt=SALT)
+    except signing.BadSignature:
+        raise InvalidSyncToken
+    if payload.get('u') != user.pk or not isinstance(payload.get('t'), (int, float)):
+        raise InvalidSyncToken
+    return datetime.fromtimestamp(payload['t'], tz=timezone.utc)
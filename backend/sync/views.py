@@ -0,0 +1,108 @@
+from collections import defaultdict
+from datetime import timedelta
+
+from django.conf import settings
+from django.utils import timezone
+from rest_framework.exceptions import PermissionDenied, ValidationError
+from rest_framework.permissions import IsAuthenticated
+from rest_framework.response import Response
+from rest_framework.views import APIView
+from measurements.models import CustomerMeasurement
+from measurements.serializers import CustomerMeasurementSerializer
+from orders.models import Order, OrderItem
+from orders.serializers import OrderSerializer
+from .models import Tombstone
+from .serializers import OrderItemSyncSerializer
+from .tokens import InvalidSyncToken, issue_token, read_token
+
+# Orders are synced without their items, which are returned separately.
+ORDER_FIELDS = {name: {} for name in OrderSerializer.Meta.fields if name != 'items'}
+ORDER_EXPAND = {'customer': {}, 'tailor': {}, 'customer_measurement': {}}
+
+
+class SyncView(APIView):
+    """
+    Delta sync for offline-first clients (customers and tailors).
+
+    Without ``?token=`` every order, order item and (for customers)
+    measurement is returned and ``full`` is true. With the ``token`` of the
+    previous response only rows created or updated since then are returned,
+    plus the IDs of deleted rows in ``deleted``. Changes are looked up
+    through the ``(customer, updated_at)`` and ``(tailor, updated_at)``
+    indexes, so a sync without changes is a few index probes.
+
+    Rows changed shortly before the token was issued may be returned again
+    (``SYNC_OVERLAP_SECONDS``) so that changes committed late are not
+    missed; clients apply them idempotently. Tokens older than
+    ``SYNC_TOMBSTONE_RETENTION_DAYS`` trigger a full sync.
+
+    Only active orders are synced. Archiving an order (see ``orders.archive``)
+    leaves no tombstone, so clients keep the copy they have, but a full sync
+    no longer returns it; archived orders are listed by
+    ``/api/orders/?archived=true``.
+    """
+
+    permission_classes = (IsAuthenticated,)
+
+    def get(self, request, *args, **kwargs):
+        user = request.user
+        if user.user_type == 'CUSTOMER':
+            party = 'customer'
+        elif user.user_type == 'TAILOR':
+            party = 'tailor'
+        else:
+            raise PermissionDenied("Sync is available to customers and tailors only.")
+
+        now = timezone.now()
+        since = None
+        token = request.query_params.get('token')
+        if token:
+            try:
+                since = read_token(token, user)
+            except InvalidSyncToken:
+                raise ValidationError({'token': "Invalid sync token."})
+            if since < now - timedelta(days=settings.SYNC_TOMBSTONE_RETENTION_DAYS):
+                # Deletions this old may have been pruned.
+                since = None
+        cutoff = since - timedelta(seconds=settings.SYNC_OVERLAP_SECONDS) if since else None
+
+        def changed(queryset, field='updated_at'):
+            if cutoff is None:
+                return queryset
+            return queryset.filter(**{f'{field}__gte': cutoff})
+
+        context = {'request': request}
+        orders = OrderSerializer.expand_queryset(
+            changed(Order.objects.filter(**{party: user})),
+            request,
+            options=(ORDER_FIELDS, ORDER_EXPAND),
+        ).order_by('updated_at', 'id')
+        orders = list(orders)
+        items = []
+        if orders:
+            items = changed(OrderItem.objects.filter(order__in=orders)).order_by('updated_at', 'id')
+
+        measurements = []
+        if party == 'customer':
+            measurements = changed(
+                CustomerMeasurement.objects.filter(customer=user).select_related('customer')
+            ).order_by('updated_at', 'id')
+
+        deleted = defaultdict(list)
+        if since:
+            tombstones = changed(Tombstone.objects.filter(**{party: user}), 'deleted_at')
+            for object_type, object_id in tombstones.values_list('object_type', 'object_id'):
+                deleted[object_type].append(object_id)
+
+        return Response({
+            'token': issue_token(user, now),
+            'full': since is None,
+            'orders': OrderSerializer(
+                orders, many=True, context=context, fields=ORDER_FIELDS, expand=ORDER_EXPAND
+            ).data,
+            'order_items': OrderItemSyncSerializer(items, many=True, context=context).data,
+            'measurements': CustomerMeasurementSerializer(
+                measurements, many=True, context=context, fields=None, expand={}
+            ).data,
+            'deleted': deleted,
+        })
@@ -9,7 +9,10 @@ class TailorProfileAdmin(admin.ModelAdmin):
     list_display = ('user', 'shop_name', 'specialization', 'availability_status', 'rating', 'total_reviews', 'created_at')
     list_filter = ('specialization', 'availability_status')
     search_fields = ('shop_name', 'user__email', 'user__full_name')
-    readonly_fields = ('created_at', 'updated_at')
+    readonly_fields = (
+        'rating_sum', 'open_orders', 'pending_orders', 'confirmed_orders',
+        'in_progress_orders', 'ready_orders', 'created_at', 'updated_at'
+    )
     
     fieldsets = (
         ('User Information', {
@@ -19,10 +22,14 @@ class TailorProfileAdmin(admin.ModelAdmin):
             'fields': ('shop_name', 'shop_address', 'specialization', 'bio')
         }),
         ('Experience & Ratings', {
-            'fields': ('experience_years', 'rating', 'total_reviews')
+            'fields': ('experience_years', 'rating', 'total_reviews', 'rating_sum')
         }),
         ('Availability', {
-            'fields': ('availability_status',)
+            'fields': (
+                'availability_status', 'max_open_orders', 'open_orders',
+                'pending_orders', 'confirmed_orders', 'in_progress_orders',
+                'ready_orders'
+            )
         }),
         ('Location', {
             'fields': ('latitude', 'longitude')
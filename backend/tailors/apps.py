@@ -3,3 +3,6 @@ from django.apps import AppConfig
 
 class TailorsConfig(AppConfig):
     name = 'tailors'
+
+    def ready(self):
+        from . import signals  # noqa: F401
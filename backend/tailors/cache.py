@@ -0,0 +1,148 @@
+"""
+Response cache for the public tailor directory.
+
+Cached entries are keyed on a directory-wide generation number. Saving or
+deleting a tailor profile (or its owner) bumps the generation, which makes
+every previously cached response unreachable without having to find and
+delete individual keys.
+
+Workload counters and ratings change with every order and review, so those
+updates only stamp the affected tailor with the time of the change instead
+(see ``touch_tailor``). A cached response remembers the stamps of the
+tailors it contains and is recomputed once any of them moves. Responses
+that do not contain the tailor, such as a list filtered by ``max_load``
+the tailor now qualifies for, catch up when they expire.
+"""
+import hashlib
+import json
+import time
+
+from django.conf import settings
+from django.core.cache import cache
+from django.core.serializers.json import DjangoJSONEncoder
+from django.db import transaction
+from django.utils.http import parse_etags, quote_etag
+from rest_framework import status
+from rest_framework.response import Response
+
+GENERATION_KEY = 'tailors:directory:generation'
+TAILOR_KEY = 'tailors:directory:tailor:{}'
+# Stamps this close to the start of a response may come from another
+# server's clock; such responses are not cached.
+CLOCK_SKEW_SECONDS = 1.0
+
+
+def get_generation():
+    """Return the current directory generation, initialising it if needed."""
+    generation = cache.get(GENERATION_KEY)
+    if generation is None:
+        # Seed from the clock so a lost counter never reuses old keys.
+        cache.add(GENERATION_KEY, time.time_ns(), timeout=None)
+        generation = cache.get(GENERATION_KEY)
+    return generation
+
+
+def bump_generation():
+    """Invalidate every cached directory response."""
+    try:
+        cache.incr(GENERATION_KEY)
+    except ValueError:
+        cache.add(GENERATION_KEY, time.time_ns(), timeout=None)
+
+
+def invalidate_directory():
+    """Bump the generation once the current transaction commits."""
+    transaction.on_commit(bump_generation)
+
+
+def touch_tailor(tailor_id):
+    """Invalidate the cached responses that contain one tailor."""
+    cache.set(TAILOR_KEY.format(tailor_id), time.time(), timeout=None)
+
+
+def invalidate_tailor(tailor_id):
+    """Touch the tailor once the current transaction commits."""
+    transaction.on_commit(lambda: touch_tailor(tailor_id))
+
+
+def tailor_stamps(tailor_ids):
+    """Map tailor (user) ids to the time they were last touched, or None."""
+    keys = {TAILOR_KEY.format(pk): pk for pk in tailor_ids}
+    found = cache.get_many(list(keys))
+    return {pk: found.get(key) for key, pk in keys.items()}
+
+
+def compute_etag(data):
+    """Return a strong ETag for serialized response data."""
+    payload = json.dumps(data, cls=DjangoJSONEncoder, sort_keys=True, separators=(',', ':'))
+    return quote_etag(hashlib.sha1(payload.encode('utf-8')).hexdigest())
+
+
+class DirectoryCacheMixin:
+    """
+    Serve GET requests from the directory cache with ETag revalidation.
+
+    The cache key covers the view, its URL kwargs and the normalized query
+    string, so parameter order does not fragment the cache. Requests whose
+    ``If-None-Match`` matches the cached ETag get a bare 304 without touching
+    the database or the serializers. Each entry is also checked against the
+    stamps of the tailors it was serialized from.
+    """
+
+    cache_timeout = None
+
+    def get_cache_timeout(self):
+        if self.cache_timeout is not None:
+            return self.cache_timeout
+        return settings.TAILOR_DIRECTORY_CACHE_TIMEOUT
+
+    def get_cache_key(self, request):
+        params = sorted(
+            (key, value)
+            for key, values in request.query_params.lists()
+            for value in values
+        )
+        raw = json.dumps([
+            request.get_host(),
+            type(self).__name__,
+            sorted(self.kwargs.items()),
+            params,
+            request.accepted_renderer.format,
+        ])
+        digest = hashlib.sha1(raw.encode('utf-8')).hexdigest()
+        return f'tailors:directory:{get_generation()}:{digest}'
+
+    def get_serializer(self, *args, **kwargs):
+        serializer = super().get_serializer(*args, **kwargs)
+        instance = args[0] if args else kwargs.get('instance')
+        objects = instance if kwargs.get('many') else [instance]
+        self.cached_tailors = [obj.user_id for obj in objects if hasattr(obj, 'user_id')]
+        return serializer
+
+    def get(self, request, *args, **kwargs):
+        key = self.get_cache_key(request)
+        cached = cache.get(key)
+        if cached is not None:
+            etag, data, stamps = cached
+            if stamps and tailor_stamps(stamps) != stamps:
+                cached = None
+        if cached is None:
+            started = time.time()
+            self.cached_tailors = []
+            response = super().get(request, *args, **kwargs)
+            if response.status_code != status.HTTP_200_OK:
+                return response
+            etag = compute_etag(response.data)
+            # Read after serializing: a tailor touched since ``started`` may
+            # have been read before its change committed.
+            stamps = tailor_stamps(self.cached_tailors)
+            if all(stamp is None or stamp < started - CLOCK_SKEW_SECONDS for stamp in stamps.values()):
+                cache.set(key, (etag, response.data, stamps), timeout=self.get_cache_timeout())
+        else:
+            response = Response(data)
+
+        if etag in parse_etags(request.headers.get('If-None-Match', '')):
+            response = Response(status=status.HTTP_304_NOT_MODIFIED)
+        response['ETag'] = etag
+        response['Cache-Control'] = 'no-cache'
+        return response
@@ -0,0 +1,127 @@
+from django.conf import settings
+from django.contrib.postgres.search import SearchQuery, SearchRank, TrigramWordSimilarity
+from django.db.models import F, FloatField, Q, Value
+from django.db.models.functions import ASin, Cast, Cos, Least, Power, Radians, Sin, Sqrt
+from rest_framework import filters
+from rest_framework.exceptions import ValidationError
+from .geo import EARTH_RADIUS_KM, bounding_box, covering_cells
+
+
+def haversine_expression(latitude, longitude):
+    """Build a database expression for the distance (km) to a coordinate."""
+    lat = Radians(Cast(F('latitude'), FloatField()))
+    lon = Radians(Cast(F('longitude'), FloatField()))
+    origin_lat = Radians(Value(float(latitude)))
+    origin_lon = Radians(Value(float(longitude)))
+
+    a = (
+        Power(Sin((lat - origin_lat) / 2), 2)
+        + Cos(origin_lat) * Cos(lat) * Power(Sin((lon - origin_lon) / 2), 2)
+    )
+    return Value(2 * EARTH_RADIUS_KM) * ASin(Least(Sqrt(a), Value(1.0)))
+
+
+class NearbyFilter(filters.BaseFilterBackend):
+    """
+    Restrict tailors to those within ``radius_km`` of ``?near=lat,lon``.
+
+    Candidates are prefiltered with an indexed geohash prefix match and a
+    bounding box, then annotated with ``distance_km`` for exact ranking.
+    """
+
+    near_param = 'near'
+    radius_param = 'radius_km'
+
+    def get_origin(self, request):
+        near = request.query_params.get(self.near_param)
+        if not near:
+            return None
+        try:
+            latitude, longitude = (float(part) for part in near.split(','))
+        except ValueError:
+            raise ValidationError({self.near_param: "Expected 'latitude,longitude'."})
+        if not (-90 <= latitude <= 90 and -180 <= longitude <= 180):
+            raise ValidationError({self.near_param: "Coordinates are out of range."})
+        return latitude, longitude
+
+    def get_radius(self, request):
+        radius = request.query_params.get(self.radius_param)
+        if radius is None:
+            return settings.TAILOR_NEARBY_DEFAULT_RADIUS_KM
+        try:
+            radius = float(radius)
+        except ValueError:
+            raise ValidationError({self.radius_param: "Must be a number."})
+        if radius <= 0:
+            raise ValidationError({self.radius_param: "Must be greater than zero."})
+        return min(radius, settings.TAILOR_NEARBY_MAX_RADIUS_KM)
+
+    def filter_queryset(self, request, queryset, view):
+        origin = self.get_origin(request)
+        if origin is None:
+            return queryset
+
+        latitude, longitude = origin
+        radius = self.get_radius(request)
+        min_lat, max_lat, min_lon, max_lon = bbox = bounding_box(latitude, longitude, radius)
+
+        queryset = queryset.filter(
+            latitude__gte=min_lat,
+            latitude__lte=max_lat,
+            longitude__gte=min_lon,
+            longitude__lte=max_lon,
+        )
+        cells = covering_cells(bbox)
+        if cells:
+            cell_filter = Q()
+            for cell in cells:
+                cell_filter |= Q(geohash__startswith=cell)
+            queryset = queryset.filter(cell_filter)
+
+        return queryset.annotate(
+            distance_km=haversine_expression(latitude, longitude)
+        ).filter(distance_km__lte=radius)
+
+
+class TailorSearchFilter(filters.SearchFilter):
+    """
+    Relevance-ranked search over the maintained tailor search columns.
+
+    Matches the full-text ``search_vector`` (shop name, owner name,
+    specialization and bio) or, for typo tolerance, a trigram word match on
+    ``search_document``. Both predicates are served by GIN indexes on the
+    profile table, so no join is needed to filter. Matches are annotated with
+    ``search_rank``.
+    """
+
+    def filter_queryset(self, request, queryset, view):
+        terms = ' '.join(self.get_search_terms(request))
+        if not terms:
+            return queryset
+
+        query = SearchQuery(terms, search_type='websearch', config=settings.TAILOR_SEARCH_CONFIG)
+        return queryset.filter(
+            Q(search_vector=query) | Q(search_document__trigram_word_similar=terms)
+        ).annotate(
+            search_rank=(
+                SearchRank(F('search_vector'), query)
+                + TrigramWordSimilarity(terms, 'search_document')
+            )
+        )
+
+
+class TailorOrderingFilter(filters.OrderingFilter):
+    """
+    Ordering filter with context-aware defaults.
+
+    Without an explicit ``?ordering=``, ``?near=`` searches are returned
+    nearest-first and ``?search=`` queries most relevant first.
+    """
+
+    def get_default_ordering(self, view):
+        params = view.request.query_params
+        if params.get(NearbyFilter.near_param):
+            return ['distance_km', 'id']
+        if params.get(TailorSearchFilter.search_param):
+            return ['-search_rank', '-rating', 'id']
+        return super().get_default_ordering(view)
@@ -0,0 +1,121 @@
+"""Geospatial helpers for the tailor directory.
+
+Tailor locations are indexed with a geohash column so a radius search can
+first narrow the table down to a handful of grid cells (an indexed prefix
+match) before ranking the survivors by exact haversine distance.
+"""
+import math
+
+EARTH_RADIUS_KM = 6371.0088
+
+# Precision stored on TailorProfile.geohash (~4.8m x 4.8m cells).
+GEOHASH_PRECISION = 9
+
+# Upper bound on the number of cells used to cover a search area.
+MAX_COVERING_CELLS = 16
+
+_BASE32 = '0123456789bcdefghjkmnpqrstuvwxyz'
+
+
+def encode_geohash(latitude, longitude, precision=GEOHASH_PRECISION):
+    """Encode a coordinate pair as a geohash string of the given precision."""
+    lat_range = [-90.0, 90.0]
+    lon_range = [-180.0, 180.0]
+    latitude = float(latitude)
+    longitude = float(longitude)
+
+    chars = []
+    bits = 0
+    bit_count = 0
+    even = True
+    while len(chars) < precision:
+        if even:
+            mid = (lon_range[0] + lon_range[1]) / 2
+            if longitude >= mid:
+                bits = (bits << 1) | 1
+                lon_range[0] = mid
+            else:
+                bits <<= 1
+                lon_range[1] = mid
+        else:
+            mid = (lat_range[0] + lat_range[1]) / 2
+            if latitude >= mid:
+                bits = (bits << 1) | 1
+                lat_range[0] = mid
+            else:
+                bits <<= 1
+                lat_range[1] = mid
+        even = not even
+        bit_count += 1
+        if bit_count == 5:
+            chars.append(_BASE32[bits])
+            bits = 0
+            bit_count = 0
+    return ''.join(chars)
+
+
+def cell_size(precision):
+    """Return the (latitude, longitude) size in degrees of a geohash cell."""
+    total_bits = precision * 5
+    lon_bits = (total_bits + 1) // 2
+    lat_bits = total_bits // 2
+    return 180.0 / (2 ** lat_bits), 360.0 / (2 ** lon_bits)
+
+
+def bounding_box(latitude, longitude, radius_km):
+    """Return (min_lat, max_lat, min_lon, max_lon) enclosing a search circle."""
+    latitude = float(latitude)
+    longitude = float(longitude)
+    delta_lat = math.degrees(radius_km / EARTH_RADIUS_KM)
+    min_lat = max(latitude - delta_lat, -90.0)
+    max_lat = min(latitude + delta_lat, 90.0)
+
+    # Near the poles or across the antimeridian fall back to the full
+    # longitude range; the haversine filter still gives exact results.
+    if min_lat <= -90.0 or max_lat >= 90.0:
+        return min_lat, max_lat, -180.0, 180.0
+    delta_lon = math.degrees(
+        radius_km / (EARTH_RADIUS_KM * math.cos(math.radians(latitude)))
+    )
+    min_lon = longitude - delta_lon
+    max_lon = longitude + delta_lon
+    if min_lon < -180.0 or max_lon > 180.0:
+        return min_lat, max_lat, -180.0, 180.0
+    return min_lat, max_lat, min_lon, max_lon
+
+
+def covering_cells(bbox, max_cells=MAX_COVERING_CELLS):
+    """
+    Return the geohash prefixes of every cell intersecting ``bbox``.
+
+    Uses the finest precision whose covering stays within ``max_cells``.
+    Returns an empty list when the box is too large to be worth covering.
+    """
+    min_lat, max_lat, min_lon, max_lon = bbox
+    for precision in range(GEOHASH_PRECISION, 0, -1):
+        lat_step, lon_step = cell_size(precision)
+        rows = math.ceil((max_lat - min_lat) / lat_step) + 1
+        cols = math.ceil((max_lon - min_lon) / lon_step) + 1
+        if rows * cols > max_cells:
+            continue
+
+        # Sample points one cell apart (plus the far edge) so every cell
+        # column and row touched by the box contributes its hash.
+        lats = [min(min_lat + i * lat_step, max_lat) for i in range(rows)] + [max_lat]
+        lons = [min(min_lon + j * lon_step, max_lon) for j in range(cols)] + [max_lon]
+        return sorted({
+            encode_geohash(lat, lon, precision)
+            for lat in lats
+            for lon in lons
+        })
+    return []
+
+
+def haversine_km(lat1, lon1, lat2, lon2):
+    """Great-circle distance in kilometres between two coordinates."""
+    lat1, lon1, lat2, lon2 = map(math.radians, map(float, (lat1, lon1, lat2, lon2)))
+    a = (
+        math.sin((lat2 - lat1) / 2) ** 2
+        + math.cos(lat1) * math.cos(lat2) * math.sin((lon2 - lon1) / 2) ** 2
+    )
+    return 2 * EARTH_RADIUS_KM * math.asin(min(1.0, math.sqrt(a)))
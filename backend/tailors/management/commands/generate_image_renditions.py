@@ -0,0 +1,58 @@
+from django.core.management.base import BaseCommand
+from core import renditions
+from tailors.models import TailorProfile
+from tailors.signals import store_portfolio_renditions
+from users.models import User
+from users.signals import store_profile_picture_renditions
+
+
+class Command(BaseCommand):
+    help = "Generate missing renditions for profile pictures and portfolio images."
+
+    def add_arguments(self, parser):
+        parser.add_argument('--batch-size', type=int, default=100)
+
+    def handle(self, *args, batch_size, **options):
+        pending = []
+        rendered = 0
+
+        def drain():
+            nonlocal rendered
+            for future, store in pending:
+                store(future.result())
+                rendered += 1
+            pending.clear()
+
+        users = User.objects.exclude(profile_picture='').exclude(profile_picture__isnull=True)
+        for user in users.only('id', 'profile_picture', 'profile_picture_renditions').iterator():
+            source_name = user.profile_picture.name
+            if user.profile_picture_renditions.get('source') == source_name:
+                continue
+            future = renditions.submit([source_name])
+            if future is not None:
+                pending.append((
+                    future,
+                    lambda results, user_id=user.id, name=source_name:
+                        store_profile_picture_renditions(user_id, name, results),
+                ))
+            if len(pending) >= batch_size:
+                drain()
+
+        profiles = TailorProfile.objects.exclude(portfolio_images=[])
+        for profile in profiles.only('id', 'portfolio_images', 'portfolio_renditions').iterator():
+            missing = [
+                source for source in profile.portfolio_images
+                if isinstance(source, str) and source not in profile.portfolio_renditions
+            ]
+            future = renditions.submit(missing) if missing else None
+            if future is not None:
+                pending.append((
+                    future,
+                    lambda results, profile_id=profile.id:
+                        store_portfolio_renditions(profile_id, results),
+                ))
+            if len(pending) >= batch_size:
+                drain()
+
+        drain()
+        self.stdout.write(self.style.SUCCESS(f"Generated renditions for {rendered} records."))
@@ -0,0 +1,217 @@
+import csv
+import json
+import os
+import time
+from decimal import Decimal, InvalidOperation
+from itertools import islice
+
+from django.core.exceptions import ValidationError
+from django.core.management.base import BaseCommand, CommandError
+from django.core.validators import validate_email
+from django.db import transaction
+from tailors.cache import invalidate_directory
+from tailors.geo import encode_geohash
+from tailors.models import TailorProfile
+from tailors.search import refresh_search_vectors
+from users.models import User
+from users.passwords import get_executor, hash_passwords
+
+REQUIRED_FIELDS = ('email', 'full_name', 'shop_name', 'shop_address', 'specialization')
+SPECIALIZATIONS = {code for code, _ in TailorProfile.SPECIALIZATION_CHOICES}
+AVAILABILITY = {code for code, _ in TailorProfile.AVAILABILITY_CHOICES}
+
+
+def read_rows(path, fmt):
+    """Yield ``(line_number, row)`` from a CSV or JSONL file without loading it."""
+    with open(path, newline='', encoding='utf-8') as handle:
+        if fmt == 'csv':
+            for number, row in enumerate(csv.DictReader(handle), start=1):
+                yield number, row
+        else:
+            for number, line in enumerate(handle, start=1):
+                if line.strip():
+                    try:
+                        yield number, json.loads(line)
+                    except json.JSONDecodeError as exc:
+                        yield number, {'_error': f"invalid JSON: {exc.msg}"}
+
+
+def clean_row(row):
+    """Return ``(user_fields, profile_fields, password)`` or raise ValidationError."""
+    if '_error' in row:
+        raise ValidationError(row['_error'])
+    row = {key: (value.strip() if isinstance(value, str) else value) for key, value in row.items()}
+    missing = [field for field in REQUIRED_FIELDS if not row.get(field)]
+    if missing:
+        raise ValidationError(f"missing {', '.join(missing)}")
+
+    email = User.objects.normalize_email(row['email'])
+    validate_email(email)
+    specialization = str(row['specialization']).upper()
+    if specialization not in SPECIALIZATIONS:
+        raise ValidationError(f"unknown specialization {row['specialization']!r}")
+    availability = str(row.get('availability_status') or 'AVAILABLE').upper()
+    if availability not in AVAILABILITY:
+        raise ValidationError(f"unknown availability_status {row['availability_status']!r}")
+
+    coordinates = {}
+    for field, limit in (('latitude', 90), ('longitude', 180)):
+        value = row.get(field)
+        if value in (None, ''):
+            coordinates[field] = None
+            continue
+        try:
+            value = Decimal(str(value)).quantize(Decimal('0.000001'))
+        except InvalidOperation:
+            raise ValidationError(f"invalid {field} {row[field]!r}")
+        if abs(value) > limit:
+            raise ValidationError(f"{field} out of range")
+        coordinates[field] = value
+    if (coordinates['latitude'] is None) != (coordinates['longitude'] is None):
+        raise ValidationError("latitude and longitude must be given together")
+
+    numbers = {}
+    for field, default in (('experience_years', 0), ('max_open_orders', 10)):
+        try:
+            numbers[field] = int(row.get(field) or default)
+        except (TypeError, ValueError):
+            raise ValidationError(f"invalid {field} {row[field]!r}")
+        if numbers[field] < 0:
+            raise ValidationError(f"{field} must not be negative")
+
+    portfolio = row.get('portfolio_images') or []
+    if isinstance(portfolio, str):
+        portfolio = [url for url in portfolio.split('|') if url]
+
+    user_fields = {
+        'email': email,
+        'full_name': row['full_name'],
+        'phone': row.get('phone') or '',
+        'address': row.get('address') or row['shop_address'],
+        'user_type': 'TAILOR',
+    }
+    profile_fields = {
+        'shop_name': row['shop_name'],
+        'shop_address': row['shop_address'],
+        'specialization': specialization,
+        'availability_status': availability,
+        'bio': row.get('bio') or '',
+        'portfolio_images': portfolio,
+        **coordinates,
+        **numbers,
+    }
+    return user_fields, profile_fields, row.get('password') or None
+
+
+class Command(BaseCommand):
+    help = "Bulk import tailor accounts and profiles from a CSV or JSONL file."
+
+    def add_arguments(self, parser):
+        parser.add_argument('path')
+        parser.add_argument('--format', choices=['csv', 'jsonl'], help="Defaults to the file extension.")
+        parser.add_argument('--batch-size', type=int, default=1000)
+        parser.add_argument('--workers', type=int, default=os.cpu_count() or 1,
+                            help="Processes used to hash passwords.")
+        parser.add_argument('--checkpoint', help="Progress file; defaults to <path>.checkpoint.")
+        parser.add_argument('--restart', action='store_true', help="Ignore an existing checkpoint.")
+
+    def handle(self, *args, path, batch_size, workers, restart, **options):
+        if not os.path.exists(path):
+            raise CommandError(f"{path} does not exist.")
+        fmt = options['format'] or ('jsonl' if path.endswith(('.jsonl', '.ndjson')) else 'csv')
+        checkpoint = options['checkpoint'] or f"{path}.checkpoint"
+        state = {'line': 0, 'created': 0, 'skipped': 0}
+        if os.path.exists(checkpoint) and not restart:
+            with open(checkpoint) as handle:
+                state.update(json.load(handle))
+            self.stdout.write(f"Resuming after line {state['line']}.")
+
+        rows = ((number, row) for number, row in read_rows(path, fmt) if number > state['line'])
+        started = time.monotonic()
+        processed = 0
+        executor = get_executor(workers)
+        try:
+            while batch := list(islice(rows, batch_size)):
+                batch_started = time.monotonic()
+                created, skipped = self.import_batch(batch, executor)
+                state['line'] = batch[-1][0]
+                state['created'] += created
+                state['skipped'] += skipped
+                self.save_checkpoint(checkpoint, state)
+                processed += len(batch)
+                if options['verbosity'] >= 2:
+                    elapsed = time.monotonic() - batch_started
+                    self.stdout.write(
+                        f"Line {state['line']}: {created} created, {skipped} skipped "
+                        f"({len(batch) / elapsed:.0f} rows/s)."
+                    )
+        finally:
+            executor.shutdown()
+            invalidate_directory()
+
+        elapsed = time.monotonic() - started
+        # No checkpoint is written when the file had no rows to import.
+        if os.path.exists(checkpoint):
+            os.remove(checkpoint)
+        self.stdout.write(self.style.SUCCESS(
+            f"Imported {state['created']} tailors, skipped {state['skipped']} rows; "
+            f"{processed} rows in {elapsed:.1f}s ({processed / max(elapsed, 1e-9):.0f} rows/s)."
+        ))
+
+    def import_batch(self, batch, executor):
+        """Validate, hash and insert one batch; return ``(created, skipped)``."""
+        valid = []
+        seen = set()
+        for number, row in batch:
+            try:
+                user_fields, profile_fields, password = clean_row(row)
+            except ValidationError as exc:
+                self.stderr.write(f"Line {number}: {'; '.join(exc.messages)}")
+                continue
+            if user_fields['email'].lower() in seen:
+                self.stderr.write(f"Line {number}: duplicate email {user_fields['email']}")
+                continue
+            seen.add(user_fields['email'].lower())
+            valid.append((number, user_fields, profile_fields, password))
+
+        existing = {
+            email.lower() for email in
+            User.objects.filter(email__in=[fields['email'] for _, fields, _, _ in valid])
+            .values_list('email', flat=True)
+        }
+        for number, fields, _, _ in valid:
+            if fields['email'].lower() in existing:
+                self.stderr.write(f"Line {number}: {fields['email']} already exists")
+        valid = [entry for entry in valid if entry[1]['email'].lower() not in existing]
+        if not valid:
+            return 0, len(batch)
+
+        passwords = [password for _, _, _, password in valid if password]
+        hashed = iter(hash_passwords(executor, passwords))
+        users = []
+        for _, fields, _, password in valid:
+            user = User(**fields)
+            if password:
+                user.password = next(hashed)
+            else:
+                user.set_unusable_password()
+            users.append(user)
+
+        with transaction.atomic():
+            User.objects.bulk_create(users)
+            profiles = []
+            for user, (_, _, fields, _) in zip(users, valid):
+                profile = TailorProfile(user=user, **fields)
+                if profile.latitude is not None:
+                    profile.geohash = encode_geohash(profile.latitude, profile.longitude)
+                profiles.append(profile)
+            TailorProfile.objects.bulk_create(profiles)
+            refresh_search_vectors(TailorProfile.objects.filter(id__in=[profile.id for profile in profiles]))
+        return len(users), len(batch) - len(users)
+
+    def save_checkpoint(self, checkpoint, state):
+        """Atomically record progress so an interrupted import can resume."""
+        temporary = f"{checkpoint}.tmp"
+        with open(temporary, 'w') as handle:
+            json.dump(state, handle)
+        os.replace(temporary, checkpoint)
@@ -0,0 +1,64 @@
+from collections import defaultdict
+
+from django.core.management.base import BaseCommand
+from django.db import transaction
+from django.db.models import Count
+from orders.models import Order
+from tailors.cache import invalidate_directory
+from tailors.models import TailorProfile
+from tailors.workload import OPEN_STATUS_COUNTERS
+
+
+class Command(BaseCommand):
+    help = "Recompute tailor open-order counters and availability from orders in batches."
+
+    def add_arguments(self, parser):
+        parser.add_argument('--batch-size', type=int, default=500)
+
+    def handle(self, *args, batch_size, **options):
+        counter_fields = list(OPEN_STATUS_COUNTERS.values())
+        last_id = 0
+        checked = fixed = 0
+        while True:
+            with transaction.atomic():
+                profiles = list(
+                    TailorProfile.objects.select_for_update()
+                    .filter(id__gt=last_id)
+                    .order_by('id')
+                    .only('id', 'user_id', 'availability_status', 'max_open_orders', 'open_orders', *counter_fields)[:batch_size]
+                )
+                if not profiles:
+                    break
+                last_id = profiles[-1].id
+                checked += len(profiles)
+
+                counts = defaultdict(dict)
+                rows = Order.objects.filter(
+                    tailor_id__in=[profile.user_id for profile in profiles],
+                    status__in=OPEN_STATUS_COUNTERS,
+                ).values('tailor_id', 'status').annotate(total=Count('id'))
+                for row in rows:
+                    counts[row['tailor_id']][OPEN_STATUS_COUNTERS[row['status']]] = row['total']
+
+                drifted = []
+                for profile in profiles:
+                    expected = {field: counts[profile.user_id].get(field, 0) for field in counter_fields}
+                    expected['open_orders'] = sum(expected.values())
+                    if profile.availability_status != 'UNAVAILABLE':
+                        busy = expected['open_orders'] >= profile.max_open_orders
+                        expected['availability_status'] = 'BUSY' if busy else 'AVAILABLE'
+                    if any(getattr(profile, field) != value for field, value in expected.items()):
+                        for field, value in expected.items():
+                            setattr(profile, field, value)
+                        drifted.append(profile)
+
+                fixed += len(drifted)
+                if drifted:
+                    TailorProfile.objects.bulk_update(
+                        drifted, ['open_orders', 'availability_status', *counter_fields]
+                    )
+                    invalidate_directory()
+
+        self.stdout.write(self.style.SUCCESS(
+            f"Checked {checked} tailor profiles, fixed {fixed}."
+        ))
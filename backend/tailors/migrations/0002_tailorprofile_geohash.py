@@ -0,0 +1,39 @@
+# Generated by Django 6.0 on 2026-10-18 04:29
+
+from django.db import migrations, models
+
+
+def populate_geohash(apps, schema_editor):
+    from tailors.geo import encode_geohash
+
+    TailorProfile = apps.get_model('tailors', 'TailorProfile')
+    profiles = TailorProfile.objects.filter(
+        latitude__isnull=False,
+        longitude__isnull=False,
+    ).only('id', 'latitude', 'longitude')
+
+    batch = []
+    for profile in profiles.iterator(chunk_size=2000):
+        profile.geohash = encode_geohash(profile.latitude, profile.longitude)
+        batch.append(profile)
+        if len(batch) >= 2000:
+            TailorProfile.objects.bulk_update(batch, ['geohash'])
+            batch = []
+    if batch:
+        TailorProfile.objects.bulk_update(batch, ['geohash'])
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('tailors', '0001_initial'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='tailorprofile',
+            name='geohash',
+            field=models.CharField(blank=True, db_index=True, editable=False, help_text='Geohash of latitude/longitude used to prefilter radius searches', max_length=12),
+        ),
+        migrations.RunPython(populate_geohash, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,43 @@
+# Generated by Django 6.0 on 2026-10-18 04:30
+
+import django.contrib.postgres.indexes
+import django.contrib.postgres.search
+from django.contrib.postgres.operations import TrigramExtension
+from django.db import migrations, models
+
+
+def populate_search_columns(apps, schema_editor):
+    from tailors.search import refresh_search_vectors
+
+    TailorProfile = apps.get_model('tailors', 'TailorProfile')
+    refresh_search_vectors(TailorProfile.objects.all())
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('tailors', '0002_tailorprofile_geohash'),
+    ]
+
+    operations = [
+        TrigramExtension(),
+        migrations.AddField(
+            model_name='tailorprofile',
+            name='search_document',
+            field=models.TextField(blank=True, editable=False, help_text='Shop and owner name, trigram-indexed for typo-tolerant search'),
+        ),
+        migrations.AddField(
+            model_name='tailorprofile',
+            name='search_vector',
+            field=django.contrib.postgres.search.SearchVectorField(editable=False, null=True),
+        ),
+        migrations.RunPython(populate_search_columns, migrations.RunPython.noop),
+        migrations.AddIndex(
+            model_name='tailorprofile',
+            index=django.contrib.postgres.indexes.GinIndex(fields=['search_vector'], name='tailor_search_vector_gin'),
+        ),
+        migrations.AddIndex(
+            model_name='tailorprofile',
+            index=django.contrib.postgres.indexes.GinIndex(fields=['search_document'], name='tailor_search_document_trgm', opclasses=['gin_trgm_ops']),
+        ),
+    ]
@@ -0,0 +1,19 @@
+# Generated by Django 6.0 on 2026-10-18 04:31
+
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('tailors', '0003_tailorprofile_search'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='tailorprofile',
+            index=models.Index(fields=['-rating', '-total_reviews', '-id'], name='tailor_rating_idx'),
+        ),
+    ]
@@ -0,0 +1,28 @@
+# Generated by Django 6.0 on 2026-10-18 04:33
+
+from django.db import migrations, models
+from django.db.models import F, IntegerField
+from django.db.models.functions import Cast, Round
+
+
+def seed_rating_sum(apps, schema_editor):
+    TailorProfile = apps.get_model('tailors', 'TailorProfile')
+    TailorProfile.objects.update(
+        rating_sum=Cast(Round(F('rating') * F('total_reviews')), IntegerField())
+    )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('tailors', '0004_keyset_indexes'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='tailorprofile',
+            name='rating_sum',
+            field=models.PositiveIntegerField(default=0, help_text='Running sum of review ratings; rating = rating_sum / total_reviews'),
+        ),
+        migrations.RunPython(seed_rating_sum, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,18 @@
+# Generated by Django 6.0 on 2026-10-18 04:35
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('tailors', '0005_tailorprofile_rating_sum'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='tailorprofile',
+            name='portfolio_renditions',
+            field=models.JSONField(blank=True, default=dict, editable=False, help_text='Resized renditions of portfolio_images, keyed by source image'),
+        ),
+    ]
@@ -0,0 +1,76 @@
+# Generated by Django 6.0 on 2026-10-18 04:36
+
+from collections import defaultdict
+
+from django.db import migrations, models
+from django.db.models import Count
+
+OPEN_STATUS_COUNTERS = {
+    'PENDING': 'pending_orders',
+    'CONFIRMED': 'confirmed_orders',
+    'IN_PROGRESS': 'in_progress_orders',
+    'READY': 'ready_orders',
+}
+
+
+def populate_workload(apps, schema_editor):
+    Order = apps.get_model('orders', 'Order')
+    TailorProfile = apps.get_model('tailors', 'TailorProfile')
+
+    counts = defaultdict(dict)
+    rows = Order.objects.filter(status__in=OPEN_STATUS_COUNTERS).values(
+        'tailor_id', 'status'
+    ).annotate(total=Count('id'))
+    for row in rows:
+        counts[row['tailor_id']][OPEN_STATUS_COUNTERS[row['status']]] = row['total']
+
+    for profile in TailorProfile.objects.filter(user_id__in=list(counts)):
+        for field, total in counts[profile.user_id].items():
+            setattr(profile, field, total)
+        profile.open_orders = sum(counts[profile.user_id].values())
+        if profile.availability_status != 'UNAVAILABLE':
+            busy = profile.open_orders >= profile.max_open_orders
+            profile.availability_status = 'BUSY' if busy else 'AVAILABLE'
+        profile.save(update_fields=['open_orders', 'availability_status', *OPEN_STATUS_COUNTERS.values()])
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('orders', '0002_keyset_indexes'),
+        ('tailors', '0006_tailorprofile_portfolio_renditions'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='tailorprofile',
+            name='confirmed_orders',
+            field=models.PositiveIntegerField(default=0),
+        ),
+        migrations.AddField(
+            model_name='tailorprofile',
+            name='in_progress_orders',
+            field=models.PositiveIntegerField(default=0),
+        ),
+        migrations.AddField(
+            model_name='tailorprofile',
+            name='max_open_orders',
+            field=models.PositiveIntegerField(default=10, help_text='Open orders at which the tailor is shown as busy'),
+        ),
+        migrations.AddField(
+            model_name='tailorprofile',
+            name='open_orders',
+            field=models.PositiveIntegerField(default=0),
+        ),
+        migrations.AddField(
+            model_name='tailorprofile',
+            name='pending_orders',
+            field=models.PositiveIntegerField(default=0),
+        ),
+        migrations.AddField(
+            model_name='tailorprofile',
+            name='ready_orders',
+            field=models.PositiveIntegerField(default=0),
+        ),
+        migrations.RunPython(populate_workload, migrations.RunPython.noop),
+    ]
@@ -1,5 +1,8 @@
+from django.contrib.postgres.indexes import GinIndex
+from django.contrib.postgres.search import SearchVectorField
 from django.db import models
 from users.models import User
+from .geo import encode_geohash
 
 
 class TailorProfile(models.Model):
@@ -38,12 +41,31 @@ class TailorProfile(models.Model):
         default=0.00
     )
     total_reviews = models.PositiveIntegerField(default=0)
+    rating_sum = models.PositiveIntegerField(
+        default=0,
+        help_text="Running sum of review ratings; rating = rating_sum / total_reviews"
+    )
     bio = models.TextField(blank=True)
     portfolio_images = models.JSONField(default=list, blank=True)
+    portfolio_renditions = models.JSONField(
+        default=dict,
+        blank=True,
+        editable=False,
+        help_text="Resized renditions of portfolio_images, keyed by source image"
+    )
     availability_status = models.CharField(
         max_length=20,
         choices=AVAILABILITY_CHOICES
     )
+    max_open_orders = models.PositiveIntegerField(
+        default=10,
+        help_text="Open orders at which the tailor is shown as busy"
+    )
+    open_orders = models.PositiveIntegerField(default=0)
+    pending_orders = models.PositiveIntegerField(default=0)
+    confirmed_orders = models.PositiveIntegerField(default=0)
+    in_progress_orders = models.PositiveIntegerField(default=0)
+    ready_orders = models.PositiveIntegerField(default=0)
     latitude = models.DecimalField(
         max_digits=9,
         decimal_places=6,
@@ -56,17 +78,46 @@ class TailorProfile(models.Model):
         null=True,
         blank=True
     )
+    geohash = models.CharField(
+        max_length=12,
+        blank=True,
+        db_index=True,
+        editable=False,
+        help_text="Geohash of latitude/longitude used to prefilter radius searches"
+    )
+    search_vector = SearchVectorField(null=True, editable=False)
+    search_document = models.TextField(
+        blank=True,
+        editable=False,
+        help_text="Shop and owner name, trigram-indexed for typo-tolerant search"
+    )
     created_at = models.DateTimeField(auto_now_add=True)
     updated_at = models.DateTimeField(auto_now=True)
     
     class Meta:
         verbose_name = 'Tailor Profile'
         verbose_name_plural = 'Tailor Profiles'
+        indexes = [
+            models.Index(fields=['-rating', '-total_reviews', '-id'], name='tailor_rating_idx'),
+            GinIndex(fields=['search_vector'], name='tailor_search_vector_gin'),
+            GinIndex(
+                fields=['search_document'],
+                opclasses=['gin_trgm_ops'],
+                name='tailor_search_document_trgm',
+            ),
+        ]
     
     def save(self, *args, **kwargs):
         """Validate that user has user_type='TAILOR' before saving."""
         if self.user.user_type != 'TAILOR':
             raise ValueError("User must have user_type='TAILOR' to create a TailorProfile")
+        if self.latitude is not None and self.longitude is not None:
+            self.geohash = encode_geohash(self.latitude, self.longitude)
+        else:
+            self.geohash = ''
+        update_fields = kwargs.get('update_fields')
+        if update_fields is not None and {'latitude', 'longitude'} & set(update_fields):
+            kwargs['update_fields'] = set(update_fields) | {'geohash'}
         super().save(*args, **kwargs)
     
     def __str__(self):
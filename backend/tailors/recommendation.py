@@ -0,0 +1,311 @@
+"""
+Vectorized tailor recommendation ranking.
+
+Each worker keeps a compact, column-oriented NumPy snapshot of the profile
+fields used for ranking. The snapshot is refreshed incrementally from rows
+whose ``updated_at`` moved past the last seen watermark, less
+``TAILOR_RECOMMENDATION_OVERLAP_SECONDS`` since ``updated_at`` is stamped
+when a transaction starts, not when it commits. A periodic full rebuild
+picks up deletions from other processes. Ranking a request is then
+a handful of array operations over every candidate instead of a query per
+signal.
+"""
+import threading
+import time
+from datetime import timedelta
+
+import numpy as np
+from django.conf import settings
+from .geo import EARTH_RADIUS_KM
+from .models import TailorProfile
+
+SPECIALIZATIONS = [code for code, _ in TailorProfile.SPECIALIZATION_CHOICES]
+AVAILABILITY = [code for code, _ in TailorProfile.AVAILABILITY_CHOICES]
+# Profiles saved with a blank or retired choice get no specialization
+# (matching no filter) and count as available, as the workload counters
+# would derive.
+NO_SPECIALIZATION = -1
+DEFAULT_AVAILABILITY = AVAILABILITY.index('AVAILABLE')
+
+# Specializations considered a match for each Order.ORDER_TYPE_CHOICES value.
+ORDER_TYPE_SPECIALIZATIONS = {
+    'SHIRT': ('MENSWEAR', 'CASUAL', 'FORMAL'),
+    'PANTS': ('MENSWEAR', 'CASUAL', 'FORMAL'),
+    'SUIT': ('FORMAL', 'MENSWEAR'),
+    'DRESS': ('WOMENSWEAR', 'FORMAL'),
+    'JACKET': ('FORMAL', 'MENSWEAR', 'CASUAL'),
+    'CUSTOM': ('CUSTOM',),
+    'MULTIPLE': (),
+}
+
+SNAPSHOT_FIELDS = (
+    'id', 'latitude', 'longitude', 'rating', 'total_reviews', 'specialization',
+    'availability_status', 'open_orders', 'max_open_orders', 'updated_at',
+)
+
+
+def _columns(rows):
+    """Convert ``values_list`` rows into typed snapshot columns."""
+    rows = list(rows)
+    count = len(rows)
+
+    def column(index, dtype, convert=lambda value: value):
+        return np.fromiter((convert(row[index]) for row in rows), dtype=dtype, count=count)
+
+    def radians(value):
+        return np.nan if value is None else np.radians(float(value))
+
+    specializations = {code: index for index, code in enumerate(SPECIALIZATIONS)}
+    availability = {code: index for index, code in enumerate(AVAILABILITY)}
+    latitude = column(1, np.float32, radians)
+    return {
+        'ids': column(0, np.int64),
+        'latitude': latitude,
+        'longitude': column(2, np.float32, radians),
+        'cos_latitude': np.cos(latitude),
+        'rating': column(3, np.float32, float),
+        'reviews': column(4, np.float32),
+        'specialization': column(5, np.int8, lambda value: specializations.get(value, NO_SPECIALIZATION)),
+        'availability': column(6, np.int8, lambda value: availability.get(value, DEFAULT_AVAILABILITY)),
+        'open_orders': column(7, np.float32),
+        'capacity': column(8, np.float32),
+    }, max((row[9] for row in rows), default=None)
+
+
+class Ranking:
+    """Scored candidates, sorted lazily so a page only pays for its top-k."""
+
+    def __init__(self, ids, scores, distances=None):
+        self.ids = ids
+        self.scores = scores
+        self.distances = distances
+
+    def __len__(self):
+        return len(self.ids)
+
+    def top(self, limit):
+        """Return candidate positions of the ``limit`` best scores, in order."""
+        if limit < len(self.scores):
+            best = np.argpartition(-self.scores, limit - 1)[:limit]
+        else:
+            best = np.arange(len(self.scores))
+        return best[np.argsort(-self.scores[best])]
+
+
+class TailorSnapshot:
+    """In-memory, column-oriented copy of the fields used for ranking."""
+
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.columns, _ = _columns([])
+        self.base_score = np.empty(0, dtype=np.float64)
+        self.positions = {}
+        self.watermark = None
+        self.checked_at = 0.0
+        self.rebuilt_at = 0.0
+
+    def __len__(self):
+        return len(self.columns['ids'])
+
+    def refresh(self, force=False):
+        """Pull changed rows if the refresh interval has elapsed."""
+        now = time.monotonic()
+        if not force and now - self.checked_at < settings.TAILOR_RECOMMENDATION_REFRESH_SECONDS:
+            return
+        with self.lock:
+            if self.watermark is None or now - self.rebuilt_at >= settings.TAILOR_RECOMMENDATION_REBUILD_SECONDS:
+                self._rebuild()
+                self.rebuilt_at = now
+            else:
+                self._apply_changes()
+            self.checked_at = now
+
+    def _rebuild(self):
+        rows = TailorProfile.objects.order_by('id').values_list(*SNAPSHOT_FIELDS)
+        self.columns, self.watermark = _columns(rows.iterator(chunk_size=5000))
+        self.positions = {int(pk): index for index, pk in enumerate(self.columns['ids'])}
+        self._score_base()
+
+    def _apply_changes(self):
+        overlap = timedelta(seconds=settings.TAILOR_RECOMMENDATION_OVERLAP_SECONDS)
+        rows = TailorProfile.objects.filter(
+            updated_at__gte=self.watermark - overlap
+        ).values_list(*SNAPSHOT_FIELDS)
+        changes, watermark = _columns(rows)
+        if not len(changes['ids']):
+            return
+        self.watermark = max(self.watermark, watermark)
+
+        positions = np.fromiter(
+            (self.positions.get(int(pk), -1) for pk in changes['ids']),
+            dtype=np.int64,
+            count=len(changes['ids']),
+        )
+        # Rows re-read from the overlap are usually unchanged; skip those.
+        changed = positions < 0
+        if len(self):
+            for name, values in changes.items():
+                current = self.columns[name][np.maximum(positions, 0)]
+                differs = current != values
+                if values.dtype.kind == 'f':
+                    differs &= ~(np.isnan(current) & np.isnan(values))
+                changed |= differs
+        if not changed.any():
+            return
+        changes = {name: values[changed] for name, values in changes.items()}
+        positions = positions[changed]
+        existing = positions >= 0
+        columns = {name: values.copy() for name, values in self.columns.items()}
+        for name, values in changes.items():
+            columns[name][positions[existing]] = values[existing]
+
+        added = ~existing
+        if added.any():
+            start = len(columns['ids'])
+            columns = {
+                name: np.concatenate([columns[name], values[added]])
+                for name, values in changes.items()
+            }
+            for offset, pk in enumerate(changes['ids'][added]):
+                self.positions[int(pk)] = start + offset
+        self.columns = columns
+        self._score_base()
+
+    def _score_base(self):
+        """Precompute the request-independent part of every tailor's score."""
+        columns = self.columns
+        weights = settings.TAILOR_RECOMMENDATION_WEIGHTS
+        rating = columns['rating'].astype(np.float64)
+        reviews = columns['reviews'].astype(np.float64)
+        prior = settings.TAILOR_RECOMMENDATION_REVIEW_PRIOR
+
+        reviewed = reviews > 0
+        mean_rating = rating[reviewed].mean() if reviewed.any() else 0.0
+        # Bayesian average so a single 5-star review does not top the list.
+        score = weights['rating'] * ((rating * reviews + mean_rating * prior) / (reviews + prior) / 5)
+        max_reviews = reviews.max() if len(reviews) else 0.0
+        if max_reviews > 0:
+            score += weights['reviews'] * (np.log1p(reviews) / np.log1p(max_reviews))
+
+        load = np.clip(columns['open_orders'] / np.maximum(columns['capacity'], 1), 0, 1)
+        score += weights['workload'] * (1 - load)
+
+        # Break ties deterministically by id so pages never overlap.
+        self.base_score = score - columns['ids'] * 1e-12
+
+    def discard(self, profile_id):
+        """Hide a deleted profile until the next full rebuild."""
+        with self.lock:
+            index = self.positions.get(profile_id)
+            if index is not None:
+                availability = self.columns['availability'].copy()
+                availability[index] = AVAILABILITY.index('UNAVAILABLE')
+                self.columns = {**self.columns, 'availability': availability}
+
+    def rank(self, origin=None, radius_km=None, order_type=None, specialization=None,
+             availability=None, min_rating=None, max_load=None):
+        """
+        Score every candidate and return a :class:`Ranking`.
+
+        Unavailable tailors are never recommended. Distances are only
+        computed when an ``origin`` is given.
+        """
+        with self.lock:
+            columns = self.columns
+            score = self.base_score
+        weights = settings.TAILOR_RECOMMENDATION_WEIGHTS
+
+        mask = columns['availability'] != AVAILABILITY.index('UNAVAILABLE')
+        if specialization in SPECIALIZATIONS:
+            mask &= columns['specialization'] == SPECIALIZATIONS.index(specialization)
+        if availability in AVAILABILITY:
+            mask &= columns['availability'] == AVAILABILITY.index(availability)
+        if min_rating is not None:
+            mask &= columns['rating'] >= min_rating
+        if max_load is not None:
+            mask &= columns['open_orders'] <= max_load
+
+        matches = ORDER_TYPE_SPECIALIZATIONS.get(order_type, ())
+        if matches:
+            codes = [SPECIALIZATIONS.index(code) for code in matches]
+            score = score + weights['specialization'] * np.isin(columns['specialization'], codes)
+
+        distances = None
+        if origin is not None:
+            distances = self._distances(columns, *origin)
+            located = ~np.isnan(distances)
+            if radius_km is not None:
+                mask &= located & (distances <= radius_km)
+            scale = settings.TAILOR_RECOMMENDATION_DISTANCE_SCALE_KM
+            score = score + weights['distance'] * np.where(
+                located, np.exp(-np.nan_to_num(distances) / scale), 0
+            )
+
+        candidates = np.flatnonzero(mask)
+        return Ranking(
+            columns['ids'][candidates],
+            score[candidates],
+            distances[candidates] if distances is not None else None,
+        )
+
+    @staticmethod
+    def _distances(columns, latitude, longitude):
+        origin_lat = np.float32(np.radians(latitude))
+        origin_lon = np.float32(np.radians(longitude))
+        a = (
+            np.sin((columns['latitude'] - origin_lat) / 2) ** 2
+            + np.cos(origin_lat) * columns['cos_latitude']
+            * np.sin((columns['longitude'] - origin_lon) / 2) ** 2
+        )
+        return 2 * np.float32(EARTH_RADIUS_KM) * np.arcsin(np.minimum(np.sqrt(a), 1))
+
+
+_snapshot = TailorSnapshot()
+
+
+def get_snapshot():
+    """Return this process's snapshot, refreshed if it is due."""
+    _snapshot.refresh()
+    return _snapshot
+
+
+def discard_profile(profile_id):
+    """Remove a deleted profile from this process's snapshot."""
+    _snapshot.discard(profile_id)
+
+
+class RankedTailors:
+    """
+    Lazily materialized ranking usable by Django's ``Paginator``.
+
+    Only the profiles on the requested page are loaded from the database.
+    """
+
+    def __init__(self, queryset, ranking):
+        self.queryset = queryset
+        self.ranking = ranking
+
+    def count(self):
+        return len(self.ranking)
+
+    def __len__(self):
+        return len(self.ranking)
+
+    def __getitem__(self, index):
+        if not isinstance(index, slice):
+            return self[index:index + 1][0]
+        start, stop, _ = index.indices(len(self.ranking))
+        positions = self.ranking.top(stop)[start:stop]
+        page_ids = [int(pk) for pk in self.ranking.ids[positions]]
+        distances = self.ranking.distances
+        profiles = self.queryset.in_bulk(page_ids)
+        results = []
+        for position, pk in zip(positions, page_ids):
+            profile = profiles.get(pk)
+            if profile is None:
+                continue
+            if distances is not None:
+                distance = distances[position]
+                profile.distance_km = None if np.isnan(distance) else float(distance)
+            results.append(profile)
+        return results
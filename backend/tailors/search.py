@@ -0,0 +1,46 @@
+"""Full-text and trigram search support for the tailor directory."""
+from django.conf import settings
+from django.contrib.postgres.search import SearchVector
+from django.db.models import Case, F, OuterRef, Subquery, TextField, Value, When
+from django.db.models.functions import Coalesce, Concat
+
+
+def _owner_name(model):
+    """Subquery returning the full name of the profile's owning user."""
+    user_model = model._meta.get_field('user').related_model
+    return Coalesce(
+        Subquery(user_model.objects.filter(pk=OuterRef('user_id')).values('full_name')[:1]),
+        Value(''),
+        output_field=TextField(),
+    )
+
+
+def _specialization_label(model):
+    """Case expression mapping the specialization code to its display label."""
+    choices = model._meta.get_field('specialization').choices
+    return Case(
+        *[When(specialization=code, then=Value(label)) for code, label in choices],
+        default=F('specialization'),
+        output_field=TextField(),
+    )
+
+
+def refresh_search_vectors(queryset):
+    """
+    Recompute ``search_vector`` and ``search_document`` for ``queryset``.
+
+    Runs as a single UPDATE so it can be used for one profile after a save or
+    for a whole batch after a bulk import. Works with historical models too.
+    """
+    model = queryset.model
+    config = settings.TAILOR_SEARCH_CONFIG
+    owner_name = _owner_name(model)
+    return queryset.update(
+        search_vector=(
+            SearchVector('shop_name', weight='A', config=config)
+            + SearchVector(owner_name, weight='A', config=config)
+            + SearchVector(_specialization_label(model), weight='B', config=config)
+            + SearchVector('bio', weight='C', config=config)
+        ),
+        search_document=Concat(F('shop_name'), Value(' '), owner_name, output_field=TextField()),
+    )
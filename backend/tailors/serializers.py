@@ -1,11 +1,16 @@
 from rest_framework import serializers
+from core.expansion import ExpandableFieldsMixin
 from .models import TailorProfile
+from core.renditions import rendition_urls
 from users.serializers import UserSerializer
 
 
-class TailorListSerializer(serializers.ModelSerializer):
+class TailorListSerializer(ExpandableFieldsMixin, serializers.ModelSerializer):
     """Lightweight serializer for tailor list view."""
-    user = UserSerializer(read_only=True)
+    expandable_fields = {
+        'user': (UserSerializer, {'read_only': True}),
+    }
+    sideload_fields = {'user': 'users'}
     specialization_display = serializers.CharField(
         source='get_specialization_display',
         read_only=True
@@ -14,6 +19,8 @@ class TailorListSerializer(serializers.ModelSerializer):
         source='get_availability_status_display',
         read_only=True
     )
+    distance_km = serializers.SerializerMethodField()
+    portfolio_preview = serializers.SerializerMethodField()
     
     class Meta:
         model = TailorProfile
@@ -21,13 +28,33 @@ class TailorListSerializer(serializers.ModelSerializer):
             'id', 'user', 'shop_name', 'specialization', 
             'specialization_display', 'experience_years', 
             'rating', 'total_reviews', 'availability_status',
-            'availability_status_display', 'latitude', 'longitude'
+            'availability_status_display', 'open_orders',
+            'max_open_orders', 'latitude', 'longitude',
+            'distance_km', 'portfolio_preview'
         )
 
+    def get_portfolio_preview(self, obj):
+        """Rendition URLs of the first portfolio image, once generated."""
+        if not obj.portfolio_images:
+            return {}
+        first = obj.portfolio_images[0]
+        return rendition_urls(
+            (obj.portfolio_renditions or {}).get(first),
+            self.context.get('request')
+        )
+
+    def get_distance_km(self, obj):
+        """Distance from the ``?near=`` origin, when the search used one."""
+        distance = getattr(obj, 'distance_km', None)
+        return round(distance, 3) if distance is not None else None
 
-class TailorDetailSerializer(serializers.ModelSerializer):
+
+class TailorDetailSerializer(ExpandableFieldsMixin, serializers.ModelSerializer):
     """Full serializer for tailor detail view."""
-    user = UserSerializer(read_only=True)
+    expandable_fields = {
+        'user': (UserSerializer, {'read_only': True}),
+    }
+    sideload_fields = {'user': 'users'}
     specialization_display = serializers.CharField(
         source='get_specialization_display',
         read_only=True
@@ -36,6 +63,7 @@ class TailorDetailSerializer(serializers.ModelSerializer):
         source='get_availability_status_display',
         read_only=True
     )
+    portfolio_renditions = serializers.SerializerMethodField()
     
     class Meta:
         model = TailorProfile
@@ -43,12 +71,22 @@ class TailorDetailSerializer(serializers.ModelSerializer):
             'id', 'user', 'shop_name', 'shop_address', 
             'specialization', 'specialization_display',
             'experience_years', 'rating', 'total_reviews',
-            'bio', 'portfolio_images', 'availability_status',
-            'availability_status_display', 'latitude', 'longitude',
-            'created_at', 'updated_at'
+            'bio', 'portfolio_images', 'portfolio_renditions',
+            'availability_status', 'availability_status_display',
+            'open_orders', 'max_open_orders',
+            'latitude', 'longitude', 'created_at', 'updated_at'
         )
         read_only_fields = ('id', 'created_at', 'updated_at')
 
+    def get_portfolio_renditions(self, obj):
+        """Rendition URLs for each portfolio image, in portfolio order."""
+        manifest = obj.portfolio_renditions or {}
+        request = self.context.get('request')
+        return [
+            rendition_urls(manifest.get(source), request)
+            for source in obj.portfolio_images or []
+        ]
+
 
 class TailorPortfolioSerializer(serializers.Serializer):
     """Serializer for portfolio images."""
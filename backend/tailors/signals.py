@@ -0,0 +1,85 @@
+from functools import partial
+
+from django.db import transaction
+from django.db.models.signals import post_delete, post_save
+from django.dispatch import receiver
+from core import renditions
+from users.models import User
+from .cache import invalidate_directory
+from .models import TailorProfile
+from .recommendation import discard_profile
+from .search import refresh_search_vectors
+
+SEARCHABLE_PROFILE_FIELDS = {'shop_name', 'specialization', 'bio', 'user'}
+
+
+@receiver(post_save, sender=TailorProfile)
+def update_profile_search_vector(sender, instance, update_fields=None, **kwargs):
+    """Keep the profile's search columns in sync with its searchable fields."""
+    if update_fields is not None and not SEARCHABLE_PROFILE_FIELDS & set(update_fields):
+        return
+    refresh_search_vectors(TailorProfile.objects.filter(pk=instance.pk))
+
+
+@receiver(post_save, sender=User)
+def update_owner_search_vector(sender, instance, created=False, update_fields=None, **kwargs):
+    """Re-index a tailor's profile when the owner's name changes."""
+    if created or instance.user_type != 'TAILOR':
+        return
+    if update_fields is not None and 'full_name' not in update_fields:
+        return
+    refresh_search_vectors(TailorProfile.objects.filter(user_id=instance.pk))
+
+
+@receiver(post_save, sender=TailorProfile)
+@receiver(post_delete, sender=TailorProfile)
+def invalidate_directory_on_profile_change(sender, instance, **kwargs):
+    """Drop cached directory responses when a profile changes."""
+    invalidate_directory()
+
+
+@receiver(post_delete, sender=TailorProfile)
+def drop_profile_from_recommendations(sender, instance, **kwargs):
+    """Stop recommending a deleted profile in this process."""
+    discard_profile(instance.pk)
+
+
+@receiver(post_save, sender=User)
+@receiver(post_delete, sender=User)
+def invalidate_directory_on_owner_change(sender, instance, update_fields=None, **kwargs):
+    """Drop cached directory responses when a tailor's account changes."""
+    if instance.user_type != 'TAILOR':
+        return
+    if update_fields is not None and set(update_fields) <= {'last_login', 'password'}:
+        return
+    invalidate_directory()
+
+
+def store_portfolio_renditions(profile_id, results):
+    """Merge finished renditions into the profile, dropping removed images."""
+    with transaction.atomic():
+        profile = TailorProfile.objects.select_for_update().select_related('user').filter(pk=profile_id).first()
+        if profile is None:
+            return
+        current = set(profile.portfolio_images or [])
+        manifest = {
+            source: value
+            for source, value in {**profile.portfolio_renditions, **results}.items()
+            if source in current
+        }
+        if manifest == profile.portfolio_renditions:
+            return
+        profile.portfolio_renditions = manifest
+        profile.save(update_fields=['portfolio_renditions'])
+
+
+@receiver(post_save, sender=TailorProfile)
+def schedule_portfolio_renditions(sender, instance, **kwargs):
+    """Render newly added portfolio images in the background."""
+    manifest = instance.portfolio_renditions or {}
+    pending = [
+        source for source in instance.portfolio_images or []
+        if isinstance(source, str) and source not in manifest
+    ]
+    if pending:
+        renditions.schedule(pending, partial(store_portfolio_renditions, instance.pk))
@@ -1,3 +1,240 @@
+from io import StringIO
+
+from django.core.cache import cache
+from django.core.management import call_command
 from django.test import TestCase
+from django.urls import reverse
+from rest_framework.test import APIClient
+from core.testing import requires_postgresql
+from orders.models import Order
+from users.models import User
+from .models import TailorProfile
+from .workload import record_order_deleted, record_orders_created, record_status_change
+
+
+def make_tailor(email, **fields):
+    user = User.objects.create_user(
+        email=email, password='pass12345!', full_name=email.split('@')[0], user_type='TAILOR'
+    )
+    return TailorProfile.objects.create(
+        user=user,
+        shop_name=f"Shop {email.split('@')[0]}",
+        shop_address='1 Main St',
+        specialization='FORMAL',
+        availability_status='AVAILABLE',
+        **fields
+    )
+
+
+@requires_postgresql
+class KeysetPaginationTests(TestCase):
+    """Cursor pages of the tailor directory, which uses ``KeysetPagination``."""
+
+    @classmethod
+    def setUpTestData(cls):
+        for index in range(45):
+            user = User.objects.create_user(
+                email=f'tailor{index}@example.com', password='pass12345!',
+                full_name=f'Tailor {index}', user_type='TAILOR',
+            )
+            # Few distinct ratings, so most pages end inside a tie.
+            TailorProfile.objects.create(
+                user=user,
+                shop_name=f'Shop {index}',
+                shop_address='1 Main St',
+                specialization='FORMAL',
+                availability_status='AVAILABLE',
+                rating=index % 3,
+                open_orders=index % 4,
+            )
+
+    def setUp(self):
+        cache.clear()
+        self.client = APIClient()
+        self.url = reverse('tailors:tailor-list')
+
+    def walk(self, params, direction='next', url=None):
+        """Return the ids of every page reached by following ``direction`` links."""
+        pages = []
+        response = self.client.get(url or self.url, params)
+        while True:
+            self.assertEqual(response.status_code, 200)
+            pages.append([tailor['id'] for tailor in response.data['results']])
+            if not response.data[direction]:
+                return pages, response
+            response = self.client.get(response.data[direction])
+
+    def test_cursor_pages_match_the_offset_ordering(self):
+        expected = []
+        for page in (1, 2, 3):
+            response = self.client.get(self.url, {'page': page})
+            expected.extend(tailor['id'] for tailor in response.data['results'])
+
+        pages, last = self.walk({'cursor': ''})
+
+        self.assertEqual([len(page) for page in pages], [20, 20, 5])
+        self.assertEqual(sum(pages, []), expected)
+        self.assertNotIn('count', last.data)
+
+    def test_previous_links_walk_back_to_the_first_page(self):
+        forward, last = self.walk({'cursor': ''})
+
+        backward, first = self.walk({}, direction='previous', url=last.data['previous'])
+
+        self.assertEqual(backward, forward[-2::-1])
+        self.assertIsNone(first.data['previous'])
+
+    def test_cursors_follow_the_requested_ordering(self):
+        pages, _ = self.walk({'cursor': '', 'ordering': 'open_orders'})
+
+        ids = sum(pages, [])
+        self.assertEqual(len(ids), len(set(ids)))
+        self.assertEqual(
+            ids,
+            list(TailorProfile.objects.order_by('open_orders', 'pk').values_list('id', flat=True)),
+        )
+
+    def test_tampered_cursor_is_rejected(self):
+        response = self.client.get(self.url, {'cursor': 'not-a-cursor'})
+
+        self.assertEqual(response.status_code, 404)
+
+
+@requires_postgresql
+class DirectoryCacheTests(TestCase):
+    """ETag revalidation and invalidation of cached directory responses."""
+
+    def setUp(self):
+        cache.clear()
+        self.client = APIClient()
+        self.first = make_tailor('first@example.com')
+        self.second = make_tailor('second@example.com')
+        self.url = reverse('tailors:tailor-list')
+
+    def detail_url(self, profile):
+        return reverse('tailors:tailor-detail', kwargs={'id': profile.pk})
+
+    def test_repeated_requests_are_served_from_the_cache(self):
+        first = self.client.get(self.url, {'specialization': 'FORMAL', 'ordering': 'rating'})
+
+        with self.assertNumQueries(0):
+            again = self.client.get(self.url, {'ordering': 'rating', 'specialization': 'FORMAL'})
+
+        self.assertEqual(again.data, first.data)
+        self.assertEqual(again['ETag'], first['ETag'])
+        self.assertEqual(again['Cache-Control'], 'no-cache')
+
+    def test_matching_etag_gets_not_modified(self):
+        etag = self.client.get(self.url)['ETag']
+
+        with self.assertNumQueries(0):
+            response = self.client.get(self.url, HTTP_IF_NONE_MATCH=etag)
+
+        self.assertEqual(response.status_code, 304)
+        self.assertEqual(response['ETag'], etag)
+        self.assertFalse(response.content)
+
+    def test_profile_changes_invalidate_every_response(self):
+        etag = self.client.get(self.url)['ETag']
+
+        with self.captureOnCommitCallbacks(execute=True):
+            self.first.shop_name = 'Renamed'
+            self.first.save()
+        response = self.client.get(self.url, HTTP_IF_NONE_MATCH=etag)
+
+        self.assertEqual(response.status_code, 200)
+        self.assertNotEqual(response['ETag'], etag)
+        self.assertIn('Renamed', [tailor['shop_name'] for tailor in response.data['results']])
+
+    def test_workload_changes_only_invalidate_responses_with_that_tailor(self):
+        self.client.get(self.detail_url(self.first))
+        self.client.get(self.detail_url(self.second))
+
+        with self.captureOnCommitCallbacks(execute=True):
+            record_orders_created(self.first.user_id, ['PENDING'])
+
+        with self.assertNumQueries(0):
+            self.client.get(self.detail_url(self.second))
+        response = self.client.get(self.detail_url(self.first))
+        self.assertEqual(response.data['open_orders'], 1)
+
+    def test_responses_read_while_a_tailor_changes_are_not_cached(self):
+        self.client.get(self.detail_url(self.first))
+        with self.captureOnCommitCallbacks(execute=True):
+            record_orders_created(self.first.user_id, ['PENDING'])
+
+        # Just after the change another server may still be reading the
+        # old row, so the response is recomputed until the stamp is older.
+        self.client.get(self.detail_url(self.first))
+        with self.assertNumQueries(1):
+            self.client.get(self.detail_url(self.first))
+
+
+@requires_postgresql
+class WorkloadTests(TestCase):
+    """Open order counters and the availability derived from them."""
+
+    def setUp(self):
+        self.profile = make_tailor('tailor@example.com', max_open_orders=2)
+        self.tailor_id = self.profile.user_id
+
+    def create_order(self, order_status):
+        """Insert an order without counting it, as a drifted profile would."""
+        customer = User.objects.filter(user_type='CUSTOMER').first() or User.objects.create_user(
+            email='customer@example.com', password='pass12345!', full_name='customer', user_type='CUSTOMER'
+        )
+        return Order.objects.create(
+            customer=customer, tailor=self.profile.user, order_type='SHIRT',
+            total_price='40.00', status=order_status,
+        )
+
+    def assertWorkload(self, open_orders, pending, confirmed, availability):
+        self.profile.refresh_from_db()
+        self.assertEqual(
+            (
+                self.profile.open_orders, self.profile.pending_orders,
+                self.profile.confirmed_orders, self.profile.availability_status,
+            ),
+            (open_orders, pending, confirmed, availability),
+        )
+
+    def test_tailor_becomes_busy_at_capacity_and_available_again(self):
+        record_orders_created(self.tailor_id, ['PENDING', 'PENDING'])
+        self.assertWorkload(2, 2, 0, 'BUSY')
+
+        record_status_change(self.tailor_id, 'PENDING', 'CONFIRMED')
+        self.assertWorkload(2, 1, 1, 'BUSY')
+
+        record_status_change(self.tailor_id, 'CONFIRMED', 'COMPLETED')
+        self.assertWorkload(1, 1, 0, 'AVAILABLE')
+
+    def test_manual_unavailability_sticks(self):
+        TailorProfile.objects.filter(pk=self.profile.pk).update(availability_status='UNAVAILABLE')
+
+        record_orders_created(self.tailor_id, ['PENDING', 'PENDING'])
+        record_order_deleted(self.tailor_id, 'PENDING')
+
+        self.assertWorkload(1, 1, 0, 'UNAVAILABLE')
+
+    def test_counters_never_go_negative(self):
+        record_status_change(self.tailor_id, 'PENDING', 'CANCELLED')
+        record_order_deleted(self.tailor_id, 'CONFIRMED')
+
+        self.assertWorkload(0, 0, 0, 'AVAILABLE')
+
+    def test_deleting_an_order_releases_it(self):
+        order = self.create_order('PENDING')
+        record_orders_created(self.tailor_id, [order.status])
+
+        order.delete()
+
+        self.assertWorkload(0, 0, 0, 'AVAILABLE')
+
+    def test_recompute_command_fixes_drift(self):
+        for order_status in ('PENDING', 'CONFIRMED', 'COMPLETED'):
+            self.create_order(order_status)
+        TailorProfile.objects.filter(pk=self.profile.pk).update(open_orders=7, pending_orders=7)
+
+        call_command('recompute_tailor_workload', stdout=StringIO())
 
-# Create your tests here.
+        self.assertWorkload(2, 1, 1, 'BUSY')
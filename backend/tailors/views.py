@@ -1,8 +1,14 @@
-from rest_framework import generics, filters
+from rest_framework import generics
+from rest_framework.pagination import PageNumberPagination
 from rest_framework.permissions import AllowAny
 from rest_framework.response import Response
 from django_filters.rest_framework import DjangoFilterBackend
+from core.expansion import ExpandableQuerysetMixin
+from core.pagination import KeysetPagination
+from .cache import DirectoryCacheMixin
+from .filters import NearbyFilter, TailorOrderingFilter, TailorSearchFilter
 from .models import TailorProfile
+from .recommendation import ORDER_TYPE_SPECIALIZATIONS, RankedTailors, get_snapshot
 from .serializers import (
     TailorListSerializer, 
     TailorDetailSerializer,
@@ -10,19 +16,30 @@ from .serializers import (
 )
 
 
-class TailorListView(generics.ListAPIView):
-    """List all tailors with filtering and search."""
-    queryset = TailorProfile.objects.all()
+class TailorListView(DirectoryCacheMixin, ExpandableQuerysetMixin, generics.ListAPIView):
+    """
+    List all tailors with filtering and search.
+
+    ``?near=lat,lon&radius_km=`` limits results to tailors within the radius
+    and orders them nearest-first unless ``?ordering=`` is given.
+    ``?search=`` runs a relevance-ranked full-text and fuzzy name search.
+    ``?sort=recommended`` ranks tailors by distance, rating, review count,
+    specialization match with ``?order_type=`` and current workload.
+    ``?fields=`` and ``?expand=`` select the fields and nested relations
+    returned and ``?sideload=true`` moves owners into an ``included`` map;
+    see ``core.expansion``.
+    """
+    queryset = TailorProfile.objects.defer('search_vector', 'search_document')
     serializer_class = TailorListSerializer
     permission_classes = (AllowAny,)
-    filter_backends = [DjangoFilterBackend, filters.SearchFilter, filters.OrderingFilter]
+    pagination_class = KeysetPagination
+    filter_backends = [DjangoFilterBackend, NearbyFilter, TailorSearchFilter, TailorOrderingFilter]
     filterset_fields = ['specialization', 'availability_status']
-    search_fields = ['shop_name', 'user__full_name']
-    ordering_fields = ['rating', 'experience_years', 'created_at']
+    ordering_fields = ['rating', 'experience_years', 'created_at', 'open_orders']
     ordering = ['-rating', '-total_reviews']  # Default ordering
     
     def get_queryset(self):
-        queryset = super().get_queryset()
+        queryset = self.expand_queryset(super().get_queryset())
         
         # Filter by minimum rating
         min_rating = self.request.query_params.get('min_rating', None)
@@ -32,18 +49,66 @@ class TailorListView(generics.ListAPIView):
             except ValueError:
                 pass
         
+        # Filter by maximum current workload (open orders)
+        max_load = self.request.query_params.get('max_load', None)
+        if max_load:
+            try:
+                queryset = queryset.filter(open_orders__lte=int(max_load))
+            except ValueError:
+                pass
+        
         return queryset
 
+    def list(self, request, *args, **kwargs):
+        if request.query_params.get('sort') == 'recommended':
+            return self.add_included(self.list_recommended(request))
+        return super().list(request, *args, **kwargs)
 
-class TailorDetailView(generics.RetrieveAPIView):
+    def list_recommended(self, request):
+        """Rank candidates from the in-memory snapshot and page the result."""
+        params = request.query_params
+        nearby = NearbyFilter()
+        origin = nearby.get_origin(request)
+        radius_km = None
+        if origin is not None and params.get(nearby.radius_param):
+            radius_km = nearby.get_radius(request)
+
+        def number(name, cast):
+            try:
+                return cast(params[name]) if params.get(name) else None
+            except ValueError:
+                return None
+
+        order_type = params.get('order_type')
+        ranking = get_snapshot().rank(
+            origin=origin,
+            radius_km=radius_km,
+            order_type=order_type if order_type in ORDER_TYPE_SPECIALIZATIONS else None,
+            specialization=params.get('specialization'),
+            availability=params.get('availability_status'),
+            min_rating=number('min_rating', float),
+            max_load=number('max_load', int),
+        )
+
+        # Rankings are positional, so always page them by number.
+        self._paginator = PageNumberPagination()
+        page = self.paginate_queryset(RankedTailors(self.expand_queryset(self.queryset.all()), ranking))
+        serializer = self.get_serializer(page, many=True)
+        return self.get_paginated_response(serializer.data)
+
+
+class TailorDetailView(DirectoryCacheMixin, ExpandableQuerysetMixin, generics.RetrieveAPIView):
     """Get detailed information about a specific tailor."""
     queryset = TailorProfile.objects.all()
     serializer_class = TailorDetailSerializer
     permission_classes = (AllowAny,)
     lookup_field = 'id'
 
+    def get_queryset(self):
+        return self.expand_queryset(super().get_queryset())
+
 
-class TailorPortfolioView(generics.RetrieveAPIView):
+class TailorPortfolioView(DirectoryCacheMixin, generics.RetrieveAPIView):
     """Get portfolio images for a specific tailor."""
     queryset = TailorProfile.objects.all()
     serializer_class = TailorPortfolioSerializer
@@ -0,0 +1,79 @@
+"""
+Denormalized per-tailor workload counters.
+
+``TailorProfile`` carries one counter per open order status plus their total.
+Order creation, status changes and deletion adjust them with F-expressions
+inside the same transaction, and ``availability_status`` is derived from the
+total and the tailor's ``max_open_orders`` capacity in the same UPDATE.
+Counters are clamped at zero, so one that drifted (see the
+``recompute_tailor_workload`` command) can never fail an order update.
+"""
+from collections import Counter
+
+from django.db.models import Case, F, Value, When
+from django.db.models.functions import Greatest, Now
+from django.db.models.lookups import GreaterThanOrEqual
+from .cache import invalidate_tailor
+from .models import TailorProfile
+
+OPEN_STATUS_COUNTERS = {
+    'PENDING': 'pending_orders',
+    'CONFIRMED': 'confirmed_orders',
+    'IN_PROGRESS': 'in_progress_orders',
+    'READY': 'ready_orders',
+}
+
+
+def availability_expression(open_orders):
+    """Derive availability from load; a manual UNAVAILABLE always sticks."""
+    return Case(
+        When(availability_status='UNAVAILABLE', then=F('availability_status')),
+        When(GreaterThanOrEqual(open_orders, F('max_open_orders')), then=Value('BUSY')),
+        default=Value('AVAILABLE'),
+    )
+
+
+def apply_workload_change(tailor_id, deltas):
+    """
+    Apply ``{status: delta}`` changes to a tailor's open order counters.
+
+    Statuses that are not open (COMPLETED, CANCELLED) are ignored. Runs as a
+    single UPDATE and returns the number of profiles updated.
+    """
+    updates = {}
+    open_delta = 0
+    for order_status, delta in deltas.items():
+        field = OPEN_STATUS_COUNTERS.get(order_status)
+        if field and delta:
+            updates[field] = Greatest(F(field) + delta, 0)
+            open_delta += delta
+    if not updates:
+        return 0
+
+    open_orders = Greatest(F('open_orders') + open_delta, 0)
+    updated = TailorProfile.objects.filter(user_id=tailor_id).update(
+        open_orders=open_orders,
+        availability_status=availability_expression(open_orders),
+        updated_at=Now(),
+        **updates
+    )
+    if updated:
+        invalidate_tailor(tailor_id)
+    return updated
+
+
+def record_orders_created(tailor_id, statuses):
+    """Count newly created orders with the given statuses."""
+    return apply_workload_change(tailor_id, Counter(statuses))
+
+
+def record_status_change(tailor_id, old_status, new_status):
+    """Move one order between status counters."""
+    if old_status == new_status:
+        return 0
+    return apply_workload_change(tailor_id, {old_status: -1, new_status: 1})
+
+
+def record_order_deleted(tailor_id, order_status):
+    """Stop counting a deleted order."""
+    return apply_workload_change(tailor_id, {order_status: -1})
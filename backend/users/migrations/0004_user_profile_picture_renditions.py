@@ -0,0 +1,18 @@
+# Generated by Django 6.0 on 2026-10-18 04:35
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('users', '0003_keyset_indexes'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='user',
+            name='profile_picture_renditions',
+            field=models.JSONField(blank=True, default=dict, editable=False, help_text='Resized renditions of profile_picture, keyed by size and format'),
+        ),
+    ]
@@ -0,0 +1,36 @@
+"""
+Process-pool password hashing for bulk account imports.
+
+Functions here run in spawned worker processes and must not import models:
+the workers only configure ``PASSWORD_HASHERS`` instead of setting up Django.
+"""
+import multiprocessing
+from concurrent.futures import ProcessPoolExecutor
+
+from django.conf import settings
+
+
+def _configure(hashers):
+    if not settings.configured:
+        settings.configure(PASSWORD_HASHERS=hashers)
+
+
+def hash_password(password):
+    from django.contrib.auth.hashers import make_password
+    return make_password(password)
+
+
+def get_executor(workers):
+    """Return a process pool whose workers can hash passwords."""
+    return ProcessPoolExecutor(
+        max_workers=workers,
+        mp_context=multiprocessing.get_context('spawn'),
+        initializer=_configure,
+        initargs=(settings.PASSWORD_HASHERS,),
+    )
+
+
+def hash_passwords(executor, passwords):
+    """Hash ``passwords`` in ``executor``, preserving order."""
+    passwords = list(passwords)
+    return list(executor.map(hash_password, passwords, chunksize=max(1, len(passwords) // 32)))
@@ -1,6 +1,8 @@
 from rest_framework import serializers
 from django.contrib.auth.password_validation import validate_password
 from rest_framework_simplejwt.serializers import TokenObtainPairSerializer
+from core.expansion import ExpandableFieldsMixin
+from core.renditions import rendition_urls
 from .models import User
 
 
@@ -35,13 +37,23 @@ class UserRegistrationSerializer(serializers.ModelSerializer):
         return user
 
 
-class UserSerializer(serializers.ModelSerializer):
+class UserSerializer(ExpandableFieldsMixin, serializers.ModelSerializer):
+    profile_picture_renditions = serializers.SerializerMethodField()
+
     class Meta:
         model = User
         fields = ('id', 'email', 'full_name', 'phone', 'address', 
-                  'profile_picture', 'user_type', 'date_joined')
+                  'profile_picture', 'profile_picture_renditions',
+                  'user_type', 'date_joined')
         read_only_fields = ('id', 'email', 'date_joined')
 
+    def get_profile_picture_renditions(self, obj):
+        """Rendition URLs for the current profile picture, once generated."""
+        manifest = obj.profile_picture_renditions or {}
+        if not obj.profile_picture or manifest.get('source') != obj.profile_picture.name:
+            return {}
+        return rendition_urls(manifest.get('renditions'), self.context.get('request'))
+
 
 class PasswordResetRequestSerializer(serializers.Serializer):
     """Serializer for requesting password reset."""
@@ -0,0 +1,32 @@
+from functools import partial
+
+from django.db.models.signals import post_save
+from django.dispatch import receiver
+from core import renditions
+from .models import User
+
+
+def store_profile_picture_renditions(user_id, source_name, results):
+    """Record finished renditions if the user still has the same picture."""
+    if source_name not in results:
+        return
+    user = User.objects.filter(pk=user_id, profile_picture=source_name).first()
+    if user is None:
+        return
+    user.profile_picture_renditions = {
+        'source': source_name,
+        'renditions': results[source_name],
+    }
+    user.save(update_fields=['profile_picture_renditions'])
+
+
+@receiver(post_save, sender=User)
+def schedule_profile_picture_renditions(sender, instance, **kwargs):
+    """Render a newly uploaded profile picture in the background."""
+    source_name = instance.profile_picture.name if instance.profile_picture else ''
+    if not source_name or instance.profile_picture_renditions.get('source') == source_name:
+        return
+    renditions.schedule(
+        [source_name],
+        partial(store_profile_picture_renditions, instance.pk, source_name),
+    )
@@ -5,6 +5,7 @@ from rest_framework_simplejwt.tokens import RefreshToken
 from django.contrib.auth.hashers import make_password
 from django.utils.crypto import get_random_string
 from django.core.cache import cache
+from core.pagination import KeysetPagination
 from .models import User
 from .serializers import (
     UserRegistrationSerializer,
@@ -48,6 +49,7 @@ class UserListView(generics.ListAPIView):
     """List all users (Admin only)."""
     serializer_class = UserSerializer
     permission_classes = (IsAuthenticated, IsAdminUser)
+    pagination_class = KeysetPagination
     queryset = User.objects.all().order_by('-date_joined')
 
     def get_queryset(self):